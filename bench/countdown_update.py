@@ -0,0 +1,48 @@
+import time
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
+from countdown_widget import CountdownDisplay
+from utils import format_time
+
+
+def update_cost(app: QApplication, updates: int = 600) -> dict:
+    """
+    Время обновления табло на секунду отсчета: QLabel со стилем против
+    CountdownDisplay, с отрисовкой в окне без экрана.
+    """
+    window = QWidget()
+    window.setStyleSheet("QWidget { background-color: #FDFAF6; }")
+    layout = QVBoxLayout(window)
+    label = QLabel(format_time(1500))
+    label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    label.setStyleSheet("QLabel { font-size: 72px; font-weight: bold; color: #2C3E50; "
+                        "padding: 10px 0; }")
+    display = CountdownDisplay(format_time(1500))
+    layout.addWidget(label)
+    layout.addWidget(display)
+    window.resize(400, 300)
+    window.show()
+    app.processEvents()
+
+    result = {}
+    for name, widget in (('qlabel', label), ('countdown', display)):
+        timings = []
+        for seconds in range(1500, 1500 - updates, -1):
+            started = time.perf_counter()
+            widget.setText(format_time(seconds))
+            app.processEvents()  # Отрисовка изменившейся области
+            timings.append((time.perf_counter() - started) * 1e6)
+        timings.sort()
+        result[name] = {'median_us': timings[len(timings) // 2],
+                        'p95_us': timings[int(len(timings) * 0.95)]}
+    window.close()
+    return result
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    for name, values in update_cost(QApplication(sys.argv)).items():
+        print(f"{name:<10}: медиана {values['median_us']:.0f} мкс, "
+              f"95% {values['p95_us']:.0f} мкс на обновление")
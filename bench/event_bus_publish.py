@@ -0,0 +1,35 @@
+import time
+from event_bus import EVERY, LATEST, THROTTLE, EventBus
+
+
+def publish_cost(seconds: float = 2.0) -> dict:
+    """
+    Публикация тиков с частотой 1 кГц при быстром, медленном и зависшем
+    подписчиках: время публикации не должно зависеть от подписчиков.
+    """
+    bus = EventBus()
+    bus.subscribe('tick', lambda payload: None, EVERY, name='fast')
+    bus.subscribe('tick', lambda payload: time.sleep(0.05), LATEST, name='slow')
+    bus.subscribe('tick', lambda payload: None, THROTTLE, rate_hz=10, name='throttled')
+    bus.subscribe('tick', lambda payload: time.sleep(seconds), EVERY, timeout=0.2, name='stuck')
+    publish_times = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        bus.publish('tick', started)
+        publish_times.append((time.perf_counter() - started) * 1e6)
+        time.sleep(0.001)
+    time.sleep(0.2)
+    counters = bus.counters()
+    bus.close()
+    publish_times.sort()
+    return {'publish_us_median': publish_times[len(publish_times) // 2],
+            'publish_us_max': publish_times[-1], 'subscribers': counters}
+
+
+if __name__ == '__main__':
+    result = publish_cost()
+    print(f"Публикация: медиана {result['publish_us_median']:.1f} мкс, "
+          f"максимум {result['publish_us_max']:.1f} мкс")
+    for name, counters in result['subscribers'].items():
+        print(f"  {name}: {counters}")
@@ -0,0 +1,45 @@
+import time
+from datetime import date
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+import config
+from focus_chart import MIN_VISIBLE_POINTS, FocusChart, lttb
+
+
+def frame_times(years: int = 10, width: int = 560, steps: int = 200) -> dict:
+    """
+    Время кадра графика при масштабировании и сдвиге по синтетической
+    истории: медиана и максимум отрисовки без экрана.
+    """
+    rng = np.random.default_rng(1)
+    daily = rng.integers(0, 240, years * 365).astype(np.float64)
+    chart = FocusChart()
+    chart.resize(width, 180)
+    chart.set_history(date.today().toordinal() - len(daily), daily)
+    chart.grab()  # Первый кадр загружает шрифты и не показателен
+    paint_ms = []
+    total = len(daily)
+    for _ in range(steps):
+        span = float(rng.uniform(MIN_VISIBLE_POINTS, total))
+        start = float(rng.uniform(0, total - span))
+        chart._set_view(start, start + span)
+        chart.grab()
+        paint_ms.append(chart.last_paint_ms)
+    started = time.perf_counter()
+    for _ in range(20):
+        lttb(np.arange(len(daily), dtype=np.float64), daily, width)
+    lttb_ms = (time.perf_counter() - started) * 1000 / 20
+    paint_ms.sort()
+    return {'points': len(daily), 'lttb_full_ms': lttb_ms,
+            'paint_median_ms': paint_ms[len(paint_ms) // 2], 'paint_max_ms': paint_ms[-1]}
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication(sys.argv)
+    result = frame_times()
+    print(f"Точек: {result['points']}, LTTB всей истории {result['lttb_full_ms']:.2f} мс, "
+          f"кадр: медиана {result['paint_median_ms']:.2f} мс, "
+          f"максимум {result['paint_max_ms']:.2f} мс (бюджет {config.CHART_FRAME_BUDGET_MS} мс)")
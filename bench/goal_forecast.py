@@ -0,0 +1,56 @@
+import threading
+import time
+from datetime import date
+import numpy as np
+from goals import GoalTracker
+from session_log import SessionLog
+
+
+class _Analytics:
+    def __init__(self, rng):
+        self.hour_histogram = rng.integers(0, 100, 24).tolist()
+
+    @staticmethod
+    def get_week_total(day):
+        return 300
+
+
+class _Stats:
+    """Синтетическая история вместо PomodoroStats: без файла и его чтения"""
+
+    def __init__(self, years: int, records_per_day: int):
+        rng = np.random.default_rng(1)
+        start = date.today().toordinal() - years * 365
+        days_count = years * 365
+        self.lock = threading.Lock()
+        self.log = SessionLog()
+        self.log.days.extend(np.repeat(np.arange(start, start + days_count),
+                                       records_per_day).tolist())
+        self.log.minutes.extend(rng.integers(0, 26, days_count * records_per_day).tolist())
+        self.history_key = (1, len(self.log))
+        self.analytics = _Analytics(rng)
+
+    @staticmethod
+    def get_today_stats():
+        return 50
+
+
+def forecast_cost(years: int = 5, records_per_day: int = 200) -> dict:
+    """Время первого прогноза (свертка истории) и повторных прогнозов"""
+    stats = _Stats(years, records_per_day)
+    tracker = GoalTracker(stats, daily_goal=200, weekly_goal=1000)
+    started = time.perf_counter()
+    tracker.forecast_week(300)
+    first_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for _ in range(100):
+        tracker.forecast_day(300)
+        tracker.forecast_week(300)
+    repeat_ms = (time.perf_counter() - started) * 1000 / 100
+    return {'records': len(stats.log), 'first_ms': first_ms, 'repeat_ms': repeat_ms}
+
+
+if __name__ == '__main__':
+    result = forecast_cost()
+    print(f"Записей: {result['records']}, первый прогноз {result['first_ms']:.1f} мс, "
+          f"повторный (день и неделя) {result['repeat_ms']:.2f} мс")
@@ -0,0 +1,48 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date
+from heatmap_render import render_heatmaps
+
+
+def write_team(directory: str, users: int, records_per_user: int):
+    """Синтетические файлы статистики команды за год"""
+    rng = random.Random(1)
+    start = date.today().toordinal() - 365
+    for index in range(users):
+        days = sorted(rng.randrange(start, start + 366) for _ in range(records_per_user))
+        with open(os.path.join(directory, f"user{index:03d}.csv"), 'w') as f:
+            f.write("date,work_minutes\n")
+            f.writelines(f"{date.fromordinal(d).isoformat()},{rng.randint(1, 25)}\n"
+                         for d in days)
+
+
+def throughput(users: int = 200, records_per_user: int = 2000,
+               worker_counts=(1, 2, 4)) -> dict:
+    """Скорость отрисовки картинок команды (картинок в секунду) при разном числе процессов"""
+    directory = tempfile.mkdtemp(prefix="pomodoro_heatmaps_")
+    try:
+        source = os.path.join(directory, "stats")
+        os.makedirs(source)
+        write_team(source, users, records_per_user)
+        result = {'users': users, 'cpus': os.cpu_count()}
+        for workers in worker_counts:
+            out_dir = os.path.join(directory, f"out{workers}")
+            started = time.perf_counter()
+            written = render_heatmaps(source, out_dir, workers)
+            elapsed = time.perf_counter() - started
+            if len(written) != users:
+                raise AssertionError(f"Нарисовано {len(written)} картинок из {users}")
+            result[workers] = users / elapsed
+        return result
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    result = throughput()
+    print(f"Участников: {result['users']}, ядер: {result['cpus']}")
+    for workers in (1, 2, 4):
+        print(f"  процессов {workers}: {result[workers]:.1f} картинок/с")
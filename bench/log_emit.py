@@ -0,0 +1,34 @@
+import logging
+import threading
+import time
+from log_setup import setup_logging, shutdown_logging
+
+
+def emit_cost(records: int = 10000) -> float:
+    """
+    Стоимость одной записи лога в потоке, похожем на поток таймера.
+
+    Returns:
+        среднее время вызова logger.info() в микросекундах
+    """
+    bench_logger = logging.getLogger("pomodoro.bench")
+    result = {}
+
+    def worker():
+        start = time.perf_counter()
+        for i in range(records):
+            bench_logger.info("tick %d", i)
+        result['elapsed'] = time.perf_counter() - start
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    return result['elapsed'] / records * 1e6
+
+
+if __name__ == '__main__':
+    setup_logging(log_file=None, console=False)
+    try:
+        print(f"Стоимость записи в потоке таймера: {emit_cost():.2f} мкс")
+    finally:
+        shutdown_logging()
@@ -0,0 +1,65 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import date
+from memory_profile import current_rss
+from session_log import SessionLog
+
+MB = 1024 * 1024
+
+
+def _measure(name: str, path: str, results):
+    """Загрузка в чистом процессе: RSS до импорта, после импорта и после загрузки"""
+    before = current_rss()
+    if name == 'dataframe':
+        import pandas as pd
+        loader = pd.read_csv
+    else:
+        loader = SessionLog.load
+    imported = current_rss()
+    started = time.perf_counter()
+    data = loader(path)
+    elapsed = time.perf_counter() - started
+    loaded = current_rss()
+    results.put({'load_s': elapsed, 'import_mb': (imported - before) / MB,
+                 'data_mb': (loaded - imported) / MB, 'rows': len(data)})
+
+
+def compare(records: int) -> dict:
+    """
+    Сравнение времени загрузки и RSS SessionLog и pandas DataFrame.
+
+    Каждый вариант загружается в отдельном процессе: RSS учитывает и
+    память NumPy/pandas вне аллокатора Python, которую не видит tracemalloc.
+
+    Returns:
+        время загрузки (с), прирост RSS от импорта и от данных (МБ) для обоих вариантов
+    """
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'w') as f:
+        f.write("date,work_minutes\n")
+        start_day = date(2015, 1, 1).toordinal()
+        for i in range(records):
+            f.write(f"{date.fromordinal(start_day + i // 200).isoformat()},1\n")
+    context = multiprocessing.get_context('spawn')
+    result = {}
+    try:
+        for name in ('session_log', 'dataframe'):
+            results = context.Queue()
+            process = context.Process(target=_measure, args=(name, path, results))
+            process.start()
+            result[name] = results.get()
+            process.join()
+            if result[name]['rows'] != records:
+                raise AssertionError(f"{name}: загружено {result[name]['rows']} записей")
+    finally:
+        os.remove(path)
+    return result
+
+
+if __name__ == '__main__':
+    for size in (100_000, 1_000_000):
+        for name, values in compare(size).items():
+            print(f"{size:>9} записей, {name:<12}: загрузка {values['load_s']:.3f} с, "
+                  f"RSS импорта {values['import_mb']:.1f} МБ, данных {values['data_mb']:.1f} МБ")
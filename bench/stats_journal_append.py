@@ -0,0 +1,46 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+from stats_compaction import STATS_HEADER
+from stats_journal import StatsJournal, manifest_path_for
+
+
+def startup_and_append(sizes=(100_000, 1_000_000), appends: int = 200) -> dict:
+    """Время проверки при запуске и дописывания строки в зависимости от длины истории"""
+    directory = tempfile.mkdtemp(prefix="pomodoro_journal_")
+    path = os.path.join(directory, "stats.csv")
+    result = {}
+    try:
+        for size in sizes:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(STATS_HEADER)
+                f.writelines(f"2024-01-{1 + i % 28:02d},25\n" for i in range(size))
+            started = time.perf_counter()
+            StatsJournal(path).recover()
+            build_ms = (time.perf_counter() - started) * 1000
+            with open(path, 'ab') as f:
+                f.write(b"2024-02-0")  # Оборванная запись
+            journal = StatsJournal(path)
+            started = time.perf_counter()
+            report = journal.recover()
+            startup_ms = (time.perf_counter() - started) * 1000
+            started = time.perf_counter()
+            for _ in range(appends):
+                journal.append("2024-02-01,25\n")
+            append_ms = (time.perf_counter() - started) * 1000 / appends
+            result[size] = {'build_ms': build_ms, 'startup_ms': startup_ms,
+                            'checked_bytes': report.checked_bytes, 'append_ms': append_ms}
+            os.remove(manifest_path_for(path))
+        return result
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.ERROR)  # Предупреждения об отрезанных записях здесь ожидаемы
+    for size, values in startup_and_append().items():
+        print(f"{size:>9} записей: построение описания {values['build_ms']:.0f} мс, "
+              f"проверка при запуске {values['startup_ms']:.2f} мс "
+              f"({values['checked_bytes']} байт), дописывание {values['append_ms']:.3f} мс")
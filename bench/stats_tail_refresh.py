@@ -0,0 +1,49 @@
+import os
+import tempfile
+import time
+from datetime import date
+from session_log import SessionLog
+from stats_tail import StatsTail
+
+
+def refresh_cost(records: int = 500_000, appends: int = 50) -> dict:
+    """Время полного чтения файла и запросов после дописывания одной строки"""
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    start_day = date(2015, 1, 1).toordinal()
+    with os.fdopen(fd, 'w') as f:
+        f.write("date,work_minutes\n")
+        f.writelines(f"{date.fromordinal(start_day + i // 200).isoformat()},25\n"
+                     for i in range(records))
+    try:
+        reader = StatsTail(path)
+        started = time.perf_counter()
+        reader.refresh()
+        full_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        SessionLog.load(path)
+        reload_ms = (time.perf_counter() - started) * 1000
+        last_day = date.fromordinal(start_day + (records - 1) // 200)
+        append_ms = []
+        for _ in range(appends):
+            with open(path, 'a') as f:
+                f.write(f"{last_day.isoformat()},25\n")
+            started = time.perf_counter()
+            reader.refresh()
+            reader.minutes_on(last_day)
+            append_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        for _ in range(appends):
+            reader.refresh()  # Файл не менялся: только stat
+        unchanged_ms = (time.perf_counter() - started) * 1000 / appends
+        append_ms.sort()
+        return {'records': records, 'full_ms': full_ms, 'reload_ms': reload_ms,
+                'append_ms': append_ms[len(append_ms) // 2], 'unchanged_ms': unchanged_ms}
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    result = refresh_cost()
+    print(f"Записей: {result['records']}, первое чтение {result['full_ms']:.0f} мс "
+          f"(SessionLog.load {result['reload_ms']:.0f} мс), после дописывания строки "
+          f"{result['append_ms']:.3f} мс, без изменений {result['unchanged_ms']:.3f} мс")
@@ -0,0 +1,44 @@
+import threading
+import time
+from pomodoro import PomodoroTimer
+from team_sync import TeamClient, TeamHost
+
+
+def fanout(participants: int = 200, rounds: int = 20) -> dict:
+    """
+    Задержка рассылки на loopback: время от publish до получения
+    сообщения последним участником.
+    """
+    timer = PomodoroTimer(threaded=False)
+    host = TeamHost('127.0.0.1', 0)
+    host.start()
+    received = threading.Semaphore(0)
+    clients = [TeamClient('127.0.0.1', host.port, on_message=lambda m: received.release())
+               for _ in range(participants)]
+    for client in clients:
+        client.start()
+    deadline = time.monotonic() + 10
+    while host.client_count < participants and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    latencies = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        host.publish(timer)
+        for _ in range(participants):
+            received.acquire(timeout=5)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    for client in clients:
+        client.stop()
+    host.stop()
+    latencies.sort()
+    return {'participants': participants, 'median_ms': latencies[len(latencies) // 2],
+            'max_ms': latencies[-1]}
+
+
+if __name__ == '__main__':
+    for count in (10, 100, 300):
+        result = fanout(count)
+        print(f"{count:>4} участников: медиана {result['median_ms']:.2f} мс, "
+              f"максимум {result['max_ms']:.2f} мс")
@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+import numpy as np
+from team_report import build_team_report
+
+
+def write_team(directory: str, files: int, records_per_file: int):
+    """Синтетические файлы статистики команды за три года"""
+    rng = np.random.default_rng(1)
+    start = date.today().toordinal() - 3 * 365
+    for index in range(files):
+        days = np.sort(rng.integers(start, start + 3 * 365, records_per_file))
+        minutes = rng.integers(1, 26, records_per_file)
+        with open(os.path.join(directory, f"user{index:03d}.csv"), 'w') as f:
+            f.write("date,work_minutes\n")
+            f.writelines(f"{date.fromordinal(int(d)).isoformat()},{m}\n"
+                         for d, m in zip(days, minutes))
+
+
+def report_time(files: int = 200, records_per_file: int = 20_000,
+                worker_counts=(1, 2, 4, 8)) -> dict:
+    """Время сводки при разном числе процессов; итоги должны совпадать"""
+    directory = tempfile.mkdtemp(prefix="pomodoro_team_")
+    try:
+        write_team(directory, files, records_per_file)
+        result = {'files': files, 'records': files * records_per_file, 'cpus': os.cpu_count()}
+        for workers in worker_counts:
+            started = time.perf_counter()
+            report = build_team_report(directory, workers)
+            result[workers] = time.perf_counter() - started
+            result.setdefault('total_minutes', report.total_minutes)
+            if report.total_minutes != result['total_minutes']:
+                raise AssertionError("Итоги отличаются при разном числе процессов")
+        return result
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    result = report_time()
+    print(f"Файлов: {result['files']}, записей: {result['records']}, ядер: {result['cpus']}")
+    base = result[1]
+    for workers in (1, 2, 4, 8):
+        print(f"  процессов {workers}: {result[workers]:.2f} с (ускорение {base / result[workers]:.2f}x)")
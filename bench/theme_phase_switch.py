@@ -0,0 +1,70 @@
+import time
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QProgressBar, QPushButton, QVBoxLayout,
+                             QWidget)
+import config
+import theme
+
+
+def legacy_progress_bar_style(name: str, phase: str) -> str:
+    """Отдельная таблица полосы прогресса на фазу, как задавалась раньше через setStyleSheet"""
+    return (theme._progress_bar_rules(theme.colors(name), "QProgressBar")
+            + theme._chunk_rules(phase, "QProgressBar"))
+
+
+def switch_cost(app: QApplication, transitions: int = 300, name: str = config.DEFAULT_THEME) -> dict:
+    """
+    Стоимость смены фазы полосы прогресса в окне без экрана: setStyleSheet
+    с полной таблицей против свойства и переполировки. Отдельно время
+    самой смены стиля и время вместе с отрисовкой.
+    """
+    phases = [theme.PHASE_WORK, theme.PHASE_BREAK, theme.PHASE_PAUSE]
+    result = {}
+    for method in ('setStyleSheet', 'property'):
+        app.setStyleSheet(theme.build_stylesheet(name) if method == 'property' else "")
+        window = QMainWindow()
+        window.setObjectName(theme.MAIN_WINDOW)
+        central = QWidget()
+        layout = QVBoxLayout(central)
+        bar = QProgressBar()
+        bar.setObjectName(theme.PHASE_BAR)
+        bar.setRange(0, 100)
+        bar.setValue(40)
+        layout.addWidget(bar)
+        for title in ("Начать", "Статистика", "Стоп"):
+            button = QPushButton(title)
+            theme.set_role(button, theme.ROLE_ACTION)
+            layout.addWidget(button)
+        window.setCentralWidget(central)
+        window.resize(400, 300)
+        window.show()
+        app.processEvents()
+        style_us, total_us = [], []
+        for index in range(transitions):
+            phase = phases[index % len(phases)]
+            started = time.perf_counter()
+            if method == 'property':
+                theme.set_phase(bar, phase)
+            else:
+                bar.setStyleSheet(legacy_progress_bar_style(name, phase))
+            styled = time.perf_counter()
+            app.processEvents()  # Отрисовка полосы в новом цвете
+            style_us.append((styled - started) * 1e6)
+            total_us.append((time.perf_counter() - started) * 1e6)
+        window.close()
+        style_us.sort()
+        total_us.sort()
+        result[method] = {'style_median_us': style_us[len(style_us) // 2],
+                          'median_us': total_us[len(total_us) // 2],
+                          'p95_us': total_us[int(len(total_us) * 0.95)]}
+    app.setStyleSheet("")
+    return result
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    for method, values in switch_cost(QApplication(sys.argv)).items():
+        print(f"{method:<13}: стиль {values['style_median_us']:.0f} мкс, "
+              f"с отрисовкой медиана {values['median_us']:.0f} мкс, "
+              f"95% {values['p95_us']:.0f} мкс на смену фазы")
@@ -0,0 +1,217 @@
+import argparse
+import logging
+import sys
+from typing import List, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def _cmd_export(args) -> int:
+    from stats import PomodoroStats
+    from stats_export import EXPORT_FORMATS
+    fmt = args.format or _guess_format(args.output, EXPORT_FORMATS)
+    stats = PomodoroStats(args.stats_file) if args.stats_file else PomodoroStats()
+    try:
+        count = stats.export(args.output, fmt, args.start, args.end, archive=args.archive)
+    except Exception as e:
+        logger.error(f"Ошибка экспорта: {e}")
+        return 1
+    print(f"Экспортировано записей: {count} -> {args.output}")
+    return 0
+
+
+def _cmd_merge(args) -> int:
+    from stats_merge import merge_stats
+    try:
+        count = merge_stats(args.inputs, args.output, args.state, args.incremental)
+    except Exception as e:
+        logger.error(f"Ошибка слияния: {e}")
+        return 1
+    print(f"Записано записей: {count} -> {args.output}")
+    return 0
+
+
+def _cmd_replay(args) -> int:
+    from timer_replay import replay_trace
+    try:
+        report = replay_trace(args.trace)
+    except Exception as e:
+        logger.error(f"Ошибка воспроизведения трассы: {e}")
+        return 1
+    print(report.summary())
+    return 0 if report.ok else 2
+
+
+def _cmd_compact(args) -> int:
+    from stats import PomodoroStats
+    stats = PomodoroStats(args.stats_file) if args.stats_file else PomodoroStats()
+    try:
+        report = stats.compact(args.retain_days, None if args.no_archive else args.archive_dir)
+    except Exception as e:
+        logger.error(f"Ошибка сжатия истории: {e}")
+        return 1
+    print(report.summary())
+    return 0
+
+
+def _cmd_verify(args) -> int:
+    from stats import PomodoroStats
+    stats = PomodoroStats(args.stats_file) if args.stats_file else PomodoroStats()
+    try:
+        print(stats.recover().summary())
+        damaged = stats.verify()
+    except Exception as e:
+        logger.error(f"Ошибка проверки статистики: {e}")
+        return 1
+    for segment in damaged:
+        print(f"CRC не сходится: байты {segment.start}-{segment.end} ({segment.records} записей)")
+    return 2 if damaged else 0
+
+
+def _guess_format(path: str, formats) -> str:
+    """Определение формата по расширению файла"""
+    ext = path.rsplit('.', 1)[-1].lower()
+    return ext if ext in formats else 'jsonl'
+
+
+def _cmd_team_report(args) -> int:
+    from team_report import build_team_report
+    try:
+        report = build_team_report(args.directory, args.workers)
+    except Exception as e:
+        logger.error(f"Ошибка построения сводки команды: {e}")
+        return 1
+    print(report.table(args.weeks))
+    return 0
+
+
+def _cmd_heatmaps(args) -> int:
+    from heatmap_render import render_heatmaps
+    try:
+        written = render_heatmaps(args.directory, args.output, args.workers, args.days)
+    except Exception as e:
+        logger.error(f"Ошибка отрисовки картинок активности: {e}")
+        return 1
+    print(f"Картинок: {len(written)} -> {args.output}")
+    return 0
+
+
+def _cmd_stalls(args) -> int:
+    from stall_watchdog import summarize
+    try:
+        print(summarize(args.report, args.top))
+    except Exception as e:
+        logger.error(f"Ошибка чтения отчета о зависаниях: {e}")
+        return 1
+    return 0
+
+
+def _cmd_send(args) -> int:
+    import single_instance
+    reply = single_instance.send_command(args.action)
+    if reply is None:
+        print("Pomodoro Timer не запущен")
+        return 1
+    if reply.get('text'):
+        print(reply['text'])
+    return 0 if reply.get('ok') else 1
+
+
+# Команды CLI: имя, описание и обработчик. По этим именам main.py отличает
+# команду от опций Qt до импорта Qt
+COMMANDS = (
+    ("export", "Экспорт истории сессий", _cmd_export),
+    ("merge", "Слияние статистики с нескольких устройств", _cmd_merge),
+    ("replay", "Воспроизведение трассы таймера", _cmd_replay),
+    ("compact", "Свертка старой истории по дням", _cmd_compact),
+    ("verify", "Проверка файла статистики после сбоя", _cmd_verify),
+    ("team-report", "Сводка по файлам статистики команды", _cmd_team_report),
+    ("heatmaps", "Картинки активности участников (PNG)", _cmd_heatmaps),
+    ("stalls", "Сводка отчета о зависаниях окна", _cmd_stalls),
+    ("send", "Команда запущенному приложению", _cmd_send),
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pomodoro", description="Pomodoro Timer")
+    subparsers = parser.add_subparsers(dest="command")
+    parsers = {}
+    for name, help_text, handler in COMMANDS:
+        parsers[name] = subparsers.add_parser(name, help=help_text)
+        parsers[name].set_defaults(handler=handler)
+
+    export_parser = parsers["export"]
+    export_parser.add_argument("output", help="Путь к выходному файлу")
+    export_parser.add_argument("-f", "--format", choices=["jsonl", "parquet", "ics"],
+                               help="Формат (по умолчанию по расширению файла)")
+    export_parser.add_argument("--from", dest="start", help="Начальная дата YYYY-MM-DD")
+    export_parser.add_argument("--to", dest="end", help="Конечная дата YYYY-MM-DD")
+    export_parser.add_argument("--stats-file", help="Файл статистики")
+    export_parser.add_argument("--archive", action="store_true",
+                               help="Исходные строки свернутых дней из архива")
+
+    merge_parser = parsers["merge"]
+    merge_parser.add_argument("output", help="Итоговый файл статистики")
+    merge_parser.add_argument("inputs", nargs="+", help="Файлы статистики (CSV или JSON Lines)")
+    merge_parser.add_argument("--state", help="Файл состояния для инкрементального слияния")
+    merge_parser.add_argument("--incremental", action="store_true",
+                              help="Обработать только новые записи входов")
+
+    replay_parser = parsers["replay"]
+    replay_parser.add_argument("trace", help="Файл трассы (включается переменной POMODORO_TRACE)")
+
+    compact_parser = parsers["compact"]
+    compact_parser.add_argument("--retain-days", type=int, default=config.STATS_RETENTION_DAYS,
+                                help="Сколько последних дней хранить без свертки")
+    compact_parser.add_argument("--archive-dir", default=config.STATS_ARCHIVE_DIR,
+                                help="Папка для сжатых исходных строк")
+    compact_parser.add_argument("--no-archive", action="store_true",
+                                help="Не сохранять исходные строки свернутых дней")
+    compact_parser.add_argument("--stats-file", help="Файл статистики")
+
+    verify_parser = parsers["verify"]
+    verify_parser.add_argument("--stats-file", help="Файл статистики")
+
+    team_parser = parsers["team-report"]
+    team_parser.add_argument("directory", help="Папка с файлами статистики участников")
+    team_parser.add_argument("--workers", type=int, help="Число процессов (по умолчанию по числу ядер)")
+    team_parser.add_argument("--weeks", type=int, default=4, help="Сколько последних недель показать")
+
+    heatmaps_parser = parsers["heatmaps"]
+    heatmaps_parser.add_argument("directory", help="Папка с файлами статистики участников")
+    heatmaps_parser.add_argument("output", nargs="?", default=config.HEATMAP_DIR,
+                                 help="Папка для картинок")
+    heatmaps_parser.add_argument("--workers", type=int, help="Число процессов (по умолчанию по числу ядер)")
+    heatmaps_parser.add_argument("--days", type=int, default=config.HEATMAP_DAYS,
+                                 help="Сколько последних дней показать")
+
+    stalls_parser = parsers["stalls"]
+    stalls_parser.add_argument("report", help="Файл отчета (включается переменной POMODORO_STALL_REPORT)")
+    stalls_parser.add_argument("--top", type=int, default=10, help="Сколько мест в коде показать")
+
+    send_parser = parsers["send"]
+    send_parser.add_argument("action", choices=["show", "start", "pause", "stop", "stats"])
+
+    return parser
+
+
+def is_cli_command(argv: List[str]) -> bool:
+    """Проверка, что аргументы запуска - команда CLI, а не опции Qt"""
+    return bool(argv) and any(argv[0] == name for name, _, _ in COMMANDS)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки, возвращает код завершения"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, "handler", None):
+        parser.print_help()
+        return 1
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    from log_setup import setup_logging
+    setup_logging(log_file=None)
+    sys.exit(main())
@@ -10,14 +10,71 @@ WORK_COLOR = "#FF6B6B"  # Красный
 BREAK_COLOR = "#4ECDC4"  # Бирюзовый
 PAUSE_COLOR = "#95A5A6"  # Серый
 
+# Оформление
+DEFAULT_THEME = "light"  # Тема оформления: light или dark, меняется в настройках
+COUNTDOWN_FONT_PX = 72  # Размер цифр табло
+COUNTDOWN_SMOOTH_PROGRESS = False  # Плавная полоса под табло: 30 пробуждений в секунду вместо одного
+COUNTDOWN_SMOOTH_FPS = 30  # Частота кадров плавной полосы прогресса под табло
+
 # Время (в минутах)
 DEFAULT_WORK_TIME = 25
 DEFAULT_SHORT_BREAK = 5
 DEFAULT_LONG_BREAK = 15
 DEFAULT_ROUNDS = 4
+DEFAULT_DAILY_GOAL = 200  # Цель на день, минуты работы (0 - без цели)
+DEFAULT_WEEKLY_GOAL = 1000  # Цель на неделю, минуты работы (0 - без цели)
+
+# Планирование обновлений UI
+AUTOSAVE_INTERVAL_MS = 60000  # Автосохранение минуты работы
+
+# Шина событий таймера
+EVENT_QUEUE_LIMIT = 1000  # Недоставленных событий на подписчика с политикой every
+EVENT_HANDLER_TIMEOUT = 0.5  # Дольше - подписчик считается зависшим, с
 
 # Пути к файлам
 STATS_FILE = "pomodoro_stats.csv"
+TIMER_STATE_FILE = "pomodoro_timer_state.json"  # Снимок состояния таймера для восстановления после сбоя
+
+# История статистики
+STATS_CHUNK_SIZE = 100000  # Строк за один проход при потоковой обработке истории
+STATS_RETENTION_DAYS = 90  # Записи старше сворачиваются в одну строку на день
+STATS_ARCHIVE_DIR = "pomodoro_archive"  # Исходные строки свернутых дней, сжатые gzip
+STATS_COMPACT_MIN_BYTES = 256 * 1024  # Фоновое сжатие при запуске, если файл больше
+STATS_SEGMENT_RECORDS = 2048  # Строк в запечатанном сегменте файла статистики (CRC32)
+
+# Окно статистики и графики
+CHART_FRAME_BUDGET_MS = 16  # Отрисовка графика всей истории дольше - предупреждение в лог
+HEATMAP_DAYS = 30  # Дней в картинке активности, как в окне статистики
+HEATMAP_DIR = "pomodoro_heatmaps"  # Папка картинок активности по умолчанию
+
+# Командная сессия: адрес "host:port" ведущего и участника
+TEAM_HOST = "127.0.0.1"  # Ведущий без явного адреса слушает только loopback: протокол без авторизации
+TEAM_PORT = 47250
+TEAM_RESYNC_SECONDS = 10  # Повторная рассылка остатка времени участникам, пока таймер идет
+TEAM_SERVE = os.environ.get("POMODORO_TEAM_SERVE")  # Запуск ведущим на этом адресе
+TEAM_JOIN = os.environ.get("POMODORO_TEAM_JOIN")  # Подключение участником к ведущему
+
+# Единственный экземпляр: порт на loopback, занятый работающим приложением
+SINGLE_INSTANCE_PORT = 47251
+
+# Диагностика
+TRACE_FILE = os.environ.get("POMODORO_TRACE")  # Трасса команд таймера, включается при отладке
+MEMORY_PROFILE = os.environ.get("POMODORO_MEMORY_PROFILE")  # Отчет о памяти при выходе, включается при отладке
+MEMORY_PROFILE_FRAMES = 10  # Глубина стека аллокаций tracemalloc
+MEMORY_PROFILE_PHASES = 4  # Снимок памяти каждые N фаз таймера
+STALL_REPORT = os.environ.get("POMODORO_STALL_REPORT")  # Отчет о зависаниях окна, включается при отладке
+STALL_THRESHOLD_MS = 200  # Цикл событий не отвечает дольше - зависание
+STALL_HEARTBEAT_MS = 50  # Период отметки сердцебиения в потоке GUI
+STALL_SAMPLE_MS = 10  # Период снятия стека потока GUI во время зависания
+STALL_STACK_DEPTH = 12  # Кадров стека в отчете
+
+# Логирование
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FILE = "pomodoro.log"
+LOG_MAX_BYTES = 1024 * 1024  # Ротация после 1 МБ
+LOG_BACKUP_COUNT = 3
+LOG_RING_SIZE = 500  # Последние записи в памяти для отчета о сбое
+CRASH_REPORT_FILE = "pomodoro_crash.log"
 
 # Пути к звуковым файлам
 SOUNDS_DIR = os.path.join(os.path.dirname(__file__), "sounds")
@@ -38,122 +95,3 @@ PAUSE_IMAGES = [
     os.path.join(IMAGES_DIR, "pause2.png")
 ]
 STOP_IMAGE = os.path.join(IMAGES_DIR, "stop.png")
-
-# Стили
-SOUND_BUTTON_STYLE = """
-QPushButton {
-    background-color: transparent;
-    border: none;
-    width: 32px;
-    height: 32px;
-    padding: 0px;
-    margin: 5px;
-}
-QPushButton:hover {
-    background-color: rgba(52, 73, 94, 0.1);
-    border-radius: 6px;
-}
-"""
-
-BUTTON_STYLE = """
-QPushButton {
-    background-color: #34495E;
-    color: #ECF0F1;
-    border: none;
-    border-radius: 10px;
-    padding: 8px 15px;
-    font-size: 14px;
-    font-weight: bold;
-    min-width: 100px;
-    min-height: 40px;
-    margin: 5px;
-    text-transform: uppercase;
-}
-
-QPushButton:hover {
-    background-color: #2C3E50;
-}
-
-QPushButton:pressed {
-    background-color: #2C3E50;
-}
-
-QPushButton:disabled {
-    background-color: #95A5A6;
-}
-"""
-
-# Стили прогресс-бара для разных состояний
-PROGRESS_BAR_BASE_STYLE = """
-QProgressBar {
-    border: 1px solid #919B9C;
-    border-radius: 2px;
-    background-color: #FFFFFF;
-    text-align: center;
-    height: 20px;
-    min-width: 300px;
-    font-size: 12px;
-    font-weight: bold;
-    color: #000000;
-    margin: 0px;
-    padding: 0px;
-}
-"""
-
-PROGRESS_BAR_WORK_STYLE = PROGRESS_BAR_BASE_STYLE + """
-QProgressBar::chunk {
-    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                              stop:0 #FF9B9B,
-                              stop:0.5 #FF6B6B,
-                              stop:1 #FF4B4B);
-    border: 1px solid #CC5555;
-    border-radius: 0px;
-    margin: 0px;
-    width: 10px;
-}
-"""
-
-PROGRESS_BAR_BREAK_STYLE = PROGRESS_BAR_BASE_STYLE + """
-QProgressBar::chunk {
-    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                              stop:0 #7EDCD4,
-                              stop:0.5 #4ECDC4,
-                              stop:1 #2EBDB4);
-    border: 1px solid #3AA99F;
-    border-radius: 0px;
-    margin: 0px;
-    width: 10px;
-}
-"""
-
-PROGRESS_BAR_PAUSE_STYLE = PROGRESS_BAR_BASE_STYLE + """
-QProgressBar::chunk {
-    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                              stop:0 #B5B5B6,
-                              stop:0.5 #95A5A6,
-                              stop:1 #758586);
-    border: 1px solid #6A7677;
-    border-radius: 0px;
-    margin: 0px;
-    width: 10px;
-}
-"""
-
-LABEL_STYLE = """
-QLabel {
-    color: #2C3E50;
-    font-weight: bold;
-}
-"""
-
-MAIN_WINDOW_STYLE = """
-* {
-    background-color: #FDFAF6;
-}
-QMainWindow {
-    background-color: #FDFAF6;
-}
-QWidget {
-    background-color: #FDFAF6;
-}
-"""
@@ -0,0 +1,182 @@
+import logging
+import time
+from typing import Dict, List, Optional
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import Qt, QTimer, QRect, QRectF, QSize
+from PyQt6.QtGui import QPainter, QPixmap, QFont, QFontMetrics, QColor
+import config
+
+logger = logging.getLogger(__name__)
+
+GLYPHS = "0123456789:"
+PROGRESS_STRIP_HEIGHT = 3
+
+
+class GlyphAtlas:
+    """
+    Символы табло, один раз отрисованные в общий пиксмап.
+
+    Все цифры занимают ячейку одной ширины (по самой широкой), поэтому
+    смена цифры не сдвигает соседние символы. Атласы кешируются по шрифту,
+    цвету и масштабу экрана и общие для всех виджетов.
+    """
+    __slots__ = ('pixmap', 'sources', 'widths', 'height')
+
+    _cache: Dict[tuple, "GlyphAtlas"] = {}
+
+    def __init__(self, font: QFont, color: QColor, ratio: float):
+        metrics = QFontMetrics(font)
+        digit_width = max(metrics.horizontalAdvance(ch) for ch in GLYPHS[:-1])
+        self.widths = {ch: digit_width for ch in GLYPHS[:-1]}
+        self.widths[':'] = metrics.horizontalAdvance(':')
+        self.height = metrics.height()
+        total_width = sum(self.widths.values())
+        self.pixmap = QPixmap(int(total_width * ratio) + 1, int(self.height * ratio) + 1)
+        self.pixmap.setDevicePixelRatio(ratio)
+        self.pixmap.fill(Qt.GlobalColor.transparent)
+        self.sources: Dict[str, QRectF] = {}
+        painter = QPainter(self.pixmap)
+        painter.setFont(font)
+        painter.setPen(color)
+        x = 0
+        for ch in GLYPHS:
+            cell = QRectF(x, 0, self.widths[ch], self.height)
+            painter.drawText(cell, Qt.AlignmentFlag.AlignCenter, ch)
+            # Источник в пикселях пиксмапа, а не в логических единицах
+            self.sources[ch] = QRectF(x * ratio, 0, self.widths[ch] * ratio, self.height * ratio)
+            x += self.widths[ch]
+        painter.end()
+
+    @classmethod
+    def get(cls, font: QFont, color: QColor, ratio: float) -> "GlyphAtlas":
+        key = (font.key(), color.rgba(), ratio)
+        atlas = cls._cache.get(key)
+        if atlas is None:
+            atlas = cls._cache[key] = cls(font, color, ratio)
+        return atlas
+
+
+class CountdownDisplay(QWidget):
+    """
+    Большое табло обратного отсчета вместо QLabel со стилем.
+
+    QLabel при каждом setText заново раскладывает текст через движок
+    стилей. Здесь символы берутся из атласа, а при смене текста
+    перерисовываются только ячейки изменившихся символов. Интерфейс
+    setText/text совместим с QLabel.
+
+    Плавная полоса прогресса под цифрами интерполируется между тиками
+    таймера по времени последнего тика; она включается set_smooth и
+    требует частых пробуждений, поэтому по умолчанию выключена.
+    """
+
+    def __init__(self, text: str = "", parent=None, pixel_size: int = config.COUNTDOWN_FONT_PX,
+                 color: str = "#2C3E50"):
+        super().__init__(parent)
+        self._font = QFont()
+        self._font.setPixelSize(pixel_size)
+        self._font.setBold(True)
+        self._color = QColor(color)
+        self._text = text
+        self._margin = 10
+        self._time_left = 0
+        self._phase_length = 0
+        self._tick_at = 0.0
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.timeout.connect(self._smooth_frame)
+        self.smooth_frames = 0  # Пробуждения по таймеру плавной полосы
+        self.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
+
+    def _atlas(self) -> GlyphAtlas:
+        return GlyphAtlas.get(self._font, self._color, self.devicePixelRatioF())
+
+    def sizeHint(self) -> QSize:
+        atlas = self._atlas()
+        width = sum(atlas.widths.get(ch, 0) for ch in self._text or "00:00")
+        return QSize(width, atlas.height + 2 * self._margin + PROGRESS_STRIP_HEIGHT)
+
+    def minimumSizeHint(self) -> QSize:
+        return self.sizeHint()
+
+    def text(self) -> str:
+        return self._text
+
+    def setText(self, text: str):
+        if text == self._text:
+            return
+        old_cells = self._cells(self._text)
+        new_cells = self._cells(text)
+        old_text, self._text = self._text, text
+        if len(old_text) != len(text) or [c for _, c in old_cells] != [c for _, c in new_cells]:
+            # Сменилась раскладка (например, "100:00") - перерисовываем все
+            self.update()
+            return
+        for index, (old_ch, new_ch) in enumerate(zip(old_text, text)):
+            if old_ch != new_ch:
+                self.update(new_cells[index][1])
+
+    def setColor(self, color: str):
+        self._color = QColor(color)
+        self.update()
+
+    def set_progress(self, time_left: int, phase_length: int, tick_at: Optional[float] = None):
+        """Остаток фазы для полосы прогресса; tick_at - момент тика по time.monotonic"""
+        self._time_left = time_left
+        self._phase_length = phase_length
+        self._tick_at = tick_at if tick_at is not None else time.monotonic()
+        if self._smooth_timer.isActive():
+            self._update_progress_strip()
+
+    def set_smooth(self, enabled: bool, fps: int = config.COUNTDOWN_SMOOTH_FPS):
+        if enabled:
+            self._smooth_timer.start(max(1, 1000 // fps))
+        else:
+            self._smooth_timer.stop()
+        self._update_progress_strip()
+
+    def progress(self) -> float:
+        """Доля прошедшей фазы с учетом времени с последнего тика"""
+        if not self._phase_length:
+            return 0.0
+        elapsed = self._phase_length - self._time_left
+        if self._smooth_timer.isActive():
+            elapsed += min(max(time.monotonic() - self._tick_at, 0.0), 1.0)
+        return min(max(elapsed / self._phase_length, 0.0), 1.0)
+
+    def _strip_rect(self) -> QRect:
+        return QRect(0, self.height() - PROGRESS_STRIP_HEIGHT, self.width(), PROGRESS_STRIP_HEIGHT)
+
+    def _smooth_frame(self):
+        self.smooth_frames += 1
+        self._update_progress_strip()
+
+    def _update_progress_strip(self):
+        self.update(self._strip_rect())
+
+    def _cells(self, text: str) -> List[tuple]:
+        """Символы и их прямоугольники при выравнивании по центру"""
+        atlas = self._atlas()
+        width = sum(atlas.widths.get(ch, 0) for ch in text)
+        x = (self.width() - width) // 2
+        top = (self.height() - PROGRESS_STRIP_HEIGHT - atlas.height) // 2
+        cells = []
+        for ch in text:
+            cell_width = atlas.widths.get(ch, 0)
+            cells.append((ch, QRect(x, top, cell_width, atlas.height)))
+            x += cell_width
+        return cells
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        atlas = self._atlas()
+        dirty = event.rect()
+        for ch, cell in self._cells(self._text):
+            if ch in atlas.sources and cell.intersects(dirty):
+                painter.drawPixmap(QRectF(cell), atlas.pixmap, atlas.sources[ch])
+        if self._smooth_timer.isActive() and self._phase_length:
+            strip = self._strip_rect()
+            if strip.intersects(dirty):
+                painter.fillRect(strip.adjusted(0, 0, int(strip.width() * (self.progress() - 1)), 0),
+                                 self._color)
+        painter.end()
+
@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+# Политики доставки
+EVERY = 'every'        # Каждое событие по порядку (очередь ограничена, старые вытесняются)
+LATEST = 'latest'      # Только последнее недоставленное событие
+THROTTLE = 'throttle'  # Не чаще rate_hz раз в секунду, в конце интервала - последнее событие
+
+
+class Subscription:
+    """
+    Подписчик шины со своей очередью и потоком доставки.
+
+    Медленный обработчик задерживает только свою очередь: публикация
+    никогда не ждет подписчиков. Если обработчик выполняется дольше
+    timeout, подписчик считается зависшим и новые события ему не
+    ставятся в очередь, пока обработчик не вернется.
+    """
+
+    def __init__(self, bus: "EventBus", topic: str, handler: Callable[[Any], None],
+                 policy: str, rate_hz: Optional[float], timeout: float, name: str):
+        if policy not in (EVERY, LATEST, THROTTLE):
+            raise ValueError(f"Неизвестная политика доставки: {policy}")
+        if policy == THROTTLE and not rate_hz:
+            raise ValueError("Для политики throttle нужна частота rate_hz")
+        self.bus = bus
+        self.topic = topic
+        self.handler = handler
+        self.policy = policy
+        self.min_interval = 1.0 / rate_hz if rate_hz else 0.0
+        self.timeout = timeout
+        self.name = name
+        self.active = True
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0     # Вытеснены из переполненной очереди или пропущены при зависании
+        self.coalesced = 0   # Заменены более свежим событием (latest, throttle)
+        self.timeouts = 0
+        self.errors = 0
+        self.max_handler_ms = 0.0
+        self.max_latency_ms = 0.0  # От публикации до начала обработки
+
+        self._queue = deque(maxlen=config.EVENT_QUEUE_LIMIT if policy == EVERY else 1)
+        self._cond = threading.Condition()
+        self._busy_since: Optional[float] = None
+        self._stalled = False
+        self._last_delivery = 0.0
+        self._thread = threading.Thread(target=self._run, name=f"event-bus-{name}", daemon=True)
+        self._thread.start()
+
+    def offer(self, payload: Any, published_at: float):
+        """Постановка события в очередь подписчика; никогда не блокирует"""
+        with self._cond:
+            self.published += 1
+            busy_since = self._busy_since
+            if busy_since is not None and published_at - busy_since > self.timeout:
+                if not self._stalled:
+                    self._stalled = True
+                    self.timeouts += 1
+                    logger.warning(f"Подписчик {self.name} обрабатывает событие дольше "
+                                   f"{self.timeout} с, события пропускаются")
+                self.dropped += 1
+                return
+            if len(self._queue) == self._queue.maxlen:
+                if self.policy == EVERY:
+                    self.dropped += 1
+                else:
+                    self.coalesced += 1
+            self._queue.append((payload, published_at))
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self.active = False
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self.active and not self._queue:
+                    self._cond.wait()
+                if not self.active:
+                    return
+                # Троттлинг: ждем конца интервала, за это время событие может смениться
+                wait = self._last_delivery + self.min_interval - time.monotonic()
+                while self.active and wait > 0:
+                    self._cond.wait(wait)
+                    wait = self._last_delivery + self.min_interval - time.monotonic()
+                if not self.active:
+                    return
+                payload, published_at = self._queue.popleft()
+                started = time.monotonic()
+                self._busy_since = started
+            try:
+                self.handler(payload)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Ошибка в подписчике {self.name}: {e}")
+            finished = time.monotonic()
+            with self._cond:
+                self._busy_since = None
+                self._stalled = False
+                self._last_delivery = finished
+                self.delivered += 1
+                self.max_latency_ms = max(self.max_latency_ms, (started - published_at) * 1000)
+                self.max_handler_ms = max(self.max_handler_ms, (finished - started) * 1000)
+
+    def counters(self) -> dict:
+        return {
+            'topic': self.topic,
+            'policy': self.policy,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'max_handler_ms': round(self.max_handler_ms, 2),
+            'max_latency_ms': round(self.max_latency_ms, 2),
+        }
+
+
+class EventBus:
+    """
+    Шина событий публикации/подписки для событий таймера.
+
+    Публикация только раскладывает событие по очередям подписчиков темы,
+    поэтому поток таймера не зависит от скорости слушателей.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, handler: Callable[[Any], None], policy: str = EVERY,
+                  rate_hz: Optional[float] = None,
+                  timeout: float = config.EVENT_HANDLER_TIMEOUT,
+                  name: Optional[str] = None) -> Subscription:
+        subscription = Subscription(self, topic, handler, policy, rate_hz, timeout,
+                                    name or getattr(handler, '__name__', topic))
+        with self._lock:
+            # Копия списка: публикация читает его без блокировки
+            self._subscriptions[topic] = self._subscriptions.get(topic, []) + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions[subscription.topic] = [
+                s for s in self._subscriptions.get(subscription.topic, []) if s is not subscription]
+        subscription.close()
+
+    def publish(self, topic: str, payload: Any = None):
+        subscriptions = self._subscriptions.get(topic)
+        if not subscriptions:
+            return
+        published_at = time.monotonic()
+        for subscription in subscriptions:
+            subscription.offer(payload, published_at)
+
+    def counters(self) -> Dict[str, dict]:
+        """Счетчики доставки по подписчикам"""
+        with self._lock:
+            subscriptions = [s for group in self._subscriptions.values() for s in group]
+        return {s.name: s.counters() for s in subscriptions}
+
+    def close(self):
+        with self._lock:
+            subscriptions = [s for group in self._subscriptions.values() for s in group]
+            self._subscriptions = {}
+        for subscription in subscriptions:
+            subscription.close()
+
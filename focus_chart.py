@@ -0,0 +1,218 @@
+import logging
+import math
+import time
+from datetime import date
+from typing import Optional, Tuple
+import numpy as np
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF
+import config
+
+logger = logging.getLogger(__name__)
+
+DAILY = 'daily'
+WEEKLY = 'weekly'
+MIN_VISIBLE_POINTS = 7  # Сильнее приближать нет смысла
+LTTB_NUMPY_BUCKET = 64  # С корзин крупнее выбор точки в корзине делается через numpy
+
+
+def weekly_history(first_day: int, daily: np.ndarray) -> Tuple[int, np.ndarray]:
+    """Минуты по неделям с понедельника; возвращает первый понедельник и суммы"""
+    offset = date.fromordinal(first_day).weekday()
+    padded = np.concatenate([np.zeros(offset), daily])
+    padded = np.concatenate([padded, np.zeros(-len(padded) % 7)])
+    return first_day - offset, padded.reshape(-1, 7).sum(axis=1)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Прореживание ряда до threshold точек (Largest-Triangle-Three-Buckets).
+
+    Первая и последняя точки сохраняются, из каждой корзины между ними
+    берется точка, образующая наибольший треугольник с выбранной точкой
+    предыдущей корзины и средним следующей. В отличие от усреднения
+    сохраняет пики и провалы.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    # Границы корзин для внутренних точек и средние каждой корзины
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # Для последней корзины "следующая" - последняя точка
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = [0]
+    chosen = 0
+    if (n - 2) / (threshold - 2) > LTTB_NUMPY_BUCKET:
+        for bucket in range(threshold - 2):
+            start, end = edges[bucket], edges[bucket + 1]
+            ax, ay = x[chosen], y[chosen]
+            # Удвоенная площадь треугольника: для сравнения делить на 2 не нужно
+            areas = np.abs((ax - next_x[bucket]) * (y[start:end] - ay)
+                           - (ax - x[start:end]) * (next_y[bucket] - ay))
+            chosen = int(start + areas.argmax())
+            selected.append(chosen)
+    else:
+        # Корзины из нескольких точек: обход списков быстрее срезов numpy
+        xs, ys, bounds = x.tolist(), y.tolist(), edges.tolist()
+        next_x, next_y = next_x.tolist(), next_y.tolist()
+        for bucket in range(threshold - 2):
+            ax, ay = xs[chosen], ys[chosen]
+            dx, dy = ax - next_x[bucket], next_y[bucket] - ay
+            best = -1.0
+            for index in range(bounds[bucket], bounds[bucket + 1]):
+                area = abs(dx * (ys[index] - ay) - (ax - xs[index]) * dy)
+                if area > best:
+                    best, chosen = area, index
+            selected.append(chosen)
+    selected.append(n - 1)
+    return x[selected], y[selected]
+
+
+class FocusChart(QWidget):
+    """
+    График минут работы по дням или неделям за всю историю.
+
+    Данные приходят уже свернутыми по дням. При отрисовке берется только
+    видимый срез массива и прореживается LTTB до ширины виджета в пикселях,
+    поэтому стоимость кадра зависит от ширины, а не от длины истории.
+    Колесо мыши - масштаб вокруг курсора, перетаскивание - сдвиг,
+    двойной щелчок - вся история.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(150)
+        self.mode = DAILY
+        self._series = {DAILY: (0, np.zeros(0)), WEEKLY: (0, np.zeros(0))}
+        self._view = (0.0, 0.0)   # Видимый диапазон индексов [начало, конец)
+        self._drag_x: Optional[float] = None
+        self._cache_key = None
+        self._cache: Optional[tuple] = None
+        self.last_paint_ms = 0.0
+
+    def set_history(self, first_day: int, daily: np.ndarray):
+        daily = np.asarray(daily, dtype=np.float64)
+        self._series[DAILY] = (first_day, daily)
+        self._series[WEEKLY] = weekly_history(first_day, daily)
+        self.reset_view()
+
+    def set_mode(self, mode: str):
+        if mode != self.mode:
+            self.mode = mode
+            self.reset_view()
+
+    def reset_view(self):
+        self._view = (0.0, float(len(self._series[self.mode][1])))
+        self.update()
+
+    @property
+    def visible_range(self) -> Tuple[float, float]:
+        return self._view
+
+    def _plot_rect(self) -> QRectF:
+        return QRectF(36, 8, max(1, self.width() - 44), max(1, self.height() - 28))
+
+    def _set_view(self, start: float, end: float):
+        total = len(self._series[self.mode][1])
+        span = min(max(end - start, min(MIN_VISIBLE_POINTS, total)), total)
+        start = min(max(start, 0.0), total - span)
+        self._view = (start, start + span)
+        self.update()
+
+    def wheelEvent(self, event):
+        start, end = self._view
+        rect = self._plot_rect()
+        anchor = start + (end - start) * min(max((event.position().x() - rect.left())
+                                                  / rect.width(), 0.0), 1.0)
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        self._set_view(anchor - (anchor - start) * factor, anchor + (end - anchor) * factor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_x = event.position().x()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is None:
+            return
+        start, end = self._view
+        shift = (self._drag_x - event.position().x()) / self._plot_rect().width() * (end - start)
+        self._drag_x = event.position().x()
+        self._set_view(start + shift, end + shift)
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
+
+    def _points(self, rect: QRectF) -> Optional[tuple]:
+        """Прореженные точки видимого диапазона; пересчитываются только при смене вида"""
+        values = self._series[self.mode][1]
+        start, end = self._view
+        lo, hi = max(0, int(math.floor(start))), min(len(values), int(math.ceil(end)) + 1)
+        key = (self.mode, lo, hi, start, end, rect.width(), rect.height(), len(values))
+        if key == self._cache_key:
+            return self._cache
+        self._cache_key = key
+        if hi - lo < 2:
+            self._cache = None
+            return None
+        x = np.arange(lo, hi, dtype=np.float64)
+        x_sampled, y_sampled = lttb(x, values[lo:hi], max(3, int(rect.width())))
+        peak = float(values[lo:hi].max()) or 1.0
+        polygon = QPolygonF()
+        polygon.resize(len(x_sampled))
+        # Координаты пишутся прямо в память QPolygonF (пары double), без объекта
+        # QPointF на точку: сотни объектов за кадр запускали сборку мусора посреди отрисовки
+        buffer = polygon.data()
+        buffer.setsize(len(x_sampled) * 2 * np.dtype(np.float64).itemsize)
+        points = np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)
+        points[:, 0] = rect.left() + (x_sampled - start) / (end - start) * rect.width()
+        points[:, 1] = rect.bottom() - y_sampled / peak * rect.height()
+        self._cache = (polygon, peak, lo, hi - 1)
+        return self._cache
+
+    def _date_at(self, index: int) -> date:
+        first = self._series[self.mode][0]
+        return date.fromordinal(first + index * (7 if self.mode == WEEKLY else 1))
+
+    def paintEvent(self, event):
+        started = time.perf_counter()
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self._plot_rect()
+        painter.setPen(QPen(QColor("#ddd")))
+        painter.drawRect(rect)
+        cached = self._points(rect)
+        painter.setPen(QPen(QColor("#666")))
+        if cached is None:
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "Недостаточно данных")
+            painter.end()
+            return
+        polygon, peak, first_index, last_index = cached
+        # Тонкая линия без заливки: сглаженная заливка и толстое перо под зубчатым
+        # рядом в сотни точек стоят десятки миллисекунд на кадр
+        painter.setPen(QPen(QColor("#30a14e"), 1))
+        painter.drawPolyline(polygon)
+
+        painter.setPen(QPen(QColor("#666")))
+        painter.drawText(QRectF(0, rect.top() - 4, 32, 16),
+                         Qt.AlignmentFlag.AlignRight, f"{peak:.0f}")
+        painter.drawText(QRectF(0, rect.bottom() - 12, 32, 16), Qt.AlignmentFlag.AlignRight, "0")
+        bottom = QRectF(rect.left(), rect.bottom() + 4, rect.width(), 16)
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignLeft,
+                         self._date_at(first_index).strftime('%d.%m.%Y'))
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignRight,
+                         self._date_at(last_index).strftime('%d.%m.%Y'))
+        painter.end()
+        self.last_paint_ms = (time.perf_counter() - started) * 1000
+        if self.last_paint_ms > config.CHART_FRAME_BUDGET_MS:
+            logger.warning(f"Отрисовка графика заняла {self.last_paint_ms:.1f} мс")
+
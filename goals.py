@@ -0,0 +1,165 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+import numpy as np
+import config
+from session_log import SessionLog
+
+logger = logging.getLogger(__name__)
+
+RECENCY_HALF_LIFE_DAYS = 30  # Вес дня истории вдвое меньше каждые 30 дней
+
+
+class GoalForecast:
+    """Прогресс к цели и прогноз на конец дня или недели, в минутах"""
+    __slots__ = ('goal', 'done', 'expected', 'probability', 'capacity')
+
+    def __init__(self, goal: int, done: int, expected: float, probability: float,
+                 capacity: float):
+        self.goal = goal
+        self.done = done
+        self.expected = expected
+        self.probability = probability  # Доля похожих дней истории, в которые цель достигнута
+        self.capacity = capacity        # Сколько еще можно успеть по расписанию
+
+    @property
+    def reached(self) -> bool:
+        return self.done >= self.goal
+
+    @property
+    def on_track(self) -> bool:
+        return self.expected >= self.goal
+
+    def __repr__(self):
+        return (f"GoalForecast({self.done}/{self.goal}, expected={self.expected:.0f}, "
+                f"p={self.probability:.2f})")
+
+
+def schedule_capacity(timer, now: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> float:
+    """
+    Сколько минут работы уместится до until (по умолчанию до полуночи),
+    если идти по расписанию без остановок с текущей фазы таймера.
+    """
+    now = now or datetime.now()
+    until = until or datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    seconds = max(0, int((until - now).total_seconds()))
+    timeline = timer.timeline
+    state = timer.state
+    if state.is_running:
+        start = timeline.start_of(state.phase_index) + state.phase_length - state.time_left
+    else:
+        start = timeline.start_of(timeline.work_index(state.current_round))
+    return timeline.work_seconds_between(start, start + seconds) / 60
+
+
+def hour_share_after(hour_histogram: List[int], now: datetime) -> float:
+    """
+    Доля дневной работы, которая по истории приходится на время после now.
+
+    Текущий час учитывается пропорционально оставшимся минутам. Без истории
+    по часам работа считается равномерной в течение суток.
+    """
+    histogram = np.asarray(hour_histogram, dtype=np.float64)
+    total = histogram.sum()
+    if total <= 0:
+        histogram = np.ones(24)
+        total = 24.0
+    hour_left = 1 - (now.minute * 60 + now.second) / 3600
+    return float((histogram[now.hour + 1:].sum() + histogram[now.hour] * hour_left) / total)
+
+
+class GoalTracker:
+    """
+    Цели на день и неделю по PomodoroStats с прогнозом.
+
+    История до сегодняшнего дня один раз сворачивается в массив минут
+    по дням (с нулями для пропущенных дней) и кешируется до смены даты
+    или версии истории (перечитанный файл, дописанные строки).
+    Прогноз при каждой смене фазы - несколько векторных операций numpy
+    над этим массивом, независимо от числа записей в истории.
+    """
+
+    def __init__(self, stats, daily_goal: int = config.DEFAULT_DAILY_GOAL,
+                 weekly_goal: int = config.DEFAULT_WEEKLY_GOAL):
+        self.stats = stats
+        self.daily_goal = daily_goal
+        self.weekly_goal = weekly_goal
+        self._cache_key = None
+        self._daily: Optional[np.ndarray] = None    # Минуты по дням до вчера включительно
+        self._weights: Optional[np.ndarray] = None  # Вес дня по давности
+        self._first_day = 0
+
+    def _history(self, today: date) -> Tuple[np.ndarray, np.ndarray]:
+        """Минуты и веса по дням истории до сегодняшнего дня"""
+        # Колонки истории может дополнять фоновая загрузка статистики: пока на них
+        # смотрят массивы NumPy, расти им нельзя
+        with self.stats.lock:
+            log: SessionLog = self.stats.log
+            key = (self.stats.history_key, today.toordinal())
+            if key != self._cache_key:
+                days = np.frombuffer(log.days, dtype=np.int32) if len(log) else np.empty(0, np.int32)
+                minutes = np.frombuffer(log.minutes, dtype=np.int32) if len(log) else np.empty(0, np.int32)
+                mask = days < today.toordinal()
+                days, minutes = days[mask], minutes[mask]
+                if len(days):
+                    self._first_day = int(days.min())
+                    self._daily = np.bincount(days - self._first_day, weights=minutes,
+                                              minlength=today.toordinal() - self._first_day)
+                else:
+                    self._first_day = today.toordinal()
+                    self._daily = np.zeros(0)
+                age = np.arange(len(self._daily), 0, -1)
+                self._weights = 0.5 ** (age / RECENCY_HALF_LIFE_DAYS)
+                self._cache_key = key
+        return self._daily, self._weights
+
+    def _remaining_today(self, daily: np.ndarray, capacity: float, now: datetime) -> np.ndarray:
+        """Сколько еще минут принес бы сегодня каждый день истории"""
+        share = hour_share_after(self.stats.analytics.hour_histogram, now)
+        return np.minimum(daily * share, capacity)
+
+    def forecast_day(self, capacity: float, now: Optional[datetime] = None) -> GoalForecast:
+        """
+        Прогноз на конец дня: для каждого дня истории берется доля его работы,
+        приходящаяся на оставшиеся часы, и ограничивается тем, что успеется
+        по расписанию. Ожидание и вероятность - взвешенные по давности.
+        """
+        now = now or datetime.now()
+        done = self.stats.get_today_stats()
+        daily, weights = self._history(now.date())
+        if not len(daily):
+            return GoalForecast(self.daily_goal, done, float(done),
+                                float(done >= self.daily_goal), capacity)
+        outcomes = done + self._remaining_today(daily, capacity, now)
+        total_weight = weights.sum()
+        expected = float((outcomes * weights).sum() / total_weight)
+        probability = float(weights[outcomes >= self.daily_goal].sum() / total_weight)
+        return GoalForecast(self.daily_goal, done, expected, probability, capacity)
+
+    def forecast_week(self, capacity: float, now: Optional[datetime] = None) -> GoalForecast:
+        """
+        Прогноз на конец недели: ожидаемый остаток сегодняшнего дня плюс
+        минуты прошлых недель за те же оставшиеся дни недели.
+        """
+        now = now or datetime.now()
+        today = now.date()
+        done = self.stats.analytics.get_week_total(today)
+        daily, weights = self._history(today)
+        # Выравниваем историю по понедельникам: строка - неделя, столбец - день недели
+        padded = np.concatenate([np.zeros(date.fromordinal(self._first_day).weekday()), daily])
+        full_weeks = len(padded) // 7
+        if not full_weeks:
+            return GoalForecast(self.weekly_goal, done, float(done),
+                                float(done >= self.weekly_goal), capacity)
+        weeks = padded[:full_weeks * 7].reshape(full_weeks, 7)
+        rest_of_week = weeks[:, today.weekday() + 1:].sum(axis=1)
+        today_remaining = float((self._remaining_today(daily, capacity, now) * weights).sum()
+                                / weights.sum())
+        outcomes = done + today_remaining + rest_of_week
+        week_weights = 0.5 ** (np.arange(full_weeks, 0, -1) * 7 / RECENCY_HALF_LIFE_DAYS)
+        total_weight = week_weights.sum()
+        expected = float((outcomes * week_weights).sum() / total_weight)
+        probability = float(week_weights[outcomes >= self.weekly_goal].sum() / total_weight)
+        return GoalForecast(self.weekly_goal, done, expected, probability, capacity)
+
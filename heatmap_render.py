@@ -0,0 +1,171 @@
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+CELL = 20      # Квадрат дня, как ContributionSquare
+SPACING = 5
+MARGIN = 12
+LABEL_WIDTH = 28
+TITLE_HEIGHT = 28
+LEGEND_HEIGHT = 30
+WEEKDAYS = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
+LEGEND_MINUTES = [0, 30, 60, 90, 120]
+
+
+_app = None  # Держим ссылку: без нее приложение Qt удаляется сразу после создания
+
+
+def _ensure_gui():
+    """QGuiApplication на платформе offscreen: QPainter нужен шрифтам, а окно - нет"""
+    global _app
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtGui import QGuiApplication
+    if QGuiApplication.instance() is None:
+        _app = QGuiApplication(sys.argv[:1])
+
+
+def _grid(days: List[date]) -> List[tuple]:
+    """Строка и столбец каждого дня: строка - день недели, новый столбец после воскресенья"""
+    cells = []
+    column = 0
+    for day in days:
+        cells.append((day, day.weekday(), column))
+        if day.weekday() == 6:
+            column += 1
+    return cells
+
+
+def render_heatmap(daily: Dict[date, int], end: date, days: int = config.HEATMAP_DAYS,
+                   title: str = ""):
+    """
+    Картинка активности за days дней по end включительно, как сетка окна статистики.
+
+    Returns:
+        QImage
+    """
+    from PyQt6.QtCore import Qt, QRect
+    from PyQt6.QtGui import QImage, QPainter, QColor, QFont
+    from stats_window import color_for_minutes
+
+    cells = _grid([end - timedelta(days=offset) for offset in range(days - 1, -1, -1)])
+    columns = cells[-1][2] + 1 if cells else 1
+    grid_width = columns * (CELL + SPACING) - SPACING
+    width = max(2 * MARGIN + LABEL_WIDTH + grid_width, 300)
+    height = 2 * MARGIN + TITLE_HEIGHT + 7 * (CELL + SPACING) - SPACING + LEGEND_HEIGHT
+
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor("#FFFFFF"))
+    painter = QPainter(image)
+    font = QFont()
+    font.setPixelSize(12)
+    painter.setFont(font)
+
+    total = sum(daily.get(day, 0) for day, _, _ in cells)
+    bold = QFont(font)
+    bold.setPixelSize(14)
+    bold.setBold(True)
+    painter.setFont(bold)
+    painter.setPen(QColor("#2C3E50"))
+    painter.drawText(QRect(MARGIN, MARGIN, width - 2 * MARGIN, TITLE_HEIGHT),
+                     Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                     f"{title}: {total} мин" if title else f"{total} мин")
+    painter.setFont(font)
+
+    top = MARGIN + TITLE_HEIGHT
+    painter.setPen(QColor("#666666"))
+    for row, name in enumerate(WEEKDAYS):
+        painter.drawText(QRect(MARGIN, top + row * (CELL + SPACING), LABEL_WIDTH, CELL),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, name)
+    left = MARGIN + LABEL_WIDTH
+    border = QColor("#dddddd")
+    for day, row, column in cells:
+        rect = QRect(left + column * (CELL + SPACING), top + row * (CELL + SPACING), CELL, CELL)
+        painter.fillRect(rect, QColor(color_for_minutes(daily.get(day, 0))))
+        painter.setPen(border)
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
+
+    # Легенда, как под сеткой окна статистики
+    legend_top = top + 7 * (CELL + SPACING) + SPACING
+    painter.setPen(QColor("#666666"))
+    x = MARGIN
+    painter.drawText(QRect(x, legend_top, 60, CELL), Qt.AlignmentFlag.AlignVCenter, "Меньше")
+    x += painter.fontMetrics().horizontalAdvance("Меньше") + SPACING
+    for minutes in LEGEND_MINUTES:
+        rect = QRect(x, legend_top, CELL, CELL)
+        painter.fillRect(rect, QColor(color_for_minutes(minutes)))
+        painter.setPen(border)
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
+        x += CELL + SPACING
+    painter.setPen(QColor("#666666"))
+    painter.drawText(QRect(x, legend_top, 60, CELL), Qt.AlignmentFlag.AlignVCenter, "Больше")
+    painter.end()
+    return image
+
+
+def image_name(user: str) -> str:
+    return user.replace('/', '_') + ".png"
+
+
+def render_user(path: str, user: str, out_dir: str, end: date,
+                days: int = config.HEATMAP_DAYS) -> Optional[str]:
+    """Картинка одного участника по его файлу статистики; None при ошибке"""
+    from stats import PomodoroStats
+    from stats_tail import forget
+    try:
+        stats = PomodoroStats(path)
+        daily = stats.get_daily_totals(end - timedelta(days=days - 1), end)
+        forget(path)  # В пакете история каждого файла нужна один раз
+        output = os.path.join(out_dir, image_name(user))
+        if not render_heatmap(daily, end, days, user).save(output, "PNG"):
+            raise OSError(f"не удалось записать {output}")
+        return output
+    except Exception as e:
+        logger.error(f"Ошибка при отрисовке активности {user}: {e}")
+        return None
+
+
+def _render_chunk(jobs: List[tuple]) -> List[Optional[str]]:
+    """Картинки группы участников в процессе-исполнителе"""
+    _ensure_gui()
+    return [render_user(*job) for job in jobs]
+
+
+def render_heatmaps(directory: str, out_dir: str = config.HEATMAP_DIR,
+                    workers: Optional[int] = None, days: int = config.HEATMAP_DAYS,
+                    end: Optional[date] = None) -> List[str]:
+    """
+    Картинки активности всех файлов статистики в папке, по одной на участника.
+
+    Участники делятся на группы, каждая рисуется в отдельном процессе
+    ProcessPoolExecutor со своим QGuiApplication без экрана. При workers=1
+    все рисуется в текущем процессе.
+
+    Returns:
+        пути записанных картинок
+    """
+    from team_report import find_stats_files, unique_user_names
+    end = end or date.today()
+    os.makedirs(out_dir, exist_ok=True)
+    paths = find_stats_files(directory)
+    # Уникальные имена, как в сводке команды: картинки одноименных участников не затирают друг друга
+    jobs = [(path, user, out_dir, end, days)
+            for path, user in zip(paths, unique_user_names(paths, directory))]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 2:
+        results = _render_chunk(jobs)
+    else:
+        chunk_count = min(len(jobs), workers * 4)
+        chunks = [jobs[index::chunk_count] for index in range(chunk_count)]
+        # Qt после fork непригоден, поэтому исполнители запускаются заново (spawn)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = [path for chunk in pool.map(_render_chunk, chunks) for path in chunk]
+    return [path for path in results if path]
+
@@ -0,0 +1,126 @@
+import atexit
+import collections
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import List, Optional
+import config
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_ring_handler: Optional["RingBufferHandler"] = None
+_setup_lock = threading.Lock()
+
+
+class RingBufferHandler(logging.Handler):
+    """Хранит последние N записей в памяти для отчетов о сбоях"""
+
+    def __init__(self, capacity: int = config.LOG_RING_SIZE):
+        super().__init__()
+        self._records = collections.deque(maxlen=max(1, capacity))
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            # deque с maxlen сам вытесняет старые записи, append потокобезопасен
+            self._records.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def get_lines(self) -> List[str]:
+        """Получение сохраненных записей, от старых к новым"""
+        return list(self._records)
+
+
+def setup_logging(level: int = logging.INFO,
+                  log_file: Optional[str] = config.LOG_FILE,
+                  ring_size: int = config.LOG_RING_SIZE,
+                  console: bool = True) -> logging.Logger:
+    """
+    Централизованная настройка логирования.
+
+    Все модули пишут в корневой логгер, который только кладет запись в очередь.
+    Форматирование и вывод (консоль, кольцевой буфер, файл с ротацией)
+    выполняются в отдельном потоке QueueListener, поэтому вызов logger.info()
+    из потока таймера или GUI не блокируется на вводе-выводе.
+
+    Args:
+        level: уровень логирования
+        log_file: путь к файлу лога с ротацией по размеру, None - без файла
+        ring_size: количество последних записей в памяти
+        console: выводить ли записи в консоль
+    """
+    global _listener, _ring_handler
+    root = logging.getLogger()
+    with _setup_lock:
+        if _listener is not None:
+            return root
+
+        formatter = logging.Formatter(config.LOG_FORMAT)
+        handlers = []
+        file_error = None
+
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+
+        _ring_handler = RingBufferHandler(ring_size)
+        _ring_handler.setFormatter(formatter)
+        handlers.append(_ring_handler)
+
+        if log_file:
+            try:
+                file_handler = logging.handlers.RotatingFileHandler(
+                    log_file,
+                    maxBytes=config.LOG_MAX_BYTES,
+                    backupCount=config.LOG_BACKUP_COUNT,
+                    encoding='utf-8',
+                    delay=True
+                )
+                file_handler.setFormatter(formatter)
+                handlers.append(file_handler)
+            except Exception as e:
+                file_error = e
+
+        log_queue = queue.SimpleQueue()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+    if file_error is not None:
+        root.error(f"Не удалось открыть файл лога: {file_error}")
+    return root
+
+
+def shutdown_logging():
+    """Остановка потока логирования с выводом оставшихся записей"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_recent_records() -> List[str]:
+    """Последние записи лога из кольцевого буфера"""
+    if _ring_handler is None:
+        return []
+    return _ring_handler.get_lines()
+
+
+def dump_crash_report(path: str = config.CRASH_REPORT_FILE) -> bool:
+    """Сохранение последних записей лога в файл отчета о сбое"""
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(get_recent_records()))
+            f.write("\n")
+        return True
+    except Exception:
+        return False
@@ -2,28 +2,61 @@ import sys
 import os
 import json
 import random
+import time
 import logging
+import single_instance
+
+if __name__ == '__main__':
+    # Повторный запуск передает команду работающему окну, а команды командной
+    # строки выполняются сразу - без загрузки pygame и Qt
+    _forwarded = single_instance.forward_to_running(sys.argv[1:])
+    if _forwarded is not None:
+        sys.exit(_forwarded)
+    import cli
+    if cli.is_cli_command(sys.argv[1:]):
+        from log_setup import setup_logging
+        setup_logging()
+        sys.exit(cli.main(sys.argv[1:]))
+
 import pygame
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QPushButton, QLabel, QProgressBar, QMessageBox, QHBoxLayout,
                              QDialog)
-from PyQt6.QtCore import Qt, QTimer, QUrl, QSize
+from PyQt6.QtCore import Qt, QTimer, QUrl, QSize, pyqtSignal
 from PyQt6.QtGui import QFont, QPalette, QColor, QCloseEvent, QPixmap, QIcon
 import config
 from pomodoro import PomodoroTimer
 from utils import format_time
 from stats import PomodoroStats
+from log_setup import setup_logging, shutdown_logging, dump_crash_report
+from timer_state import load_snapshot, clear_snapshot
+from timer_trace import open_recorder
+from event_bus import EVERY, LATEST
+from team_sync import TeamHost, TeamClient, parse_address
+from goals import GoalTracker, GoalForecast, schedule_capacity
+from memory_profile import MemoryProfiler
+from stall_watchdog import StallWatchdog
+from countdown_widget import CountdownDisplay
+import theme
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class PomodoroApp(QMainWindow):
+    # Смена состояния таймера может прийти из потока таймера,
+    # а QTimer можно перезапускать только в потоке GUI
+    _timer_state_changed = pyqtSignal()
+    # Сообщения ведущего командной сессии приходят из потока сокета
+    _team_message = pyqtSignal(dict)
+    # События шины таймера доставляются в своих потоках и переносятся в поток GUI
+    _tick_event = pyqtSignal(int)
+    _state_event = pyqtSignal(str)
+    # Команды повторных запусков приходят из потока сервера экземпляра
+    _remote_command = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle(config.WINDOW_TITLE)
+        self.setObjectName(theme.MAIN_WINDOW)
         self.setFixedSize(config.WINDOW_WIDTH, config.WINDOW_HEIGHT)
         
         # Устанавливаем иконку приложения
@@ -33,32 +66,62 @@ class PomodoroApp(QMainWindow):
         # Флаг для отслеживания состояния звука
         self.sound_enabled = True
         
+        # Диагностика памяти включается переменной окружения POMODORO_MEMORY_PROFILE
+        self.memory = MemoryProfiler() if config.MEMORY_PROFILE else None
+        # Поиск зависаний окна включается переменной окружения POMODORO_STALL_REPORT;
+        # запускается до загрузки звука и статистики, чтобы видеть и медленный запуск
+        self.stall_watchdog = StallWatchdog(config.STALL_REPORT) if config.STALL_REPORT else None
+        if self.stall_watchdog:
+            self.stall_watchdog.start()
+        self._phases_seen = 0
+        
         try:
             self.stats = PomodoroStats()
+            self.stats.recover()
+            self.goals = GoalTracker(self.stats)
             self.timer = PomodoroTimer(
-                on_tick=self._safe_update_timer_display,
-                on_state_change=self._safe_handle_state_change
+                state_file=config.TIMER_STATE_FILE,
+                recorder=open_recorder(config.TRACE_FILE)
             )
+            self._tick_event.connect(self._safe_update_timer_display)
+            self._state_event.connect(self._safe_handle_state_change)
+            self.timer.events.subscribe('tick', lambda status: self._tick_event.emit(status.time_left),
+                                        LATEST, name='gui_tick')
+            self.timer.events.subscribe('state', lambda event: self._state_event.emit(event.name),
+                                        EVERY, name='gui_state')
             
             # Инициализация pygame для звука
             pygame.mixer.init()
             self.notification_sound = pygame.mixer.Sound(config.NOTIFICATION_SOUND)
             self.timer_end_sound = pygame.mixer.Sound(config.TIMER_END_SOUND)
             
-            # Таймер для обновления UI
-            self.ui_timer = QTimer()
-            self.ui_timer.timeout.connect(self._update_ui)
-            self.ui_timer.start(100)  # Обновляем UI каждые 100 мс
+            # Пробуждения потока GUI по источникам для замера частоты в простое;
+            # плавная полоса табло, поток таймера и сторож зависаний считают свои
+            self.wakeups = {'tick': 0, 'autosave': 0}
+            self._started_at = time.monotonic()
             
-            # Таймер для автосохранения
+            # Таймер для автосохранения: работает только во время рабочей фазы
             self.auto_save_timer = QTimer()
             self.auto_save_timer.timeout.connect(self._safe_save_progress)
-            self.auto_save_timer.start(60000)  # Сохраняем каждую минуту
+            self._autosave_remaining_ms = 0
+            
+            self._timer_state_changed.connect(self._reschedule_timers)
+            
+            self.team_host = None
+            self.team_client = None
+            self.instance_server = None
+            self.theme_name = None
             
             self.init_ui()
             # Загружаем пользовательские настройки после инициализации UI
             self.load_user_settings()
+            self._start_team_session()
+            self.stats.compact_in_background()
+            if not self.team_client:
+                self._offer_resume()
             logger.info("Приложение успешно инициализировано")
+            if self.memory:
+                self.memory.checkpoint("startup")
             
         except Exception as e:
             logger.error(f"Ошибка при инициализации приложения: {e}")
@@ -78,7 +141,7 @@ class PomodoroApp(QMainWindow):
             # Кнопка настроек (абсолютное позиционирование слева)
             self.settings_button = QPushButton(central_widget)
             self.settings_button.setFixedSize(32, 32)
-            self.settings_button.setStyleSheet(config.SOUND_BUTTON_STYLE)  # Используем тот же стиль
+            theme.set_role(self.settings_button, theme.ROLE_ICON)  # Тот же стиль, что у кнопки звука
             self.settings_button.setIcon(QIcon(config.SETTINGS_IMAGE))
             self.settings_button.setIconSize(QSize(28, 28))
             self.settings_button.clicked.connect(self.show_settings)
@@ -87,7 +150,7 @@ class PomodoroApp(QMainWindow):
             # Кнопка звука (абсолютное позиционирование справа)
             self.sound_button = QPushButton(central_widget)
             self.sound_button.setFixedSize(32, 32)
-            self.sound_button.setStyleSheet(config.SOUND_BUTTON_STYLE)
+            theme.set_role(self.sound_button, theme.ROLE_ICON)
             self.sound_button.clicked.connect(self.toggle_sound)
             self._update_sound_button_icon()
             self.sound_button.move(self.width() - 52, 10)  # 20px отступ справа + 32px ширина
@@ -101,16 +164,8 @@ class PomodoroApp(QMainWindow):
 
             # Таймер
             initial_time = self.timer.work_time if hasattr(self, 'timer') else config.DEFAULT_WORK_TIME * 60
-            self.time_label = QLabel(format_time(initial_time))
-            self.time_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.time_label.setStyleSheet("""
-                QLabel {
-                    font-size: 72px;
-                    font-weight: bold;
-                    color: #2C3E50;
-                    padding: 10px 0;
-                }
-            """)
+            # Табло рисует цифры из готового атласа, а не через движок стилей QLabel
+            self.time_label = CountdownDisplay(format_time(initial_time))
             layout.addWidget(self.time_label)
 
             # Прогресс бар
@@ -123,7 +178,9 @@ class PomodoroApp(QMainWindow):
             self.progress_bar.setMinimum(0)
             self.progress_bar.setMaximum(config.DEFAULT_WORK_TIME * 60)
             self.progress_bar.setValue(0)
-            self.progress_bar.setStyleSheet(config.PROGRESS_BAR_PAUSE_STYLE)
+            # Цвет полосы по фазе задается свойством, правила - в общей таблице стилей темы
+            self.progress_bar.setObjectName(theme.PHASE_BAR)
+            self.progress_bar.setProperty('phase', theme.PHASE_PAUSE)
             self.progress_bar.setTextVisible(True)
             self.progress_bar.setFormat("%p%")
             progress_layout.addWidget(self.progress_bar)
@@ -139,20 +196,20 @@ class PomodoroApp(QMainWindow):
             # Кнопка Старт/Продолжить
             self.start_button = QPushButton("Начать")
             self.start_button.clicked.connect(self.toggle_timer)
-            self.start_button.setStyleSheet(config.BUTTON_STYLE)
+            theme.set_role(self.start_button, theme.ROLE_ACTION)
             buttons_layout.addWidget(self.start_button)
 
             # Кнопка Статистика
             self.stats_button = QPushButton("Статистика")
             self.stats_button.clicked.connect(self.show_stats)
-            self.stats_button.setStyleSheet(config.BUTTON_STYLE)
+            theme.set_role(self.stats_button, theme.ROLE_ACTION)
             buttons_layout.addWidget(self.stats_button)
 
             # Кнопка Стоп
             self.stop_button = QPushButton("Стоп")
             self.stop_button.clicked.connect(self.stop_timer)
             self.stop_button.setEnabled(False)
-            self.stop_button.setStyleSheet(config.BUTTON_STYLE)
+            theme.set_role(self.stop_button, theme.ROLE_ACTION)
             buttons_layout.addWidget(self.stop_button)
 
             layout.addWidget(buttons_widget)
@@ -165,16 +222,17 @@ class PomodoroApp(QMainWindow):
 
             self.status_label = QLabel("Готов к работе")
             self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.status_label.setStyleSheet(config.LABEL_STYLE)
+            theme.set_role(self.status_label, theme.ROLE_INFO)
             info_layout.addWidget(self.status_label)
 
             self.stats_label = QLabel()
             self.stats_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.stats_label.setStyleSheet(config.LABEL_STYLE)
+            theme.set_role(self.stats_label, theme.ROLE_INFO)
             self.update_stats_display()
             info_layout.addWidget(self.stats_label)
 
             layout.addWidget(info_widget)
+            self.apply_theme(config.DEFAULT_THEME)
 
             # Обработчик изменения размера окна для кнопки звука
             self.resizeEvent = self.on_resize
@@ -204,14 +262,84 @@ class PomodoroApp(QMainWindow):
                     self.timer.short_break = settings.get("short_break", config.DEFAULT_SHORT_BREAK) * 60
                     self.timer.long_break = settings.get("long_break", config.DEFAULT_LONG_BREAK) * 60
                     self.timer.rounds = settings.get("rounds", config.DEFAULT_ROUNDS)
+                    self.timer.plan = settings.get("plan") or None
+                    self.goals.daily_goal = settings.get("daily_goal", config.DEFAULT_DAILY_GOAL)
+                    self.goals.weekly_goal = settings.get("weekly_goal", config.DEFAULT_WEEKLY_GOAL)
+                    self.apply_theme(settings.get("theme", config.DEFAULT_THEME))
+                    self.update_stats_display()
                     # Обновляем максимальное значение прогресс-бара и время
-                    initial_time = settings.get("work_time", config.DEFAULT_WORK_TIME) * 60
+                    initial_time = self.timer.work_phase_length()
                     self.progress_bar.setMaximum(initial_time)
                     self.progress_bar.setValue(0)  # Сбрасываем прогресс
                     self.time_label.setText(format_time(initial_time))
         except Exception as e:
             logger.error(f"Ошибка при загрузке настроек: {e}")
 
+    def _offer_resume(self):
+        """Предложение продолжить фазу, прерванную сбоем или перезагрузкой"""
+        try:
+            snapshot = load_snapshot(config.TIMER_STATE_FILE)
+            if snapshot is None:
+                return
+            time_left = snapshot.time_left()
+            if time_left <= 0:
+                clear_snapshot(config.TIMER_STATE_FILE)
+                return
+            phase = "работы" if snapshot.is_work else "перерыва"
+            answer = QMessageBox.question(
+                self, "Восстановление таймера",
+                f"Таймер был прерван во время {phase} "
+                f"(осталось {format_time(time_left)}).\nПродолжить с того же места?"
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                clear_snapshot(config.TIMER_STATE_FILE)
+                return
+            self.timer.restore(snapshot)
+            self.progress_bar.setMaximum(snapshot.phase_length)
+            state = self.timer.state
+            self.progress_bar.setValue(state.time_left)
+            self.time_label.setText(format_time(state.time_left))
+            self.start_button.setText("Продолжить" if snapshot.paused else "Пауза")
+            self.stop_button.setEnabled(True)
+        except Exception as e:
+            logger.error(f"Ошибка при восстановлении таймера: {e}")
+
+    def _start_team_session(self):
+        """Запуск командной сессии ведущим или участником по настройкам окружения"""
+        try:
+            if config.TEAM_JOIN:
+                host, port = parse_address(config.TEAM_JOIN)
+                self._team_message.connect(self._apply_team_message)
+                self.team_client = TeamClient(host, port, on_message=self._team_message.emit)
+                self.team_client.start()
+                # Таймером участника управляет ведущий
+                self.start_button.setEnabled(False)
+                self.stop_button.setEnabled(False)
+                self.status_label.setText("Ожидание ведущего...")
+            elif config.TEAM_SERVE:
+                self.team_host = TeamHost(*parse_address(config.TEAM_SERVE))
+                self.team_host.start()
+                self.team_host.publish(self.timer)
+                self.timer.events.subscribe(
+                    'state', lambda event: self.team_host.publish(self.timer, event.status),
+                    EVERY, name='team_host')
+        except Exception as e:
+            logger.error(f"Ошибка при запуске командной сессии: {e}")
+
+    def _apply_team_message(self, message: dict):
+        """Подстройка таймера участника под сообщение ведущего"""
+        try:
+            work_time, short_break, long_break, rounds = message['durations']
+            self.timer.work_time, self.timer.short_break = work_time, short_break
+            self.timer.long_break, self.timer.rounds = long_break, rounds
+            self.timer.plan = message.get('plan')
+            self.timer.follow(message['phase'], message['left'],
+                              paused=message['paused'], running=message['running'])
+            self.start_button.setEnabled(False)
+            self.stop_button.setEnabled(False)
+        except Exception as e:
+            logger.error(f"Ошибка при обработке сообщения ведущего: {e}")
+
     def show_settings(self):
         """Показать окно настроек"""
         try:
@@ -221,7 +349,7 @@ class PomodoroApp(QMainWindow):
                 # Перезагружаем настройки
                 self.load_user_settings()
                 # Если таймер остановлен, обновляем отображение
-                if not self.timer.is_running:
+                if not self.timer.state.is_running:
                     self.stop_timer()
         except Exception as e:
             logger.error(f"Ошибка при отображении окна настроек: {e}")
@@ -239,9 +367,13 @@ class PomodoroApp(QMainWindow):
 
     def _safe_update_timer_display(self, time_left: int):
         """Безопасное обновление отображения таймера"""
+        self.wakeups['tick'] += 1
         try:
             self.time_label.setText(format_time(time_left))
             self.progress_bar.setValue(time_left)
+            if config.COUNTDOWN_SMOOTH_PROGRESS:
+                state = self.timer.state
+                self.time_label.set_progress(state.time_left, state.phase_length, state.last_tick_at)
         except Exception as e:
             logger.error(f"Ошибка при обновлении дисплея: {e}")
 
@@ -256,6 +388,7 @@ class PomodoroApp(QMainWindow):
     def _safe_handle_state_change(self, state: str):
         """Безопасная обработка изменения состояния"""
         try:
+            self._timer_state_changed.emit()
             # Воспроизводим звук при смене состояния
             if self.sound_enabled:
                 if state in ['break', 'long_break']:
@@ -263,19 +396,24 @@ class PomodoroApp(QMainWindow):
                 else:
                     self.notification_sound.play()
             
+            if self.memory and state in ('work', 'break', 'long_break'):
+                self._phases_seen += 1
+                if self._phases_seen % config.MEMORY_PROFILE_PHASES == 0:
+                    self.memory.checkpoint(f"phases_{self._phases_seen}")
+            
             if state == 'work':
                 self.status_label.setText("Время работать!")
-                self.progress_bar.setMaximum(self.timer.work_time)
+                self.progress_bar.setMaximum(self.timer.phase_length)
                 self._set_color_theme('work')
                 self._set_image(random.choice(config.WORK_IMAGES))
             elif state == 'break':
                 self.status_label.setText("Время отдыхать!")
-                self.progress_bar.setMaximum(self.timer.short_break)
+                self.progress_bar.setMaximum(self.timer.phase_length)
                 self._set_color_theme('break')
                 self._set_image(random.choice(config.PAUSE_IMAGES))
             elif state == 'long_break':
                 self.status_label.setText("Большой перерыв!")
-                self.progress_bar.setMaximum(self.timer.long_break)
+                self.progress_bar.setMaximum(self.timer.phase_length)
                 self._set_color_theme('long_break')
                 self._set_image(random.choice(config.PAUSE_IMAGES))
             elif state == 'pause':
@@ -284,7 +422,8 @@ class PomodoroApp(QMainWindow):
             elif state == 'stop':
                 self.status_label.setText("Готов к работе")
                 self.start_button.setText("Начать")
-                self.start_button.setEnabled(True)
+                # Таймером участника командной сессии управляет ведущий
+                self.start_button.setEnabled(self.team_client is None)
                 self.stop_button.setEnabled(False)
                 self._set_color_theme('pause')
                 self._set_image(config.STOP_IMAGE)
@@ -297,30 +436,80 @@ class PomodoroApp(QMainWindow):
     def _set_color_theme(self, state: str):
         """Установка цветовой темы"""
         try:
-            if state == 'work':
-                self.progress_bar.setStyleSheet(config.PROGRESS_BAR_WORK_STYLE)
-            elif state in ['break', 'long_break']:
-                self.progress_bar.setStyleSheet(config.PROGRESS_BAR_BREAK_STYLE)
-            else:  # pause or stop
-                self.progress_bar.setStyleSheet(config.PROGRESS_BAR_PAUSE_STYLE)
+            # Только смена свойства: таблица стилей не разбирается заново
+            theme.set_phase(self.progress_bar, theme.phase_for_state(state))
         except Exception as e:
             logger.error(f"Ошибка при установке цветовой темы: {e}")
 
-    def _update_ui(self):
-        """Обновление UI"""
+    def apply_theme(self, name: str):
+        """Светлая или темная тема: одна таблица стилей на приложение"""
+        try:
+            if name == self.theme_name:
+                return
+            theme.apply_theme(QApplication.instance(), name)
+            # Табло рисуется из атласа и цвет берет не из таблицы стилей
+            self.time_label.setColor(theme.colors(name)['text'])
+            self.theme_name = name
+        except Exception as e:
+            logger.error(f"Ошибка при установке темы оформления: {e}")
+
+    def _schedule_autosave(self):
+        """Автосохранение идет только во время рабочей фазы, на паузе остаток интервала сохраняется"""
+        try:
+            state = self.timer.state
+            working = state.is_running and state.is_work and not state.is_paused
+            if working and not self.auto_save_timer.isActive():
+                self.auto_save_timer.start(self._autosave_remaining_ms or config.AUTOSAVE_INTERVAL_MS)
+            elif not working and self.auto_save_timer.isActive():
+                paused = state.is_running and state.is_paused
+                self._autosave_remaining_ms = self.auto_save_timer.remainingTime() if paused else 0
+                self.auto_save_timer.stop()
+        except Exception as e:
+            logger.error(f"Ошибка при планировании автосохранения: {e}")
+
+    def _reschedule_timers(self):
+        """Пересчет расписания пробуждений после смены состояния таймера"""
+        self._schedule_autosave()
+        self._schedule_countdown()
+
+    def _schedule_countdown(self):
+        """Плавная полоса под табло работает только во время отсчета"""
         try:
-            if self.timer.is_running and not self.timer.is_paused:
-                # Обновляем время
-                self.time_label.setText(format_time(self.timer.time_left))
-                # Обновляем прогресс-бар
-                self.progress_bar.setValue(self.timer.time_left)
+            state = self.timer.state
+            self.time_label.set_progress(state.time_left, state.phase_length, state.last_tick_at)
+            self.time_label.set_smooth(config.COUNTDOWN_SMOOTH_PROGRESS
+                                       and state.is_running and not state.is_paused)
         except Exception as e:
-            logger.error(f"Ошибка при обновлении UI: {e}")
+            logger.error(f"Ошибка при планировании полосы табло: {e}")
+
+    def wakeup_sources(self) -> dict:
+        """Число пробуждений по каждому источнику с запуска"""
+        sources = dict(self.wakeups)
+        sources['countdown'] = self.time_label.smooth_frames
+        sources['timer_thread'] = self.timer.wakeups
+        if self.stall_watchdog:
+            sources['stall_heartbeat'] = self.stall_watchdog.beats
+        return sources
+
+    @property
+    def wakeup_count(self) -> int:
+        return sum(self.wakeup_sources().values())
+
+    def get_wakeup_rate(self) -> float:
+        """Частота пробуждений по всем источникам, в час"""
+        elapsed = max(time.monotonic() - self._started_at, 1e-6)
+        return self.wakeup_count / elapsed * 3600
 
     def _safe_save_progress(self):
         """Безопасное сохранение прогресса"""
+        if self.sender() is self.auto_save_timer:
+            self.wakeups['autosave'] += 1
+            # Первый запуск после паузы мог быть на остаток интервала
+            self._autosave_remaining_ms = 0
+            self.auto_save_timer.setInterval(config.AUTOSAVE_INTERVAL_MS)
         try:
-            if self.timer.is_work and not self.timer.is_paused and self.timer.is_running:
+            state = self.timer.state
+            if state.is_work and not state.is_paused and state.is_running:
                 # Сохраняем только одну минуту за каждый вызов
                 self.stats.add_session(1)
                 self.update_stats_display()
@@ -362,7 +551,7 @@ class PomodoroApp(QMainWindow):
         try:
             self.timer.stop()
             # Сбрасываем UI, используя текущее значение времени работы
-            initial_time = self.timer.work_time  # Используем установленное время работы
+            initial_time = self.timer.work_phase_length()  # Длительность работы по расписанию
             self.time_label.setText(format_time(initial_time))
             self.progress_bar.setMaximum(initial_time)
             self.progress_bar.setValue(0)
@@ -382,7 +571,14 @@ class PomodoroApp(QMainWindow):
         try:
             from stats_window import StatsWindow
             stats_window = StatsWindow(config.STATS_FILE)
+            if self.memory:
+                self.memory.checkpoint("stats_open")
             stats_window.exec()
+            if self.memory:
+                # Закрытое окно должно освободиться вместе с сеткой квадратиков
+                self.memory.expect_released(stats_window, 'StatsWindow')
+                del stats_window
+                self.memory.checkpoint("stats_closed")
         except Exception as e:
             logger.error(f"Ошибка при отображении статистики: {e}")
             QMessageBox.critical(self, "Ошибка", "Не удалось открыть статистику")
@@ -393,13 +589,36 @@ class PomodoroApp(QMainWindow):
             today_minutes = self.stats.get_today_stats()
             total_stats = self.stats.get_total_stats()
             
-            self.stats_label.setText(
-                f"Сегодня: {today_minutes} мин\n"
+            lines = [
+                f"Сегодня: {today_minutes} мин",
                 f"Всего: {today_minutes} мин ({total_stats['total_sessions']} сессий)"
-            )
+            ]
+            lines.extend(self._goal_lines())
+            self.stats_label.setText("\n".join(lines))
         except Exception as e:
             logger.error(f"Ошибка при обновлении статистики: {e}")
 
+    def _goal_lines(self) -> list:
+        """Строки прогресса к целям дня и недели с прогнозом"""
+        try:
+            capacity = schedule_capacity(self.timer)
+            lines = []
+            if self.goals.daily_goal > 0:
+                lines.append(self._format_goal("Цель дня", self.goals.forecast_day(capacity)))
+            if self.goals.weekly_goal > 0:
+                lines.append(self._format_goal("Цель недели", self.goals.forecast_week(capacity)))
+            return lines
+        except Exception as e:
+            logger.error(f"Ошибка при расчете прогноза цели: {e}")
+            return []
+
+    @staticmethod
+    def _format_goal(title: str, forecast: GoalForecast) -> str:
+        text = f"{title}: {forecast.done}/{forecast.goal} мин"
+        if forecast.reached:
+            return text + " ✓"
+        return text + f", прогноз {forecast.expected:.0f} ({forecast.probability:.0%})"
+
     def toggle_sound(self):
         """Включение/выключение звука"""
         try:
@@ -417,19 +636,83 @@ class PomodoroApp(QMainWindow):
         except Exception as e:
             logger.error(f"Ошибка при обновлении иконки звука: {e}")
 
+    def serve_instance(self):
+        """Прием команд от повторных запусков приложения"""
+        server = single_instance.running_server()
+        if server is None:
+            sock = single_instance.claimed_socket()
+            if sock is None:
+                logger.warning("Порт единственного экземпляра занят, команды запусков не принимаются")
+                return
+            server = single_instance.InstanceServer(sock)
+        self._remote_command.connect(self._apply_remote_command)
+        self.instance_server = server
+        # Команды, пришедшие, пока окно загружалось
+        for command in server.set_handler(self._handle_remote_command):
+            self._handle_remote_command(command)
+
+    def _handle_remote_command(self, command: str) -> dict:
+        """Ответ повторному запуску; вызывается в потоке сервера"""
+        if command == 'stats':
+            return {'ok': True, 'text': single_instance.format_stats(self.stats, self.timer.state)}
+        if command != 'show' and self.team_client:
+            return {'ok': False, 'text': "Таймером управляет ведущий командной сессии"}
+        self._remote_command.emit(command)
+        return {'ok': True, 'text': ""}
+
+    def _apply_remote_command(self, command: str):
+        """Выполнение команды повторного запуска в потоке GUI"""
+        try:
+            if command in ('show', 'start'):
+                self.showNormal()
+                self.raise_()
+                self.activateWindow()
+            button = self.start_button.text()
+            if command == 'start' and button in ("Начать", "Продолжить"):
+                self.toggle_timer()
+            elif command == 'pause' and button == "Пауза":
+                self.toggle_timer()
+            elif command == 'stop' and self.timer.state.is_running:
+                self.stop_timer()
+        except Exception as e:
+            logger.error(f"Ошибка при выполнении команды другого запуска: {e}")
+
     def closeEvent(self, event: QCloseEvent):
         """Обработка закрытия приложения"""
         try:
+            sources = ", ".join(f"{name} {count}" for name, count in self.wakeup_sources().items())
+            logger.info(f"Пробуждений по таймерам: {self.wakeup_count} "
+                        f"({self.get_wakeup_rate():.0f} в час): {sources}")
+            for name, counters in self.timer.events.counters().items():
+                logger.info(f"Подписчик {name}: {counters}")
+            # События таймера доставляются асинхронно и могут прийти после закрытия mixer
+            self.sound_enabled = False
             pygame.mixer.quit()  # Закрываем pygame mixer при выходе
             self._safe_save_progress()  # Сохраняем прогресс перед закрытием
-            if self.timer.is_running:
+            if self.timer.state.is_running:
                 self.stop_timer()
+            self.timer.finish_trace()
+            if self.team_host:
+                self.team_host.stop()
+            if self.team_client:
+                self.team_client.stop()
+            if self.memory:
+                self.memory.checkpoint("exit")
+                self.memory.save_report(config.MEMORY_PROFILE)
+                logger.info(f"Отчет о памяти сохранен: {config.MEMORY_PROFILE}")
+            if self.stall_watchdog:
+                self.stall_watchdog.stop()
+                logger.info(f"Зависания окна за сеанс:\n{self.stall_watchdog.summary()}")
+            self.timer.events.close()
+            if self.instance_server:
+                self.instance_server.close()
             event.accept()
         except Exception as e:
             logger.error(f"Ошибка при закрытии приложения: {e}")
             event.accept()  # Принимаем событие закрытия даже при ошибке
 
 def main():
+    setup_logging()
     try:
         app = QApplication(sys.argv)
         
@@ -439,9 +722,14 @@ def main():
         
         window = PomodoroApp()
         window.show()
+        window.serve_instance()
+        if sys.argv[1:2] == ['start']:
+            window.toggle_timer()
         sys.exit(app.exec())
     except Exception as e:
         logger.critical(f"Критическая ошибка приложения: {e}")
+        shutdown_logging()  # Дожидаемся записи всех сообщений из очереди
+        dump_crash_report()
         sys.exit(1)
 
 if __name__ == '__main__':
@@ -0,0 +1,168 @@
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from typing import Dict, List, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+TIMER_THREAD_NAME = "pomodoro-timer"
+# Служебные аллокации самого профилирования и импорта не интересны
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def current_rss() -> Optional[int]:
+    """Текущий размер резидентной памяти процесса в байтах (None, если недоступен)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _Counters(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+                    (name, ctypes.c_size_t) for name in (
+                        'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage',
+                        'QuotaPagedPoolUsage', 'QuotaPeakNonPagedPoolUsage',
+                        'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+
+            counters = _Counters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters),
+                                                        counters.cb):
+                return counters.WorkingSetSize
+        except Exception:
+            pass
+    return None
+
+
+class Checkpoint:
+    """Снимок памяти в заданной точке работы приложения"""
+    __slots__ = ('label', 'snapshot', 'traced', 'rss', 'alive', 'at')
+
+    def __init__(self, label: str, snapshot: tracemalloc.Snapshot, traced: int,
+                 rss: Optional[int], alive: Dict[str, int]):
+        self.label = label
+        self.snapshot = snapshot
+        self.traced = traced  # Байт в объектах Python по tracemalloc
+        self.rss = rss
+        self.alive = alive    # Число живых отслеживаемых объектов по видам
+        self.at = time.monotonic()
+
+
+class MemoryProfiler:
+    """
+    Диагностика памяти: снимки tracemalloc в ключевых точках и поиск утечек.
+
+    tracemalloc видит только аллокации Python; память Qt, SDL и пиксмапов
+    попадает лишь в RSS, поэтому в каждой точке записываются оба значения.
+    Объекты, которые должны освобождаться (окна статистики), регистрируются
+    через expect_released и проверяются слабыми ссылками после gc.
+    """
+
+    def __init__(self, frames: int = config.MEMORY_PROFILE_FRAMES):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.checkpoints: List[Checkpoint] = []
+        self._watched: Dict[str, weakref.WeakSet] = {}
+        self._expected: List[tuple] = []  # (вид, слабая ссылка, точка, после которой объект лишний)
+
+    def watch(self, obj, kind: Optional[str] = None):
+        """Учет объекта в счетчиках живых объектов по виду"""
+        kind = kind or type(obj).__name__
+        self._watched.setdefault(kind, weakref.WeakSet()).add(obj)
+
+    def expect_released(self, obj, kind: Optional[str] = None):
+        """Объект больше не нужен: если он переживет следующую сборку мусора - это утечка"""
+        kind = kind or type(obj).__name__
+        self.watch(obj, kind)
+        label = self.checkpoints[-1].label if self.checkpoints else "start"
+        self._expected = [entry for entry in self._expected if entry[1]() is not None]
+        self._expected.append((kind, weakref.ref(obj), label))
+
+    def checkpoint(self, label: str) -> Checkpoint:
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        # Сумма по снимку, а не get_traced_memory: в ней учтены и прошлые снимки
+        traced = sum(trace.size for trace in snapshot.traces)
+        alive = {kind: len(objects) for kind, objects in self._watched.items()}
+        alive['timer_threads'] = sum(1 for thread in threading.enumerate()
+                                     if thread.name == TIMER_THREAD_NAME)
+        point = Checkpoint(label, snapshot, traced, current_rss(), alive)
+        self.checkpoints.append(point)
+        logger.info(f"Память [{label}]: Python {traced / 1048576:.1f} МБ, "
+                    f"RSS {_format_mb(point.rss)}, объекты {alive}")
+        return point
+
+    def leaks(self) -> List[str]:
+        """Описание объектов и потоков, которые должны были освободиться"""
+        gc.collect()
+        found = []
+        for kind, ref, label in self._expected:
+            obj = ref()
+            if obj is not None:
+                referrers = [type(r).__name__ for r in gc.get_referrers(obj)
+                             if r is not self._expected][:5]
+                found.append(f"{kind} жив после '{label}', ссылаются: {', '.join(referrers)}")
+        self._expected = [entry for entry in self._expected if entry[1]() is not None]
+        timer_threads = [thread for thread in threading.enumerate()
+                         if thread.name == TIMER_THREAD_NAME]
+        if len(timer_threads) > 1:
+            # Живой поток таймера может быть только один, остальные не вышли после stop()
+            found.append(f"Потоков таймера: {len(timer_threads)}, ожидался один")
+        return found
+
+    def growth(self, start: int = 0, end: int = -1, top: int = 10) -> List[str]:
+        """Строки кода с наибольшим ростом памяти между двумя точками"""
+        first, last = self.checkpoints[start], self.checkpoints[end]
+        diff = last.snapshot.compare_to(first.snapshot, 'lineno')
+        return [str(stat) for stat in diff[:top] if stat.size_diff > 0]
+
+    def report(self, top: int = 10) -> str:
+        """Текстовый отчет: точки, крупнейшие аллокации, рост между точками и утечки"""
+        if not self.checkpoints:
+            return "Снимков памяти нет"
+        lines = ["Точки:"]
+        for point in self.checkpoints:
+            lines.append(f"  {point.label}: Python {point.traced / 1048576:.1f} МБ, "
+                         f"RSS {_format_mb(point.rss)}, {point.alive}")
+        lines.append(f"Крупнейшие аллокации [{self.checkpoints[-1].label}]:")
+        for stat in self.checkpoints[-1].snapshot.statistics('lineno')[:top]:
+            lines.append(f"  {stat}")
+        for index in range(1, len(self.checkpoints)):
+            growth = self.growth(index - 1, index, top)
+            if growth:
+                lines.append(f"Рост {self.checkpoints[index - 1].label} -> "
+                             f"{self.checkpoints[index].label}:")
+                lines.extend(f"  {line}" for line in growth)
+        leaks = self.leaks()
+        lines.append("Утечки:" if leaks else "Утечек не найдено")
+        lines.extend(f"  {leak}" for leak in leaks)
+        return "\n".join(lines)
+
+    def save_report(self, path: str, top: int = 10):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.report(top) + "\n")
+
+    def stop(self):
+        tracemalloc.stop()
+
+
+def _format_mb(size: Optional[int]) -> str:
+    return f"{size / 1048576:.1f} МБ" if size is not None else "нет данных"
+
@@ -1,14 +1,15 @@
+import math
 import threading
 import time
 import logging
 from typing import Callable, Optional
 from utils import play_sound, send_notification
+from timer_state import TimerSnapshot, TimerStatus, TimerEvent, save_snapshot, clear_snapshot
+from timer_trace import TraceRecorder
+from schedule import Timeline, build_timeline
+from event_bus import EventBus
 from config import DEFAULT_WORK_TIME, DEFAULT_SHORT_BREAK, DEFAULT_LONG_BREAK, DEFAULT_ROUNDS
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class PomodoroTimer:
@@ -18,12 +19,20 @@ class PomodoroTimer:
                  long_break: int = DEFAULT_LONG_BREAK,
                  rounds: int = DEFAULT_ROUNDS,
                  on_tick: Optional[Callable[[int], None]] = None,
-                 on_state_change: Optional[Callable[[str], None]] = None):
+                 on_state_change: Optional[Callable[[str], None]] = None,
+                 state_file: Optional[str] = None,
+                 recorder: Optional[TraceRecorder] = None,
+                 threaded: bool = True,
+                 events: Optional[EventBus] = None):
         
         self.work_time = max(1, work_time) * 60
         self.short_break = max(1, short_break) * 60
         self.long_break = max(1, long_break) * 60
         self.rounds = max(1, rounds)
+        self.plan: Optional[str] = None  # Свое расписание вида "50/10x3, 90/30"
+        self._timeline_key = None
+        self._timeline: Optional[Timeline] = None
+        self.phase_index = 0
         
         self.current_round = 1
         self.time_left = self.work_time
@@ -36,9 +45,32 @@ class PomodoroTimer:
         self._timer_thread = None
         self._stop_event = threading.Event()
         self._error_lock = threading.Lock()
+        # Изменения полей состояния группами под блокировкой; наружу - только TimerStatus
+        self._state_lock = threading.RLock()
+        # На паузе поток таймера ждет возобновления или остановки, а не опрашивает флаг
+        self._state_changed = threading.Condition(self._state_lock)
+        self.wakeups = 0  # Пробуждения потока таймера, для замера частоты пробуждений
+        self._state_version = 0
+        self._status: Optional[TimerStatus] = None
+        # Снимки пишут и поток GUI, и поток таймера: запись по очереди, старое не затирает новое
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_version = 0
         
         self.on_tick = on_tick
         self.on_state_change = on_state_change
+        # Темы: 'tick' (TimerStatus каждую секунду) и 'state' (TimerEvent при переходах)
+        self.events = events or EventBus()
+        self.state_file = state_file
+        self.phase_length = self.time_left
+        self.last_tick_at = time.monotonic()  # Момент последнего уменьшения time_left
+        self._publish_status()
+        self.recorder = recorder
+        # Без потока время двигает вызывающий код через advance() (воспроизведение трасс)
+        self.threaded = threaded
+        self._in_transition = False
+        self._first_tick_delay = 1.0  # Первый сон потока короче секунды при подстройке под ведущего
+        self._trace('init', 'init', durations=[self.work_time, self.short_break,
+                                               self.long_break, self.rounds])
         
         logger.info("PomodoroTimer инициализирован")
 
@@ -53,48 +85,186 @@ class PomodoroTimer:
                 return False
         return True
 
+    @property
+    def timeline(self) -> Timeline:
+        """Скомпилированное расписание; пересобирается только при смене настроек"""
+        key = (self.work_time, self.short_break, self.long_break, self.rounds, self.plan)
+        if key != self._timeline_key:
+            try:
+                self._timeline = build_timeline(*key)
+            except ValueError as e:
+                logger.error(f"Ошибка в расписании, используем классическое: {e}")
+                self._timeline = build_timeline(*key[:4])
+            self._timeline_key = key
+            if self.phase_index >= len(self._timeline):
+                self.phase_index = 0
+        return self._timeline
+
+    @property
+    def phase_kind(self) -> str:
+        """Вид текущей фазы: 'work', 'break' или 'long_break'"""
+        return self.timeline.phases[self.phase_index].kind
+
+    @property
+    def elapsed(self) -> int:
+        """Время от начала цикла расписания до текущего момента, с"""
+        return self.timeline.start_of(self.phase_index) + self.phase_length - self.time_left
+
+    @property
+    def state(self) -> TimerStatus:
+        """Последнее опубликованное состояние; безопасно читать из любого потока"""
+        return self._status
+
+    def _publish_status(self):
+        """Публикация нового неизменяемого состояния; вызывается под _state_lock"""
+        self._state_version += 1
+        self._status = TimerStatus(
+            version=self._state_version,
+            phase_index=self.phase_index,
+            is_work=self.is_work,
+            current_round=self.current_round,
+            phase_length=self.phase_length,
+            time_left=self.time_left,
+            is_running=self.is_running,
+            is_paused=self.is_paused,
+            last_tick_at=self.last_tick_at
+        )
+
+    @property
+    def in_transition(self) -> bool:
+        """Идет смена фазы: промежуточная остановка потока не является командой stop"""
+        return self._in_transition
+
+    def work_phase_length(self) -> int:
+        """Длительность рабочей фазы текущего раунда, с"""
+        timeline = self.timeline
+        return timeline.phases[timeline.work_index(self.current_round)].duration
+
+    def get_trace_state(self) -> dict:
+        """Состояние таймера для записи в трассу и сверки при воспроизведении"""
+        return {'work': self.is_work, 'round': self.current_round, 'left': self.time_left,
+                'running': self.is_running, 'paused': self.is_paused,
+                'phase': self.phase_index}
+
+    def _trace(self, kind: str, name: str, **fields):
+        if self.recorder:
+            if kind == 'cmd':
+                # Внешние команды приходят извне потока таймера и не из перехода между фазами;
+                # только их воспроизведение подает заново
+                fields['ext'] = (not self._in_transition
+                                 and threading.current_thread() is not self._timer_thread)
+            try:
+                self.recorder.record(kind, name, self.get_trace_state(), **fields)
+            except Exception as e:
+                logger.error(f"Ошибка записи трассы: {e}")
+
+    def finish_trace(self):
+        """Запись итогового состояния и закрытие трассы"""
+        if self.recorder:
+            self._trace('end', 'end')
+            self.recorder.close()
+            self.recorder = None
+
     def start_work(self):
         """Запуск рабочего периода"""
-        try:
-            self._error_count = 0  # Сброс счетчика ошибок при новом запуске
-            self.is_work = True
-            self.time_left = self.work_time
-            self._start_timer()
-            if self.on_state_change:
-                try:
-                    self.on_state_change('work')
-                except Exception as e:
-                    self._handle_error(e, "start_work")
-            logger.info("Начат рабочий период")
-        except Exception as e:
-            if not self._handle_error(e, "start_work"):
-                raise
+        self._trace('cmd', 'start_work', durations=[self.work_time, self.short_break,
+                                                     self.long_break, self.rounds],
+                    plan=self.plan)
+        self._error_count = 0  # Сброс счетчика ошибок при новом запуске
+        self._start_phase(self.timeline.work_index(self.current_round), "start_work")
 
     def start_break(self):
-        """Запуск перерыва"""
-        try:
-            self.is_work = False
-            self.time_left = self.long_break if self.current_round >= self.rounds else self.short_break
-            self._start_timer()
-            if self.on_state_change:
+        """Запуск перерыва после рабочей фазы текущего раунда"""
+        timeline = self.timeline
+        self._start_phase(timeline.next_index(timeline.work_index(self.current_round)),
+                          "start_break")
+
+    def seek(self, elapsed: int):
+        """Перемотка на момент расписания без проигрывания промежуточных переходов"""
+        self._trace('cmd', 'seek', elapsed=elapsed)
+        index, time_left = self.timeline.locate(max(0, elapsed))
+        self._start_phase(index, "seek", time_left)
+
+    def skip(self):
+        """Пропуск оставшейся части текущей фазы"""
+        self._trace('cmd', 'skip')
+        self._start_phase(self.timeline.next_index(self.phase_index), "skip")
+
+    def follow(self, phase_index: int, time_left: float, paused: bool = False,
+               running: bool = True):
+        """
+        Подстройка под ведущего командной сессии.
+
+        Остаток приходит с долями секунды: первый тик потока сдвигается так,
+        чтобы смена секунд, а значит и фаз, совпадала с ведущим.
+        """
+        self._trace('cmd', 'follow', phase=phase_index, left=time_left,
+                    paused=paused, running=running)
+        if not running:
+            if self.is_running:
+                self.stop()
+            return
+        index = phase_index % len(self.timeline)
+        whole = max(1, math.ceil(time_left))
+        first_tick = 1.0 if paused else max(0.0, time_left - (whole - 1))
+        if self.is_running and self.phase_index == index:
+            if self.is_paused == paused:
+                if abs(self._local_time_left() - time_left) < 0.25:
+                    return  # Уже идем вровень с ведущим, перезапуск только дернул бы интерфейс
+            else:
+                # Пауза и возобновление внутри фазы - без перезапуска потока
+                with self._state_lock:
+                    self.time_left = whole
+                    self._first_tick_delay = first_tick
+                    self._publish_status()
+                self._in_transition = True
                 try:
-                    self.on_state_change('break')
-                except Exception as e:
-                    self._handle_error(e, "start_break")
-            logger.info(f"Начат перерыв")
+                    self.pause() if paused else self.resume()
+                finally:
+                    self._in_transition = False
+                return
+        self._first_tick_delay = first_tick
+        self._start_phase(index, "follow", whole, paused=paused)
+
+    def _local_time_left(self) -> float:
+        """Остаток фазы с долями секунды по моменту последнего тика"""
+        state = self.state
+        if not state.is_running or state.is_paused:
+            return float(state.time_left)
+        return state.time_left - min(1.0, time.monotonic() - state.last_tick_at)
+
+    def _start_phase(self, index: int, context: str, time_left: Optional[int] = None,
+                     paused: bool = False, stop_event: Optional[threading.Event] = None) -> bool:
+        """Запуск фазы расписания по индексу; False если таймер остановлен (stop_event)"""
+        try:
+            phase = self.timeline.phases[index]
+            with self._state_lock:
+                if stop_event is not None and (stop_event.is_set() or not self.is_running):
+                    return False
+                self.phase_index = index
+                self.is_work = phase.is_work
+                self.current_round = phase.round
+                self.phase_length = phase.duration
+                self.time_left = phase.duration if time_left is None else time_left
+                self._start_timer(paused=paused)
+            self._save_state()
+            self._emit_state(context, *((phase.kind, 'pause') if paused else (phase.kind,)))
+            logger.info("Начат рабочий период" if phase.is_work else "Начат перерыв")
+            return True
         except Exception as e:
-            if not self._handle_error(e, "start_break"):
+            if not self._handle_error(e, context):
                 raise
+            return False
 
     def pause(self):
         """Приостановка таймера"""
+        self._trace('cmd', 'pause')
         try:
-            self.is_paused = True
-            if self.on_state_change:
-                try:
-                    self.on_state_change('pause')
-                except Exception as e:
-                    self._handle_error(e, "pause")
+            with self._state_lock:
+                self.is_paused = True
+                self._publish_status()
+            self._save_state()
+            self._emit_state("pause", 'pause')
             logger.info("Таймер приостановлен")
         except Exception as e:
             if not self._handle_error(e, "pause"):
@@ -102,13 +272,15 @@ class PomodoroTimer:
 
     def resume(self):
         """Возобновление таймера"""
+        self._trace('cmd', 'resume')
         try:
-            self.is_paused = False
-            if self.on_state_change:
-                try:
-                    self.on_state_change('work' if self.is_work else 'break')
-                except Exception as e:
-                    self._handle_error(e, "resume")
+            with self._state_lock:
+                self.is_paused = False
+                self.last_tick_at = time.monotonic()
+                self._publish_status()
+                self._state_changed.notify_all()
+            self._save_state()
+            self._emit_state("resume", self.phase_kind)
             logger.info("Таймер возобновлен")
         except Exception as e:
             if not self._handle_error(e, "resume"):
@@ -116,26 +288,120 @@ class PomodoroTimer:
 
     def stop(self):
         """Остановка таймера"""
+        self._trace('cmd', 'stop')
         try:
-            self._stop_event.set()
-            if self._timer_thread and self._timer_thread.is_alive():
+            # Событие меняется в _start_timer под той же блокировкой: останавливаем
+            # именно текущий поток, а не тот, что уже заменен новым
+            with self._state_lock:
+                self._stop_event.set()
+                self._state_changed.notify_all()
+            # При смене фазы старый поток не ждем: у нового потока свое событие остановки,
+            # а ожидание спящего потока задержало бы переход на время join
+            if (self._timer_thread and self._timer_thread.is_alive()
+                    and not self._in_transition
+                    and self._timer_thread is not threading.current_thread()):
                 try:
                     self._timer_thread.join(timeout=0.1)
                 except Exception as e:
                     logger.error(f"Ошибка при остановке потока таймера: {e}")
             
-            self.is_running = False
-            self.is_paused = False
-            if self.on_state_change:
-                try:
-                    self.on_state_change('stop')
-                except Exception as e:
-                    self._handle_error(e, "stop")
+            with self._state_lock:
+                self.is_running = False
+                self.is_paused = False
+                # При смене фазы состояние публикуется один раз, уже с новой фазой
+                if not self._in_transition:
+                    self._publish_status()
+                version = self._state_version
+            self._store_snapshot(version, None)
+            self._emit_state("stop", 'stop')
             logger.info("Таймер остановлен")
         except Exception as e:
             if not self._handle_error(e, "stop"):
                 raise
 
+    def _emit_state(self, context: str, *states: str):
+        """Запись переходов в трассу, публикация в шину событий и вызов on_state_change"""
+        for state in states:
+            self._trace('state', state)
+            # Промежуточная остановка при смене фазы подписчикам шины не нужна
+            if not (state == 'stop' and self._in_transition):
+                self.events.publish('state', TimerEvent(state, self.state))
+        if self.on_state_change:
+            try:
+                for state in states:
+                    self.on_state_change(state)
+            except Exception as e:
+                self._handle_error(e, context)
+
+    def _save_state(self):
+        """Сохранение снимка состояния; вызывается только при переходах, не на каждом тике"""
+        if not self.state_file:
+            return
+        # Поля читаются вместе под блокировкой, как при публикации TimerStatus
+        with self._state_lock:
+            now = time.time()
+            snapshot = TimerSnapshot(
+                is_work=self.is_work,
+                current_round=self.current_round,
+                phase_length=self.phase_length,
+                phase_index=self.phase_index,
+                deadline=None if self.is_paused else now + self.time_left,
+                paused=self.is_paused,
+                remaining=self.time_left,
+                paused_at=now if self.is_paused else None,
+                saved_at=now
+            )
+            version = self._state_version
+        self._store_snapshot(version, snapshot)
+
+    def _store_snapshot(self, version: int, snapshot: Optional[TimerSnapshot]):
+        """
+        Запись снимка или его удаление (snapshot=None) вне блокировки состояния.
+        Снимок состояния старше уже записанного пропускается: иначе поток,
+        опоздавший с fsync, восстановил бы после сбоя устаревшую фазу.
+        """
+        if not self.state_file:
+            return
+        with self._snapshot_lock:
+            if version < self._snapshot_version:
+                return
+            self._snapshot_version = version
+            if snapshot is None:
+                clear_snapshot(self.state_file)
+            else:
+                save_snapshot(self.state_file, snapshot)
+
+    def restore(self, snapshot: TimerSnapshot):
+        """Продолжение фазы из снимка, сохраненного до сбоя"""
+        time_left = snapshot.time_left()
+        self._trace('cmd', 'restore', snapshot=snapshot.to_dict(), time_left=time_left)
+        try:
+            self._error_count = 0
+            with self._state_lock:
+                self.phase_index = self._snapshot_phase_index(snapshot)
+                self.is_work = snapshot.is_work
+                self.current_round = snapshot.current_round
+                self.phase_length = snapshot.phase_length
+                self.time_left = time_left
+                self._start_timer(paused=snapshot.paused)
+            self._save_state()
+            self._emit_state("restore", *((self.phase_kind, 'pause') if self.is_paused
+                                          else (self.phase_kind,)))
+            logger.info(f"Таймер восстановлен: осталось {self.time_left} с (Раунд: {self.current_round})")
+        except Exception as e:
+            if not self._handle_error(e, "restore"):
+                raise
+
+    def _snapshot_phase_index(self, snapshot: TimerSnapshot) -> int:
+        """Индекс фазы из снимка; для старых снимков - по раунду и виду фазы"""
+        timeline = self.timeline
+        index = snapshot.phase_index
+        if (index is not None and 0 <= index < len(timeline)
+                and timeline.phases[index].is_work == snapshot.is_work):
+            return index
+        index = timeline.work_index(snapshot.current_round)
+        return index if snapshot.is_work else timeline.next_index(index)
+
     def get_time_left(self) -> int:
         """Получение оставшегося времени в секундах"""
         try:
@@ -144,45 +410,58 @@ class PomodoroTimer:
             logger.error(f"Ошибка при получении оставшегося времени: {e}")
             return 0
 
-    def next_cycle(self):
-        """Переход к следующему циклу"""
+    def next_cycle(self, stop_event: Optional[threading.Event] = None):
+        """
+        Переход к следующему циклу.
+
+        Поток таймера передает свое событие остановки: если stop() успел
+        между проверкой в потоке и сменой фазы, фаза не запускается.
+        """
+        self._trace('cmd', 'next_cycle')
         try:
-            if self.is_work:
-                if self.current_round >= self.rounds:
-                    self.current_round = 1
-                else:
-                    self.current_round += 1
-                self.start_break()
-            else:
-                self.start_work()
-            logger.info(f"Переход к следующему циклу (Раунд: {self.current_round})")
+            if self._start_phase(self.timeline.next_index(self.phase_index), "next_cycle",
+                                 stop_event=stop_event):
+                logger.info(f"Переход к следующему циклу (Раунд: {self.current_round})")
         except Exception as e:
             if not self._handle_error(e, "next_cycle"):
                 raise
 
-    def _start_timer(self):
+    def _start_timer(self, paused: bool = False):
         """Запуск таймера в отдельном потоке"""
         try:
-            if self.is_running:
-                self.stop()
-            
-            self._stop_event.clear()
-            self.is_running = True
-            self.is_paused = False
+            with self._state_lock:
+                if self.is_running:
+                    self._in_transition = True
+                    try:
+                        self.stop()
+                    finally:
+                        self._in_transition = False
+                
+                # У каждого потока свое событие: старый поток, не успевший выйти
+                # за время join, не продолжит отсчет вместе с новым
+                self._stop_event = threading.Event()
+                self.is_running = True
+                self.is_paused = paused
+                self.last_tick_at = time.monotonic()
+                self._publish_status()
             
-            self._timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
+            if not self.threaded:
+                return
+            self._timer_thread = threading.Thread(target=self._timer_loop, name="pomodoro-timer",
+                                                  args=(self._stop_event,), daemon=True)
             self._timer_thread.start()
             logger.info("Запущен новый поток таймера")
         except Exception as e:
             if not self._handle_error(e, "_start_timer"):
                 raise
 
-    def _timer_loop(self):
+    def _timer_loop(self, stop_event: threading.Event):
         """Основной цикл таймера"""
         error_count = 0
-        while self.time_left > 0 and not self._stop_event.is_set():
+        while self.time_left > 0 and not stop_event.is_set():
             try:
                 if not self.is_paused:
+                    self.events.publish('tick', self.state)
                     if self.on_tick:
                         try:
                             self.on_tick(self.time_left)
@@ -190,24 +469,30 @@ class PomodoroTimer:
                             if not self._handle_error(e, "_timer_loop.on_tick"):
                                 break
                     
-                    time.sleep(1)
-                    self.time_left -= 1
-                    
-                    if self.time_left <= 0:
-                        try:
-                            play_sound()
-                            if self.is_work:
-                                message = "Время работы закончилось!\nНачинается 5-минутный перерыв."
-                            else:
-                                next_session = "25-минутная работа"
-                                message = f"Перерыв закончился!\nНачинается {next_session}."
-                            send_notification("Pomodoro Timer", message)
-                        except Exception as e:
-                            logger.error(f"Ошибка при отправке уведомления: {e}")
-                        self.next_cycle()
+                    delay, self._first_tick_delay = self._first_tick_delay, 1.0
+                    time.sleep(delay)
+                    self.wakeups += 1
+                    # Пауза или остановка во время сна: секунда не засчитывается
+                    with self._state_lock:
+                        if self.is_paused or stop_event.is_set():
+                            continue
+                        finished = self._advance_second()
+                    if finished:
+                        self._notify_phase_end()
+                        # Остановка во время уведомления: следующую фазу не запускаем
+                        with self._state_lock:
+                            if stop_event.is_set() or not self.is_running:
+                                break
+                        # Снимок, статистика и обработчики смены фазы - без блокировки:
+                        # иначе команды из GUI ждали бы их, а обработчик, вызвавший
+                        # таймер из другого потока, зависал бы
+                        self.next_cycle(stop_event)
                         break
                 else:
-                    time.sleep(0.1)
+                    with self._state_lock:
+                        while self.is_paused and not stop_event.is_set():
+                            self._state_changed.wait()
+                    self.wakeups += 1
             except Exception as e:
                 error_count += 1
                 logger.error(f"Ошибка в цикле таймера: {e}")
@@ -217,5 +502,46 @@ class PomodoroTimer:
                     break
                 time.sleep(1)  # Пауза перед следующей попыткой
         
-        self.is_running = False
+        # next_cycle уже мог запустить поток следующей фазы - его состояние не трогаем
+        with self._state_lock:
+            if self._timer_thread is threading.current_thread() and self.is_running:
+                self.is_running = False
+                self._publish_status()
         logger.info("Цикл таймера завершен")
+
+    def _advance_second(self) -> bool:
+        """Уменьшение оставшегося времени на секунду; True если фаза закончилась"""
+        with self._state_lock:
+            self.time_left -= 1
+            self.last_tick_at = time.monotonic()
+            self._publish_status()
+            return self.time_left <= 0
+
+    def _notify_phase_end(self):
+        """Звук и системное уведомление об окончании фазы"""
+        try:
+            play_sound()
+            timeline = self.timeline
+            next_phase = timeline.phases[timeline.next_index(self.phase_index)]
+            minutes = next_phase.duration // 60
+            if self.is_work:
+                message = f"Время работы закончилось!\nНачинается {minutes}-минутный перерыв."
+            else:
+                message = f"Перерыв закончился!\nНачинается {minutes}-минутная работа."
+            send_notification("Pomodoro Timer", message)
+        except Exception as e:
+            logger.error(f"Ошибка при отправке уведомления: {e}")
+
+    def advance(self, seconds: int = 1):
+        """
+        Продвижение таймера без потока на заданное число секунд.
+
+        Используется при threaded=False: время задает вызывающий код
+        (виртуальные часы воспроизведения трасс), уведомления не отправляются.
+        """
+        for _ in range(seconds):
+            if not self.is_running or self.is_paused:
+                return
+            if self._advance_second():
+                self.next_cycle()
+
@@ -0,0 +1,153 @@
+import re
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+WORK = 'work'
+BREAK = 'break'
+LONG_BREAK = 'long_break'
+
+
+class Phase:
+    """Одна фаза расписания: вид, длительность в секундах и номер рабочего раунда"""
+    __slots__ = ('kind', 'duration', 'round')
+
+    def __init__(self, kind: str, duration: int, round: int):
+        self.kind = kind
+        self.duration = duration
+        self.round = round
+
+    @property
+    def is_work(self) -> bool:
+        return self.kind == WORK
+
+    def __repr__(self):
+        return f"Phase({self.kind}, {self.duration}, round={self.round})"
+
+
+class Timeline:
+    """
+    Скомпилированное расписание с накопленными границами фаз.
+
+    Расписание повторяется по кругу. Поиск фазы и остатка времени по
+    прошедшему времени - бинарный поиск по границам, O(log n), поэтому
+    перемотка не требует проигрывать переходы по одному.
+    """
+
+    def __init__(self, phases: List[Phase]):
+        if not phases:
+            raise ValueError("Расписание не содержит фаз")
+        self.phases = phases
+        self.ends = array('q')         # Конец каждой фазы от начала цикла, с
+        self.work_before = array('q')  # Рабочих секунд до конца каждой фазы
+        end = work = 0
+        for phase in phases:
+            end += phase.duration
+            if phase.is_work:
+                work += phase.duration
+            self.ends.append(end)
+            self.work_before.append(work)
+        self.total = end
+        self.work_total = work
+
+    def __len__(self) -> int:
+        return len(self.phases)
+
+    def start_of(self, index: int) -> int:
+        """Начало фазы от начала цикла, с"""
+        return self.ends[index - 1] if index > 0 else 0
+
+    def next_index(self, index: int) -> int:
+        return (index + 1) % len(self.phases)
+
+    def locate(self, elapsed: int) -> Tuple[int, int]:
+        """
+        Фаза и остаток времени по времени от начала расписания.
+
+        Returns:
+            (индекс фазы, оставшиеся секунды фазы)
+        """
+        offset = elapsed % self.total
+        index = bisect_right(self.ends, offset)
+        return index, self.ends[index] - offset
+
+    def work_index(self, round: int) -> int:
+        """Индекс рабочей фазы раунда (первая рабочая фаза, если раунда нет)"""
+        first_work = None
+        for index, phase in enumerate(self.phases):
+            if phase.is_work:
+                if phase.round == round:
+                    return index
+                if first_work is None:
+                    first_work = index
+        return first_work if first_work is not None else 0
+
+    def _work_until(self, elapsed: int) -> int:
+        cycles, offset = divmod(elapsed, self.total)
+        index = bisect_right(self.ends, offset)
+        work = cycles * self.work_total
+        if index > 0:
+            work += self.work_before[index - 1]
+        if index < len(self.phases) and self.phases[index].is_work:
+            work += offset - self.start_of(index)
+        return work
+
+    def work_seconds_between(self, start: int, end: int) -> int:
+        """Рабочих секунд между двумя моментами от начала расписания, O(log n)"""
+        if end <= start:
+            return 0
+        return self._work_until(end) - self._work_until(start)
+
+
+def compile_classic(work_time: int, short_break: int, long_break: int,
+                    rounds: int) -> Timeline:
+    """
+    Классическое расписание: rounds раз работа и короткий перерыв,
+    после последней работы - длинный перерыв. Длительности в секундах.
+    """
+    phases = []
+    for round in range(1, rounds + 1):
+        phases.append(Phase(WORK, work_time, round))
+        if round < rounds:
+            phases.append(Phase(BREAK, short_break, round))
+        else:
+            phases.append(Phase(LONG_BREAK, long_break, round))
+    return Timeline(phases)
+
+
+_PLAN_ITEM = re.compile(r'^\s*(\d+)\s*/\s*(\d+)\s*(?:[xх×*]\s*(\d+))?\s*$')
+
+
+def parse_plan(plan: str) -> Timeline:
+    """
+    Расписание из строки вида "50/10x3, 90/30": работа/перерыв в минутах,
+    необязательный множитель повторений. Перерыв после последней работы
+    плана считается длинным.
+    """
+    phases = []
+    round = 0
+    for item in plan.split(','):
+        if not item.strip():
+            continue
+        match = _PLAN_ITEM.match(item)
+        if not match:
+            raise ValueError(f"Неверный элемент расписания: {item.strip()}")
+        work, rest, repeat = int(match.group(1)), int(match.group(2)), int(match.group(3) or 1)
+        if work <= 0 or repeat <= 0:
+            raise ValueError(f"Неверный элемент расписания: {item.strip()}")
+        for _ in range(repeat):
+            round += 1
+            phases.append(Phase(WORK, work * 60, round))
+            if rest > 0:
+                phases.append(Phase(BREAK, rest * 60, round))
+    if phases and not phases[-1].is_work:
+        phases[-1].kind = LONG_BREAK
+    return Timeline(phases)
+
+
+def build_timeline(work_time: int, short_break: int, long_break: int, rounds: int,
+                   plan: Optional[str] = None) -> Timeline:
+    """Свое расписание, если оно задано и корректно, иначе классическое"""
+    if plan:
+        return parse_plan(plan)
+    return compile_classic(work_time, short_break, long_break, rounds)
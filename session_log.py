@@ -0,0 +1,147 @@
+import os
+from array import array
+from datetime import date, datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class SessionRecord:
+    """Одна запись истории: день и количество отработанных минут"""
+    __slots__ = ('day', 'work_minutes')
+
+    def __init__(self, day: date, work_minutes: int):
+        self.day = day
+        self.work_minutes = work_minutes
+
+    @property
+    def date(self) -> str:
+        return self.day.isoformat()
+
+    def __repr__(self):
+        return f"SessionRecord({self.date}, {self.work_minutes})"
+
+
+class SessionLog:
+    """
+    Компактная история сессий на колонках array.array.
+
+    Дата хранится как порядковый номер дня (date.toordinal), минуты - как int32,
+    то есть 8 байт на запись вместо объектов pandas. Колонки можно без
+    копирования передать в NumPy через numpy.frombuffer.
+    """
+
+    def __init__(self):
+        self.days = array('i')
+        self.minutes = array('i')
+        self._total_minutes = 0
+
+    @classmethod
+    def load(cls, path: str) -> "SessionLog":
+        """Загрузка истории из CSV-файла статистики"""
+        log = cls()
+        if not os.path.exists(path):
+            return log
+        with open(path, 'r', encoding='utf-8') as f:
+            log.read_csv(f)
+        return log
+
+    @staticmethod
+    def parse_header(line: str) -> Tuple[int, int]:
+        """Номера колонок даты и минут по строке заголовка CSV"""
+        header = line.strip().split(',')
+        date_col, minutes_col = 0, 1
+        if 'date' in header:
+            date_col = header.index('date')
+        for name in ('work_minutes', 'minutes'):
+            if name in header:
+                minutes_col = header.index(name)
+                break
+        return date_col, minutes_col
+
+    def read_csv(self, f, with_header: bool = True,
+                 columns: Optional[Tuple[int, int]] = None):
+        """
+        Дочитывание строк CSV из открытого файла
+
+        Args:
+            with_header: первая строка - заголовок, колонки берутся из него
+            columns: номера колонок даты и минут, если заголовок уже прочитан
+        """
+        date_col, minutes_col = columns or (0, 1)
+        if with_header:
+            date_col, minutes_col = self.parse_header(f.readline())
+        ordinal_cache: Dict[str, int] = {}
+        days_append = self.days.append
+        minutes_append = self.minutes.append
+        simple_layout = (date_col, minutes_col) == (0, 1)
+        added = 0
+        for line in f:
+            if simple_layout:
+                # Быстрый путь для стандартного файла "date,work_minutes"
+                day_str, _, minutes_str = line.partition(',')
+            else:
+                parts = line.rstrip('\n').split(',')
+                if len(parts) <= max(date_col, minutes_col):
+                    continue
+                day_str, minutes_str = parts[date_col], parts[minutes_col]
+            ordinal = ordinal_cache.get(day_str)
+            if ordinal is None:
+                try:
+                    ordinal = datetime.strptime(day_str[:10], '%Y-%m-%d').toordinal()
+                except ValueError:
+                    continue
+                ordinal_cache[day_str] = ordinal
+            try:
+                minutes = int(minutes_str)
+            except ValueError:
+                try:
+                    # Дробные минуты или колонка id после минут (выход слияния)
+                    minutes = int(float(minutes_str.partition(',')[0]))
+                except ValueError:
+                    continue
+            days_append(ordinal)
+            minutes_append(minutes)
+            added += minutes
+        self._total_minutes += added
+
+    def append(self, day: date, work_minutes: int):
+        self.days.append(day.toordinal())
+        self.minutes.append(work_minutes)
+        self._total_minutes += work_minutes
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __getitem__(self, index: int) -> SessionRecord:
+        return SessionRecord(date.fromordinal(self.days[index]), self.minutes[index])
+
+    def __iter__(self) -> Iterator[SessionRecord]:
+        for ordinal, minutes in zip(self.days, self.minutes):
+            yield SessionRecord(date.fromordinal(ordinal), minutes)
+
+    @property
+    def total_minutes(self) -> int:
+        return self._total_minutes
+
+    def minutes_on(self, day: date) -> int:
+        """Сумма минут за день; записи идут по возрастанию даты, поэтому читаем с конца"""
+        ordinal = day.toordinal()
+        total = 0
+        for index in range(len(self.days) - 1, -1, -1):
+            current = self.days[index]
+            if current == ordinal:
+                total += self.minutes[index]
+            elif current < ordinal:
+                break
+        return total
+
+    def daily_totals(self, start: Optional[date] = None,
+                     end: Optional[date] = None) -> Dict[date, int]:
+        """Суммы минут по дням в диапазоне (включительно)"""
+        first = start.toordinal() if start else None
+        last = end.toordinal() if end else None
+        totals: Dict[int, int] = {}
+        for ordinal, minutes in zip(self.days, self.minutes):
+            if (first is not None and ordinal < first) or (last is not None and ordinal > last):
+                continue
+            totals[ordinal] = totals.get(ordinal, 0) + minutes
+        return {date.fromordinal(ordinal): minutes for ordinal, minutes in totals.items()}
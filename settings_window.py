@@ -1,17 +1,20 @@
 import json
 import os
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                          QSpinBox, QPushButton, QMessageBox)
+                          QSpinBox, QPushButton, QMessageBox, QLineEdit, QComboBox)
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QIcon, QFont
 from PyQt6.QtGui import QIcon
 import config
+from schedule import parse_plan
+from theme import THEME_TITLES, SETTINGS_DIALOG, ROLE_SAVE, ROLE_CANCEL, set_role
 
 class SettingsWindow(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Настройки")
-        self.setFixedSize(400, 300)
+        self.setObjectName(SETTINGS_DIALOG)  # Оформление полей и кнопок задает тема
+        self.setFixedSize(400, 510)
         self.settings_file = "pomodoro_settings.json"
         
         # Загружаем текущие настройки
@@ -31,18 +34,6 @@ class SettingsWindow(QDialog):
         self.work_spin = QSpinBox()
         self.work_spin.setRange(1, 60)
         self.work_spin.setValue(self.current_settings.get("work_time", config.DEFAULT_WORK_TIME))
-        self.work_spin.setStyleSheet("""
-            QSpinBox {
-                padding: 5px;
-                border: 2px solid #BDC3C7;
-                border-radius: 5px;
-                background: white;
-                min-width: 80px;
-            }
-            QSpinBox:hover {
-                border-color: #3498DB;
-            }
-        """)
         work_layout.addWidget(work_label)
         work_layout.addWidget(self.work_spin)
         layout.addLayout(work_layout)
@@ -54,18 +45,6 @@ class SettingsWindow(QDialog):
         self.short_break_spin = QSpinBox()
         self.short_break_spin.setRange(1, 30)
         self.short_break_spin.setValue(self.current_settings.get("short_break", config.DEFAULT_SHORT_BREAK))
-        self.short_break_spin.setStyleSheet("""
-            QSpinBox {
-                padding: 5px;
-                border: 2px solid #BDC3C7;
-                border-radius: 5px;
-                background: white;
-                min-width: 80px;
-            }
-            QSpinBox:hover {
-                border-color: #3498DB;
-            }
-        """)
         short_break_layout.addWidget(short_break_label)
         short_break_layout.addWidget(self.short_break_spin)
         layout.addLayout(short_break_layout)
@@ -77,18 +56,6 @@ class SettingsWindow(QDialog):
         self.long_break_spin = QSpinBox()
         self.long_break_spin.setRange(1, 60)
         self.long_break_spin.setValue(self.current_settings.get("long_break", config.DEFAULT_LONG_BREAK))
-        self.long_break_spin.setStyleSheet("""
-            QSpinBox {
-                padding: 5px;
-                border: 2px solid #BDC3C7;
-                border-radius: 5px;
-                background: white;
-                min-width: 80px;
-            }
-            QSpinBox:hover {
-                border-color: #3498DB;
-            }
-        """)
         long_break_layout.addWidget(long_break_label)
         long_break_layout.addWidget(self.long_break_spin)
         layout.addLayout(long_break_layout)
@@ -100,64 +67,52 @@ class SettingsWindow(QDialog):
         self.rounds_spin = QSpinBox()
         self.rounds_spin.setRange(1, 10)
         self.rounds_spin.setValue(self.current_settings.get("rounds", config.DEFAULT_ROUNDS))
-        self.rounds_spin.setStyleSheet("""
-            QSpinBox {
-                padding: 5px;
-                border: 2px solid #BDC3C7;
-                border-radius: 5px;
-                background: white;
-                min-width: 80px;
-            }
-            QSpinBox:hover {
-                border-color: #3498DB;
-            }
-        """)
         rounds_layout.addWidget(rounds_label)
         rounds_layout.addWidget(self.rounds_spin)
         layout.addLayout(rounds_layout)
 
+        # Цели на день и неделю
+        self.daily_goal_spin = self._create_goal_spin(
+            layout, "Цель на день (минуты):", 1440, 25,
+            self.current_settings.get("daily_goal", config.DEFAULT_DAILY_GOAL))
+        self.weekly_goal_spin = self._create_goal_spin(
+            layout, "Цель на неделю (минуты):", 10080, 100,
+            self.current_settings.get("weekly_goal", config.DEFAULT_WEEKLY_GOAL))
+
+        # Свое расписание вместо классического
+        plan_layout = QHBoxLayout()
+        plan_label = QLabel("Свое расписание:")
+        plan_label.setStyleSheet("font-weight: bold;")
+        self.plan_edit = QLineEdit()
+        self.plan_edit.setPlaceholderText("например 50/10x3, 90/30")
+        self.plan_edit.setText(self.current_settings.get("plan") or "")
+        plan_layout.addWidget(plan_label)
+        plan_layout.addWidget(self.plan_edit)
+        layout.addLayout(plan_layout)
+
+        # Тема оформления
+        theme_layout = QHBoxLayout()
+        theme_label = QLabel("Тема оформления:")
+        theme_label.setStyleSheet("font-weight: bold;")
+        self.theme_combo = QComboBox()
+        for name, title in THEME_TITLES.items():
+            self.theme_combo.addItem(title, name)
+        index = self.theme_combo.findData(self.current_settings.get("theme", config.DEFAULT_THEME))
+        self.theme_combo.setCurrentIndex(max(index, 0))
+        theme_layout.addWidget(theme_label)
+        theme_layout.addWidget(self.theme_combo)
+        layout.addLayout(theme_layout)
+
         # Кнопки
         buttons_layout = QHBoxLayout()
         buttons_layout.setSpacing(10)
 
         save_button = QPushButton("Сохранить")
-        save_button.setStyleSheet("""
-            QPushButton {
-                background-color: #2ECC71;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 5px;
-                font-weight: bold;
-                min-width: 100px;
-            }
-            QPushButton:hover {
-                background-color: #27AE60;
-            }
-            QPushButton:pressed {
-                background-color: #219A52;
-            }
-        """)
+        set_role(save_button, ROLE_SAVE)
         save_button.clicked.connect(self.save_settings)
 
         cancel_button = QPushButton("Отмена")
-        cancel_button.setStyleSheet("""
-            QPushButton {
-                background-color: #E74C3C;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 5px;
-                font-weight: bold;
-                min-width: 100px;
-            }
-            QPushButton:hover {
-                background-color: #C0392B;
-            }
-            QPushButton:pressed {
-                background-color: #A93226;
-            }
-        """)
+        set_role(cancel_button, ROLE_CANCEL)
         cancel_button.clicked.connect(self.reject)
 
         buttons_layout.addStretch()
@@ -168,6 +123,22 @@ class SettingsWindow(QDialog):
         layout.addStretch()
         layout.addLayout(buttons_layout)
 
+    def _create_goal_spin(self, layout: QVBoxLayout, title: str, maximum: int, step: int,
+                          value: int) -> QSpinBox:
+        """Строка настройки цели; 0 отключает цель"""
+        goal_layout = QHBoxLayout()
+        goal_label = QLabel(title)
+        goal_label.setStyleSheet("font-weight: bold;")
+        spin = QSpinBox()
+        spin.setRange(0, maximum)
+        spin.setSingleStep(step)
+        spin.setSpecialValueText("нет")
+        spin.setValue(value)
+        goal_layout.addWidget(goal_label)
+        goal_layout.addWidget(spin)
+        layout.addLayout(goal_layout)
+        return spin
+
     def load_settings(self):
         try:
             if os.path.exists(self.settings_file):
@@ -179,11 +150,22 @@ class SettingsWindow(QDialog):
             return {}
 
     def save_settings(self):
+        plan = self.plan_edit.text().strip()
+        if plan:
+            try:
+                parse_plan(plan)
+            except ValueError as e:
+                QMessageBox.warning(self, "Ошибка", f"Неверное расписание: {str(e)}")
+                return
         settings = {
             "work_time": self.work_spin.value(),
             "short_break": self.short_break_spin.value(),
             "long_break": self.long_break_spin.value(),
-            "rounds": self.rounds_spin.value()
+            "rounds": self.rounds_spin.value(),
+            "plan": plan,
+            "daily_goal": self.daily_goal_spin.value(),
+            "weekly_goal": self.weekly_goal_spin.value(),
+            "theme": self.theme_combo.currentData()
         }
         
         try:
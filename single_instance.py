@@ -0,0 +1,195 @@
+import json
+import logging
+import socket
+import threading
+import time
+from typing import Callable, List, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+# Команды, которые повторный запуск передает работающему экземпляру
+REMOTE_COMMANDS = ('show', 'start', 'pause', 'stop', 'stats')
+CLAIM_ATTEMPTS = 40   # Попыток занять порт или достучаться до владельца
+CLAIM_RETRY_DELAY = 0.05
+
+_claimed: Optional[socket.socket] = None
+_server: Optional["InstanceServer"] = None
+
+
+def _claim(port: int) -> Optional[socket.socket]:
+    """
+    Попытка стать единственным экземпляром: занять порт на loopback.
+
+    Привязка к порту атомарна на уровне ОС, поэтому из одновременных
+    запусков ее получает ровно один.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if hasattr(socket, 'SO_EXCLUSIVEADDRUSE'):
+        # Windows: без этого флага другой процесс может занять тот же порт
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+    else:
+        # POSIX: повторное использование не мешает TIME_WAIT, но не дает занять слушающий порт
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind(('127.0.0.1', port))
+        sock.listen(16)
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+
+def send_command(command: str, port: int = config.SINGLE_INSTANCE_PORT,
+                 timeout: float = 2.0) -> Optional[dict]:
+    """Отправка команды работающему экземпляру; None если он не отвечает"""
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=timeout) as sock:
+            sock.sendall((json.dumps({'cmd': command}) + "\n").encode('utf-8'))
+            with sock.makefile('rb') as stream:
+                line = stream.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+
+
+def forward_to_running(argv: List[str], port: int = config.SINGLE_INSTANCE_PORT) -> Optional[int]:
+    """
+    Передача команды запуска работающему экземпляру.
+
+    Основной экземпляр сразу начинает отвечать на порту: пока окно
+    загружается, команды повторных запусков копятся и выполняются,
+    когда оно подключит обработчик (InstanceServer.set_handler).
+
+    Returns:
+        код завершения, если этот процесс должен сразу выйти, или None,
+        если он стал основным экземпляром (или команда не для экземпляра)
+    """
+    global _claimed, _server
+    command = argv[0] if argv else 'show'
+    if command not in REMOTE_COMMANDS:
+        return None
+    for _ in range(CLAIM_ATTEMPTS):
+        _claimed = _claim(port)
+        if _claimed:
+            break
+        reply = send_command(command, port)
+        if reply is not None:
+            if reply.get('text'):
+                print(reply['text'])
+            return 0 if reply.get('ok') else 1
+        # Владелец порта еще запускается или уже завершается
+        time.sleep(CLAIM_RETRY_DELAY)
+    else:
+        logger.warning("Не удалось связаться с работающим экземпляром, запуск без проверки")
+        return None
+
+    if command in ('pause', 'stop'):
+        release()
+        print("Pomodoro Timer не запущен")
+        return 1
+    if command == 'stats':
+        release()
+        from stats import PomodoroStats
+        print(format_stats(PomodoroStats(), None))
+        return 0
+    _server = InstanceServer(_claimed)
+    return None
+
+
+def claimed_socket(port: int = config.SINGLE_INSTANCE_PORT) -> Optional[socket.socket]:
+    """Занятый при запуске порт; если forward_to_running не вызывался - попытка занять сейчас"""
+    global _claimed
+    if _claimed is None:
+        _claimed = _claim(port)
+    return _claimed
+
+
+def running_server() -> Optional["InstanceServer"]:
+    """Сервер, запущенный forward_to_running до загрузки окна"""
+    return _server
+
+
+def release():
+    global _claimed
+    if _claimed:
+        _claimed.close()
+        _claimed = None
+
+
+def format_stats(stats, state) -> str:
+    """Краткая сводка для команды stats"""
+    total = stats.get_total_stats()
+    lines = [f"Сегодня: {stats.get_today_stats()} мин",
+             f"Всего: {total['total_minutes']} мин ({total['total_sessions']} сессий)"]
+    if state is not None and state.is_running:
+        minutes, seconds = divmod(state.time_left, 60)
+        phase = "работа" if state.is_work else "перерыв"
+        pause = ", пауза" if state.is_paused else ""
+        lines.append(f"Сейчас: {phase}{pause}, осталось {minutes:02d}:{seconds:02d}")
+    return "\n".join(lines)
+
+
+class InstanceServer:
+    """
+    Прием команд от повторных запусков на занятом порту.
+
+    handler вызывается в потоке сервера и возвращает ответ
+    {'ok': bool, 'text': str}; команды, меняющие интерфейс, он должен
+    передать в поток GUI сам. Пока обработчика нет (окно еще загружается),
+    запуск сразу получает ответ, а команда ждет set_handler.
+    """
+
+    def __init__(self, sock: socket.socket, handler: Optional[Callable[[str], dict]] = None):
+        self.sock = sock
+        self.handler = handler
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return  # Сокет закрыт при выходе
+            with conn:
+                try:
+                    conn.settimeout(2.0)
+                    with conn.makefile('rb') as stream:
+                        request = json.loads(stream.readline())
+                    command = request.get('cmd')
+                    if command in REMOTE_COMMANDS:
+                        reply = self._dispatch(command)
+                    else:
+                        reply = {'ok': False, 'text': f"Неизвестная команда: {command}"}
+                    conn.sendall((json.dumps(reply) + "\n").encode('utf-8'))
+                except Exception as e:
+                    logger.error(f"Ошибка при обработке команды другого запуска: {e}")
+
+    def _dispatch(self, command: str) -> dict:
+        with self._lock:
+            handler = self.handler
+            if handler is None and command != 'stats':
+                self._pending.append(command)
+                return {'ok': True, 'text': "" if command == 'show' else
+                        "Pomodoro Timer запускается, команда будет выполнена после запуска"}
+        if handler is None:
+            from stats import PomodoroStats
+            return {'ok': True, 'text': format_stats(PomodoroStats(), None)}
+        return handler(command)
+
+    def set_handler(self, handler: Callable[[str], dict]) -> List[str]:
+        """Подключение обработчика; возвращает команды, пришедшие до него"""
+        with self._lock:
+            self.handler = handler
+            pending, self._pending = self._pending, []
+        return pending
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import config
+
+logger = logging.getLogger(__name__)
+
+WATCHDOG_THREAD_NAME = "pomodoro-stall-watchdog"
+
+Frame = Tuple[str, int, str]  # Файл, строка, функция
+
+
+def sample_stack(thread_id: int, depth: int = config.STALL_STACK_DEPTH) -> Tuple[Frame, ...]:
+    """Стек потока сейчас, начиная с самого вложенного кадра, не глубже depth"""
+    frame = sys._current_frames().get(thread_id)
+    stack = []
+    while frame is not None and len(stack) < depth:
+        code = frame.f_code
+        stack.append((os.path.basename(code.co_filename), frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    return tuple(stack)
+
+
+def format_frame(frame: Frame) -> str:
+    return f"{frame[2]} ({frame[0]}:{frame[1]})"
+
+
+class Stall:
+    """Одно зависание цикла событий: длительность и стеки, снятые во время него"""
+    __slots__ = ('started', 'duration_ms', 'samples')
+
+    def __init__(self, started: float):
+        self.started = started  # time.time() начала
+        self.duration_ms = 0.0
+        self.samples: Counter = Counter()  # Стек -> сколько раз снят
+
+    @property
+    def hot_stack(self) -> Tuple[Frame, ...]:
+        """Стек, на котором поток GUI простоял дольше всего"""
+        return self.samples.most_common(1)[0][0] if self.samples else ()
+
+    def to_dict(self) -> dict:
+        total = sum(self.samples.values())
+        return {
+            'started': round(self.started, 3),
+            'duration_ms': round(self.duration_ms, 1),
+            'samples': total,
+            'stacks': [{'share': round(count / total, 3), 'frames': [list(frame) for frame in stack]}
+                       for stack, count in self.samples.most_common(3)],
+        }
+
+
+class StallWatchdog:
+    """
+    Поиск зависаний окна: задержка цикла событий Qt по сердцебиению.
+
+    QTimer в потоке GUI каждые STALL_HEARTBEAT_MS отмечает время. Фоновый
+    поток проверяет отметку; если цикл событий не отвечает дольше порога,
+    поток раз в STALL_SAMPLE_MS снимает стек потока GUI через
+    sys._current_frames. Когда сердцебиение возвращается, зависание
+    дописывается строкой JSON в файл отчета: длительность и самые частые
+    стеки. Файл копится между запусками, summarize сводит его по местам
+    в коде.
+
+    Сердцебиение будит приложение и в простое, поэтому сторож включается
+    только для диагностики.
+    """
+
+    def __init__(self, report_path: Optional[str] = None,
+                 threshold_ms: int = config.STALL_THRESHOLD_MS,
+                 heartbeat_ms: int = config.STALL_HEARTBEAT_MS,
+                 sample_ms: int = config.STALL_SAMPLE_MS):
+        self.report_path = report_path
+        self.threshold = threshold_ms / 1000
+        self.heartbeat_ms = heartbeat_ms
+        self.sample_interval = sample_ms / 1000
+        self.stalls: List[Stall] = []
+        self._beat = time.monotonic()
+        self.beats = 0  # Пробуждения потока GUI по сердцебиению
+        self._gui_thread_id: Optional[int] = None
+        self._timer = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запуск из потока GUI: стеки снимаются с потока, который вызвал start"""
+        from PyQt6.QtCore import Qt, QTimer
+        self._gui_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._timer = QTimer()
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._heartbeat)
+        self._timer.start(self.heartbeat_ms)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name=WATCHDOG_THREAD_NAME, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _heartbeat(self):
+        self._beat = time.monotonic()
+        self.beats += 1
+
+    def _watch(self):
+        stall: Optional[Stall] = None
+        beat_seen = self._beat
+        while not self._stop.wait(self.sample_interval if stall else self.threshold / 2):
+            beat = self._beat
+            now = time.monotonic()
+            if stall is not None:
+                if beat != beat_seen:
+                    # Цикл событий ожил: длительность до последнего сердцебиения
+                    stall.duration_ms = (beat - beat_seen) * 1000
+                    self._finish(stall)
+                    stall = None
+                else:
+                    stall.samples[sample_stack(self._gui_thread_id)] += 1
+                    continue
+            beat_seen = beat
+            if now - beat > self.threshold + self.heartbeat_ms / 1000:
+                stall = Stall(time.time() - (now - beat))
+                stall.samples[sample_stack(self._gui_thread_id)] += 1
+
+    def _finish(self, stall: Stall):
+        with self._lock:
+            self.stalls.append(stall)
+        hot = stall.hot_stack
+        logger.warning(f"Окно не отвечало {stall.duration_ms:.0f} мс: "
+                       f"{format_frame(hot[0]) if hot else 'стек неизвестен'}")
+        if self.report_path:
+            try:
+                with open(self.report_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(stall.to_dict(), ensure_ascii=False) + "\n")
+            except Exception as e:
+                logger.error(f"Ошибка при записи отчета о зависаниях: {e}")
+
+    def summary(self, top: int = 10) -> str:
+        with self._lock:
+            stalls = [stall.to_dict() for stall in self.stalls]
+        return format_summary(aggregate(stalls), top)
+
+
+def aggregate(stalls: List[dict]) -> Dict[tuple, dict]:
+    """
+    Сводка зависаний по самому частому стеку: число зависаний, суммарная и
+    наибольшая длительность. Ключ - функции стека без номеров строк, чтобы
+    одно место не дробилось по строкам цикла; для вывода хранится первый стек.
+    """
+    places: Dict[tuple, dict] = {}
+    for stall in stalls:
+        stacks = stall.get('stacks') or [{'frames': []}]
+        frames = [tuple(frame) for frame in stacks[0]['frames']]
+        key = tuple((frame[0], frame[2]) for frame in frames)
+        place = places.setdefault(key, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                        'frames': frames})
+        place['count'] += 1
+        place['total_ms'] += stall['duration_ms']
+        place['max_ms'] = max(place['max_ms'], stall['duration_ms'])
+    return places
+
+
+def format_summary(places: Dict[tuple, dict], top: int = 10, frames: int = 4) -> str:
+    if not places:
+        return "Зависаний не найдено"
+    ordered = sorted(places.values(), key=lambda place: place['total_ms'], reverse=True)
+    lines = [f"Зависаний: {sum(place['count'] for place in ordered)}, "
+             f"мест в коде: {len(places)}"]
+    for place in ordered[:top]:
+        lines.append(f"{place['total_ms']:>8.0f} мс всего, {place['count']} раз, "
+                     f"наибольшее {place['max_ms']:.0f} мс")
+        lines.extend(f"    {format_frame(frame)}" for frame in place['frames'][:frames])
+    return "\n".join(lines)
+
+
+def summarize(path: str, top: int = 10) -> str:
+    """Сводка файла отчета о зависаниях, накопленного за несколько запусков"""
+    stalls = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                stalls.append(json.loads(line))
+            except ValueError:
+                continue  # Строка оборвана при аварийном выходе
+    return format_summary(aggregate(stalls), top)
@@ -1,18 +1,67 @@
-import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
+import itertools
+import logging
 import os
-from config import STATS_FILE
+import threading
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+from config import (STATS_FILE, STATS_CHUNK_SIZE, STATS_RETENTION_DAYS, STATS_ARCHIVE_DIR,
+                    STATS_COMPACT_MIN_BYTES)
+from session_log import SessionLog
+from stats_tail import follow
+from stats_journal import StatsJournal
+from stats_analytics import StatsAnalytics, snapshot_lock, snapshot_path_for
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
 
 class PomodoroStats:
-    def __init__(self):
-        self.stats_file = STATS_FILE
+    def __init__(self, stats_file: str = STATS_FILE):
+        self.stats_file = stats_file
+        self._analytics: Optional[StatsAnalytics] = None
+        # Запись в файл и его замена при сжатии истории не должны пересекаться
+        self._write_lock = threading.Lock()
         self._create_stats_file_if_not_exists()
+        # Файл читается с хвоста: при каждом запросе разбираются только новые строки
+        self._tail = follow(stats_file)
+        # Дописывание с fsync и контрольными суммами сегментов; файл не трогается до записи
+        self._journal = StatsJournal(stats_file)
 
     def _create_stats_file_if_not_exists(self):
         """Создание файла статистики, если он не существует"""
         if not os.path.exists(self.stats_file):
-            df = pd.DataFrame(columns=['date', 'work_minutes'])
-            df.to_csv(self.stats_file, index=False)
+            with open(self.stats_file, 'w', encoding='utf-8') as f:
+                f.write("date,work_minutes\n")
+
+    @property
+    def lock(self):
+        """Блокировка истории в памяти: ее дочитывает и фоновая загрузка статистики"""
+        return self._tail.lock
+
+    @property
+    def log(self) -> SessionLog:
+        """
+        История сессий в памяти с учетом строк, дописанных в файл с прошлого
+        обращения. Колонки читаются под lock: их может дополнять другой поток.
+        """
+        self._tail.refresh()
+        return self._tail.log
+
+    @property
+    def history_key(self) -> tuple:
+        """
+        Версия истории в памяти: меняется, когда файл перечитан с начала или
+        дочитаны новые строки. Берется под lock после обращения к log.
+        """
+        return (self._tail.full_reads, self._tail.offset)
+
+    @property
+    def analytics(self) -> StatsAnalytics:
+        """Инкрементальная аналитика, загружается из снимка при первом обращении"""
+        if self._analytics is None:
+            self._analytics = StatsAnalytics.load(self.stats_file)
+        return self._analytics
 
     def add_session(self, work_minutes: int):
         """
@@ -21,33 +70,165 @@ class PomodoroStats:
         Args:
             work_minutes: количество отработанных минут
         """
-        today = datetime.now().strftime('%Y-%m-%d')
-        new_data = pd.DataFrame({'date': [today], 'work_minutes': [work_minutes]})
+        today = datetime.now()
         
         try:
-            df = pd.read_csv(self.stats_file)
-            df = pd.concat([df, new_data], ignore_index=True)
-            df.to_csv(self.stats_file, index=False)
+            with self._write_lock:
+                # Дописываем строку в конец; оборванная сбоем запись отрезается, а не склеивается
+                self._journal.append(f"{today.strftime('%Y-%m-%d')},{work_minutes}\n")
+            # Только что дописанная строка попадает в историю при следующем запросе
+            if self._analytics is not None:
+                # Дочитываем только что добавленную строку и обновляем снимок
+                with snapshot_lock(self.stats_file):
+                    self._analytics.update_from_file(self.stats_file)
+                    self._analytics.add_hour(today.hour, work_minutes)
+                    self._analytics.save(snapshot_path_for(self.stats_file))
         except Exception as e:
             print(f"Ошибка при сохранении статистики: {e}")
 
+    def recover(self):
+        """
+        Проверка файла статистики после возможного сбоя: сверка CRC последнего
+        сегмента и отрезание оборванной записи. Читается только хвост файла.
+
+        Returns:
+            RecoveryReport
+        """
+        with self._write_lock:
+            report = self._journal.recover()
+        if report.repaired or report.rebuilt:
+            logger.info(report.summary())
+        return report
+
+    def verify(self) -> list:
+        """Полная сверка контрольных сумм истории; возвращает поврежденные сегменты"""
+        with self._write_lock:
+            return self._journal.verify()
+
     def get_today_stats(self) -> int:
         """Получение статистики за сегодня"""
-        today = datetime.now().strftime('%Y-%m-%d')
         try:
-            df = pd.read_csv(self.stats_file)
-            return df[df['date'] == today]['work_minutes'].sum()
+            self._tail.refresh()
+            return self._tail.minutes_on(datetime.now().date())
         except Exception:
             return 0
 
     def get_total_stats(self) -> dict:
         """Получение общей статистики"""
         try:
-            df = pd.read_csv(self.stats_file)
+            tail = self._tail
+            with tail.lock:
+                tail.refresh()
+                total, sessions = tail.total_minutes, tail.sessions
             return {
-                'total_minutes': df['work_minutes'].sum(),
-                'total_sessions': len(df),
-                'average_session': round(df['work_minutes'].mean(), 1)
+                'total_minutes': total,
+                'total_sessions': sessions,
+                'average_session': round(total / sessions, 1) if sessions else 0
             }
         except Exception:
             return {'total_minutes': 0, 'total_sessions': 0, 'average_session': 0}
+
+    def get_daily_totals(self, start: date, end: date) -> Dict[date, int]:
+        """Минуты по дням в диапазоне (включительно), только дни с работой"""
+        try:
+            self._tail.refresh()
+            return self._tail.daily_totals(start, end)
+        except Exception:
+            return {}
+
+    def iter_chunks(self, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None,
+                    chunk_size: int = STATS_CHUNK_SIZE) -> Iterator["pd.DataFrame"]:
+        """
+        Потоковое чтение истории блоками фиксированного размера
+
+        Args:
+            start_date: начальная дата YYYY-MM-DD включительно
+            end_date: конечная дата YYYY-MM-DD включительно
+            chunk_size: количество строк в одном блоке
+        """
+        # pandas нужен только для экспорта, живой путь GUI работает без него
+        import pandas as pd
+        from stats_export import clean_chunk, filter_chunk
+        # Колонки читаются строками: одна пустая или испорченная ячейка не должна
+        # прерывать экспорт, такие строки отбрасываются, как в SessionLog
+        reader = pd.read_csv(self.stats_file, chunksize=chunk_size, dtype=str,
+                             usecols=['date', 'work_minutes'], on_bad_lines='skip')
+        with reader:
+            for chunk in reader:
+                chunk = filter_chunk(clean_chunk(chunk), start_date, end_date)
+                if len(chunk):
+                    yield chunk
+
+    def iter_archive_chunks(self, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None,
+                            chunk_size: int = STATS_CHUNK_SIZE,
+                            archive_dir: str = STATS_ARCHIVE_DIR) -> Iterator["pd.DataFrame"]:
+        """Исходные строки свернутых дней из архивов блоками, с распаковкой на лету"""
+        import pandas as pd
+        from stats_compaction import iter_archive
+        rows = iter_archive(archive_dir, start_date, end_date)
+        while True:
+            block = list(itertools.islice(rows, chunk_size))
+            if not block:
+                return
+            yield pd.DataFrame(block, columns=['date', 'work_minutes'])
+
+    def export(self, path: str, fmt: str,
+               start_date: Optional[str] = None,
+               end_date: Optional[str] = None,
+               chunk_size: int = STATS_CHUNK_SIZE,
+               archive: bool = False) -> int:
+        """
+        Экспорт истории в JSON Lines, Parquet или iCalendar
+
+        Args:
+            path: путь к выходному файлу
+            fmt: 'jsonl', 'parquet' или 'ics'
+            start_date: начальная дата YYYY-MM-DD включительно
+            end_date: конечная дата YYYY-MM-DD включительно
+            chunk_size: количество строк, обрабатываемых за раз
+            archive: экспорт исходных строк свернутых дней из архива
+                вместо файла статистики
+
+        Returns:
+            количество экспортированных записей
+        """
+        from stats_export import export_chunks
+        reader = self.iter_archive_chunks if archive else self.iter_chunks
+        return export_chunks(reader(start_date, end_date, chunk_size), path, fmt)
+
+    def compact(self, retain_days: int = STATS_RETENTION_DAYS,
+                archive_dir: Optional[str] = STATS_ARCHIVE_DIR):
+        """
+        Свертка старой истории в одну строку на день с атомарной заменой файла
+
+        Returns:
+            CompactionReport
+        """
+        from stats_compaction import compact_stats
+        report = compact_stats(self.stats_file, retain_days, archive_dir, lock=self._write_lock)
+        if report.days_rolled_up:
+            # Файл заменен: история в памяти перечитается по смене inode,
+            # аналитика - при обращении
+            with self._write_lock:
+                self._analytics = None
+        return report
+
+    def compact_in_background(self) -> Optional[threading.Thread]:
+        """Фоновое сжатие истории, если файл статистики вырос больше порога"""
+        try:
+            if os.path.getsize(self.stats_file) < STATS_COMPACT_MIN_BYTES:
+                return None
+        except OSError:
+            return None
+
+        def run():
+            try:
+                logger.info(self.compact().summary())
+            except Exception as e:
+                logger.error(f"Ошибка при сжатии истории: {e}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,234 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import config
+from stats_tail import TAIL_CHECK_BYTES
+
+logger = logging.getLogger(__name__)
+
+ROLLING_WINDOW_DAYS = 30
+
+
+def snapshot_path_for(stats_file: str) -> str:
+    """Путь к снимку аналитики рядом с файлом статистики"""
+    return os.path.splitext(stats_file)[0] + "_analytics.json"
+
+
+_snapshot_locks: Dict[str, threading.Lock] = {}
+_snapshot_locks_lock = threading.Lock()
+
+
+def snapshot_lock(stats_file: str) -> threading.Lock:
+    """
+    Общая блокировка снимка аналитики (одна на файл в процессе).
+
+    Снимок пишут и поток GUI после каждой сессии, и фоновая загрузка окна
+    статистики; под блокировкой дочитывание и сохранение одного не
+    перемежаются с другим, и старый снимок не затирает новый.
+    """
+    key = os.path.abspath(snapshot_path_for(stats_file))
+    with _snapshot_locks_lock:
+        lock = _snapshot_locks.get(key)
+        if lock is None:
+            lock = _snapshot_locks[key] = threading.Lock()
+        return lock
+
+
+class StatsAnalytics:
+    """
+    Инкрементальная аналитика по истории: серии, недели, месяцы, скользящие
+    средние и распределение по часам.
+
+    Каждая новая запись учитывается за O(1). Состояние сохраняется в небольшой
+    JSON-снимок вместе со смещением в файле статистики, до которого он
+    построен, поэтому при открытии окна статистики дочитывается только хвост.
+    """
+
+    def __init__(self):
+        self.last_day: Optional[int] = None  # Порядковый номер последнего активного дня
+        self.current_streak = 0
+        self.longest_streak = 0
+        self.week_totals: Dict[str, int] = {}   # "2025-W03" -> минуты
+        self.month_totals: Dict[str, int] = {}  # "2025-01" -> минуты
+        self.recent_days: Dict[int, int] = {}   # Последние 30 дней: день -> минуты
+        self.hour_histogram: List[int] = [0] * 24
+        self.processed_offset = 0
+        self.file_identity: Optional[dict] = None
+
+    def add(self, day: date, minutes: int):
+        """Учет одной записи истории"""
+        ordinal = day.toordinal()
+        if self.last_day is None or ordinal > self.last_day:
+            if self.last_day is not None and ordinal == self.last_day + 1:
+                self.current_streak += 1
+            else:
+                self.current_streak = 1
+            self.last_day = ordinal
+            self.longest_streak = max(self.longest_streak, self.current_streak)
+            # Окно скользящих средних сдвигается только при смене дня
+            cutoff = ordinal - ROLLING_WINDOW_DAYS
+            for old_day in [d for d in self.recent_days if d <= cutoff]:
+                del self.recent_days[old_day]
+
+        iso_year, iso_week, _ = day.isocalendar()
+        week_key = f"{iso_year}-W{iso_week:02d}"
+        month_key = day.strftime('%Y-%m')
+        self.week_totals[week_key] = self.week_totals.get(week_key, 0) + minutes
+        self.month_totals[month_key] = self.month_totals.get(month_key, 0) + minutes
+        if self.last_day - ordinal < ROLLING_WINDOW_DAYS:
+            self.recent_days[ordinal] = self.recent_days.get(ordinal, 0) + minutes
+
+    def add_hour(self, hour: int, minutes: int):
+        """Учет минут в гистограмме по часам (в файле статистики час не хранится)"""
+        self.hour_histogram[hour] += minutes
+
+    def get_current_streak(self, today: Optional[date] = None) -> int:
+        """Текущая серия дней подряд; прерывается, если вчера и сегодня не было работы"""
+        today = today or datetime.now().date()
+        if self.last_day is None or today.toordinal() - self.last_day > 1:
+            return 0
+        return self.current_streak
+
+    def get_week_total(self, day: Optional[date] = None) -> int:
+        day = day or datetime.now().date()
+        iso_year, iso_week, _ = day.isocalendar()
+        return self.week_totals.get(f"{iso_year}-W{iso_week:02d}", 0)
+
+    def get_month_total(self, day: Optional[date] = None) -> int:
+        day = day or datetime.now().date()
+        return self.month_totals.get(day.strftime('%Y-%m'), 0)
+
+    def get_rolling_average(self, days: int, today: Optional[date] = None) -> float:
+        """Среднее количество минут в день за последние days дней (не больше 30)"""
+        days = max(1, min(days, ROLLING_WINDOW_DAYS))
+        end = (today or datetime.now().date()).toordinal()
+        total = sum(minutes for day, minutes in self.recent_days.items()
+                    if end - days < day <= end)
+        return round(total / days, 1)
+
+    def to_dict(self) -> dict:
+        return {
+            'last_day': self.last_day,
+            'current_streak': self.current_streak,
+            'longest_streak': self.longest_streak,
+            'week_totals': self.week_totals,
+            'month_totals': self.month_totals,
+            'recent_days': {str(day): minutes for day, minutes in self.recent_days.items()},
+            'hour_histogram': self.hour_histogram,
+            'processed_offset': self.processed_offset,
+            'file_identity': self.file_identity,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StatsAnalytics":
+        analytics = cls()
+        analytics.last_day = data.get('last_day')
+        analytics.current_streak = data.get('current_streak', 0)
+        analytics.longest_streak = data.get('longest_streak', 0)
+        analytics.week_totals = data.get('week_totals', {})
+        analytics.month_totals = data.get('month_totals', {})
+        analytics.recent_days = {int(day): minutes
+                                 for day, minutes in data.get('recent_days', {}).items()}
+        analytics.hour_histogram = data.get('hour_histogram', [0] * 24)
+        analytics.processed_offset = data.get('processed_offset', 0)
+        analytics.file_identity = data.get('file_identity')
+        return analytics
+
+    def save(self, path: str):
+        """Атомарное сохранение снимка через временный файл с уникальным именем"""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                            prefix=os.path.basename(path) + ".", suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении снимка аналитики: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, stats_file: str = config.STATS_FILE,
+             path: Optional[str] = None) -> "StatsAnalytics":
+        """
+        Загрузка снимка и дочитывание новых записей файла статистики.
+
+        Если файл статистики был заменен или обрезан, аналитика строится заново,
+        кроме распределения по часам.
+        """
+        path = path or snapshot_path_for(stats_file)
+        analytics = None
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    analytics = cls.from_dict(json.load(f))
+            except Exception as e:
+                logger.error(f"Снимок аналитики поврежден, пересчитываем: {e}")
+        if analytics is None or not analytics._matches(stats_file):
+            previous = analytics
+            analytics = cls()
+            if previous is not None:
+                # Час записи в файле статистики не хранится - распределение по часам
+                # переживает пересчет после замены файла (сжатие, слияние)
+                analytics.hour_histogram = previous.hour_histogram
+        analytics.update_from_file(stats_file)
+        return analytics
+
+    def _matches(self, stats_file: str) -> bool:
+        """
+        Снимок построен по этому же файлу, и файл после этого только дописывался:
+        тот же inode, размер не меньше учтенного, при том же размере то же
+        время изменения, байты перед processed_offset те же.
+        """
+        identity = self.file_identity
+        if not identity or 'mtime_ns' not in identity or not os.path.exists(stats_file):
+            return False
+        st = os.stat(stats_file)
+        if st.st_ino != identity.get('inode') or st.st_size < self.processed_offset:
+            return False
+        if st.st_size == identity.get('size') and st.st_mtime_ns != identity['mtime_ns']:
+            return False  # Перезаписан на месте с тем же размером
+        tail = bytes.fromhex(identity.get('tail', ''))
+        with open(stats_file, 'rb') as f:
+            f.seek(self.processed_offset - len(tail))
+            return f.read(len(tail)) == tail
+
+    def update_from_file(self, stats_file: str) -> int:
+        """
+        Учет записей, добавленных в файл статистики после processed_offset.
+
+        Returns:
+            количество учтенных записей
+        """
+        if not os.path.exists(stats_file):
+            return 0
+        count = 0
+        with open(stats_file, 'rb') as f:
+            if self.processed_offset == 0:
+                f.readline()  # Заголовок
+                self.processed_offset = f.tell()
+            f.seek(self.processed_offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # Строка еще дописывается
+                self.processed_offset += len(raw)
+                day_str, _, minutes_str = raw.decode('utf-8').partition(',')
+                try:
+                    day = datetime.strptime(day_str.strip()[:10], '%Y-%m-%d').date()
+                    minutes = int(float(minutes_str.partition(',')[0]))
+                except ValueError:
+                    continue
+                self.add(day, minutes)
+                count += 1
+            st = os.fstat(f.fileno())
+            start = max(0, self.processed_offset - TAIL_CHECK_BYTES)
+            f.seek(start)
+            tail = f.read(self.processed_offset - start)
+        self.file_identity = {'inode': st.st_ino, 'size': st.st_size,
+                              'mtime_ns': st.st_mtime_ns, 'tail': tail.hex()}
+        return count
@@ -0,0 +1,212 @@
+import glob
+import gzip
+import logging
+import os
+import threading
+from contextlib import nullcontext
+from datetime import date, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+import config
+
+logger = logging.getLogger(__name__)
+
+STATS_HEADER = "date,work_minutes\n"
+ARCHIVE_PATTERN = "pomodoro_stats_*.csv.gz"
+
+
+class CompactionReport:
+    """Итог сжатия истории"""
+
+    def __init__(self):
+        self.rows_before = 0
+        self.rows_after = 0
+        self.days_rolled_up = 0
+        self.rows_archived = 0
+        self.total_before = 0
+        self.total_after = 0
+        self.size_before = 0
+        self.size_after = 0
+        self.archive_path: Optional[str] = None
+
+    def summary(self) -> str:
+        lines = [
+            f"Строк: {self.rows_before} -> {self.rows_after} "
+            f"(свернуто дней: {self.days_rolled_up})",
+            f"Размер: {self.size_before} -> {self.size_after} байт",
+            f"Минут всего: {self.total_before} -> {self.total_after}",
+        ]
+        if self.archive_path:
+            lines.append(f"В архив: {self.rows_archived} строк -> {self.archive_path}")
+        return "\n".join(lines)
+
+
+def _parse_row(raw: bytes) -> Optional[Tuple[str, int]]:
+    """Дата и минуты строки истории; None для заголовка и поврежденных строк"""
+    day, _, minutes = raw.decode('utf-8').strip().partition(',')
+    try:
+        date.fromisoformat(day[:10])
+        return day[:10], int(float(minutes.partition(',')[0]))
+    except ValueError:
+        return None
+
+
+def _iter_rows(path: str, end: int) -> Iterator[Tuple[bytes, Optional[Tuple[str, int]]]]:
+    """
+    Строки файла истории до смещения end (без заголовка) вместе с разбором.
+    Последняя строка без перевода строки еще дописывается или оборвана
+    сбоем и пропускается.
+    """
+    with open(path, 'rb') as f:
+        f.readline()
+        while f.tell() < end:
+            raw = f.readline(end - f.tell())
+            if not raw.endswith(b"\n"):
+                break
+            if raw.strip():
+                yield raw, _parse_row(raw)
+
+
+def _complete_end(path: str, end: int) -> int:
+    """Смещение сразу после последней полной строки до end"""
+    with open(path, 'rb') as f:
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return 0
+
+
+def compact_stats(stats_file: str = config.STATS_FILE,
+                  retain_days: int = config.STATS_RETENTION_DAYS,
+                  archive_dir: Optional[str] = config.STATS_ARCHIVE_DIR,
+                  lock: Optional[threading.Lock] = None,
+                  today: Optional[date] = None) -> CompactionReport:
+    """
+    Свертка записей старше retain_days в одну строку на день.
+
+    Файл читается потоково в два прохода: подсчет строк и минут по старым
+    дням, затем запись нового файла во временный - сначала свернутые дни,
+    потом свежие строки по мере чтения. Исходные строки свернутых дней
+    при заданном archive_dir сохраняются в сжатый архив. Строки, дописанные
+    во время работы, переносятся в новый файл под lock перед атомарной
+    заменой. Если сумма минут после свертки не совпала, файл не меняется.
+    """
+    report = CompactionReport()
+    if not os.path.exists(stats_file):
+        return report
+    cutoff = ((today or date.today()) - timedelta(days=retain_days)).isoformat()
+    report.size_before = os.path.getsize(stats_file)
+    # Недописанная последняя строка переносится вместе с хвостом под lock
+    end = _complete_end(stats_file, report.size_before)
+
+    # Первый проход: строки и минуты каждого старого дня
+    old_rows: Dict[str, int] = {}
+    old_minutes: Dict[str, int] = {}
+    for _, parsed in _iter_rows(stats_file, end):
+        if parsed and parsed[0] < cutoff:
+            old_rows[parsed[0]] = old_rows.get(parsed[0], 0) + 1
+            old_minutes[parsed[0]] = old_minutes.get(parsed[0], 0) + parsed[1]
+    rolled_days = {day for day, count in old_rows.items() if count > 1}
+    if not rolled_days:
+        report.size_after = report.size_before
+        return report
+
+    # Второй проход: свертка старых дней, свежие строки без изменений
+    tmp_path = stats_file + ".compact.tmp"
+    archive_tmp = None
+    archive = None
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+        first, last = min(rolled_days), max(rolled_days)
+        report.archive_path = os.path.join(archive_dir, f"pomodoro_stats_{first}_{last}.csv.gz")
+        suffix = 1
+        while os.path.exists(report.archive_path):
+            # Тот же диапазон дат уже в архиве (например, после слияния старой истории)
+            suffix += 1
+            report.archive_path = os.path.join(
+                archive_dir, f"pomodoro_stats_{first}_{last}.{suffix}.csv.gz")
+        archive_tmp = report.archive_path + ".tmp"
+        archive = gzip.open(archive_tmp, 'wb')
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(STATS_HEADER.encode('utf-8'))
+            for day in sorted(rolled_days):
+                out.write(f"{day},{old_minutes[day]}\n".encode('utf-8'))
+            report.days_rolled_up = len(rolled_days)
+            report.rows_after = len(rolled_days)
+            for raw, parsed in _iter_rows(stats_file, end):
+                report.rows_before += 1
+                if parsed:
+                    report.total_before += parsed[1]
+                if parsed and parsed[0] in rolled_days:
+                    if archive:
+                        archive.write(raw)
+                        report.rows_archived += 1
+                else:
+                    out.write(raw)
+                    report.rows_after += 1
+            if archive:
+                archive.close()
+
+            with lock or nullcontext():
+                # Строки, дописанные приложением во время свертки
+                with open(stats_file, 'rb') as f:
+                    f.seek(end)
+                    tail = f.read()
+                if tail:
+                    out.write(tail)
+                    report.rows_after += tail.count(b"\n")
+                out.flush()
+                os.fsync(out.fileno())
+                report.total_after = sum(parsed[1] for _, parsed in
+                                         _iter_rows(tmp_path, out.tell()) if parsed)
+                # Оборванная последняя строка переносится как есть и не считается
+                complete_tail = tail[:tail.rfind(b"\n") + 1]
+                report.total_before += sum(parsed[1] for parsed in
+                                           map(_parse_row, complete_tail.splitlines()) if parsed)
+                if report.total_after != report.total_before:
+                    raise ValueError(f"Сумма минут изменилась: {report.total_before} -> "
+                                     f"{report.total_after}")
+                os.replace(tmp_path, stats_file)
+        if archive_tmp:
+            os.replace(archive_tmp, report.archive_path)
+        report.size_after = os.path.getsize(stats_file)
+        logger.info(f"История сжата: {report.rows_before} -> {report.rows_after} строк")
+        return report
+    except Exception:
+        for path in (tmp_path, archive_tmp):
+            if path and os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        if archive:
+            archive.close()
+
+
+def iter_archive(archive_dir: str = config.STATS_ARCHIVE_DIR,
+                 start_date: Optional[str] = None,
+                 end_date: Optional[str] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Потоковое чтение архивов истории с распаковкой на лету; так экспорт
+    с --archive получает исходные строки свернутых дней.
+
+    Файлы читаются по порядку имен (по первой дате в файле); файлы, целиком
+    лежащие вне диапазона дат, пропускаются без распаковки.
+    """
+    for path in sorted(glob.glob(os.path.join(archive_dir, ARCHIVE_PATTERN))):
+        first, _, last = os.path.basename(path)[len("pomodoro_stats_"):].partition('_')
+        last = last[:10]
+        if (end_date and first > end_date) or (start_date and last < start_date):
+            continue
+        with gzip.open(path, 'rb') as f:
+            for raw in f:
+                parsed = _parse_row(raw)
+                if parsed is None:
+                    continue
+                if (start_date and parsed[0] < start_date) or (end_date and parsed[0] > end_date):
+                    continue
+                yield parsed
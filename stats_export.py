@@ -0,0 +1,132 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('jsonl', 'parquet', 'ics')
+
+
+def export_chunks(chunks: Iterable[pd.DataFrame], path: str, fmt: str) -> int:
+    """
+    Потоковая запись истории в файл выбранного формата.
+
+    В памяти одновременно находится только один блок, поэтому
+    расход памяти не зависит от длины истории.
+
+    Args:
+        chunks: блоки истории с колонками date, work_minutes
+        path: путь к выходному файлу
+        fmt: 'jsonl', 'parquet' или 'ics'
+
+    Returns:
+        количество экспортированных записей
+    """
+    if fmt == 'jsonl':
+        return _export_jsonl(chunks, path)
+    if fmt == 'parquet':
+        return _export_parquet(chunks, path)
+    if fmt == 'ics':
+        return _export_ics(chunks, path)
+    raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+
+
+def _export_jsonl(chunks: Iterable[pd.DataFrame], path: str) -> int:
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            for date, minutes in zip(chunk['date'], chunk['work_minutes']):
+                f.write(json.dumps({'date': date, 'work_minutes': int(minutes)}))
+                f.write("\n")
+            count += len(chunk)
+    return count
+
+
+def _export_parquet(chunks: Iterable[pd.DataFrame], path: str) -> int:
+    # pyarrow необязателен и долго импортируется: нужен только для Parquet
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Для экспорта в Parquet установите пакет pyarrow")
+    schema = pa.schema([('date', pa.string()), ('work_minutes', pa.int64())])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(
+                chunk[['date', 'work_minutes']].astype({'work_minutes': 'int64'}),
+                schema=schema,
+                preserve_index=False
+            )
+            writer.write_table(table)
+            count += len(chunk)
+    return count
+
+
+def _export_ics(chunks: Iterable[pd.DataFrame], path: str) -> int:
+    """
+    Экспорт в iCalendar: одно событие на каждый день с работой.
+
+    Записи в файле статистики идут по возрастанию даты, поэтому день
+    закрывается, как только встречается следующая дата.
+    """
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    count = 0
+    current_date = None
+    current_minutes = 0
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        def write_event(date: str, minutes: int):
+            day = date.replace('-', '')
+            f.write("BEGIN:VEVENT\r\n")
+            f.write(f"UID:pomodoro-{day}@pomodoro-timer\r\n")
+            f.write(f"DTSTAMP:{stamp}\r\n")
+            f.write(f"DTSTART;VALUE=DATE:{day}\r\n")
+            f.write(f"SUMMARY:Pomodoro: {minutes} мин работы\r\n")
+            f.write(f"X-POMODORO-MINUTES:{minutes}\r\n")
+            f.write("END:VEVENT\r\n")
+
+        f.write("BEGIN:VCALENDAR\r\n")
+        f.write("VERSION:2.0\r\n")
+        f.write("PRODID:-//Pomodoro Timer//RU\r\n")
+        for chunk in chunks:
+            for date, minutes in zip(chunk['date'], chunk['work_minutes']):
+                if date != current_date:
+                    if current_date is not None and current_minutes > 0:
+                        write_event(current_date, current_minutes)
+                    current_date = date
+                    current_minutes = 0
+                current_minutes += int(minutes)
+            count += len(chunk)
+        if current_date is not None and current_minutes > 0:
+            write_event(current_date, current_minutes)
+        f.write("END:VCALENDAR\r\n")
+    return count
+
+
+def clean_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Приведение блока, прочитанного строками, к колонкам date (YYYY-MM-DD) и
+    work_minutes (int64). Строки с неразборчивой датой или минутами
+    отбрасываются, дробные минуты округляются вниз, как в SessionLog.
+    """
+    day = chunk['date'].str.slice(0, 10)
+    minutes = pd.to_numeric(chunk['work_minutes'], errors='coerce')
+    valid = pd.to_datetime(day, format='%Y-%m-%d', errors='coerce').notna() & minutes.notna()
+    if not valid.all():
+        logger.warning(f"Пропущено поврежденных строк истории: {int((~valid).sum())}")
+    return pd.DataFrame({'date': day[valid],
+                         'work_minutes': minutes[valid].astype('float64').astype('int64')})
+
+
+def filter_chunk(chunk: pd.DataFrame,
+                 start_date: Optional[str] = None,
+                 end_date: Optional[str] = None) -> pd.DataFrame:
+    """Отбор записей в диапазоне дат (включительно), даты в формате YYYY-MM-DD"""
+    if start_date:
+        chunk = chunk[chunk['date'] >= start_date]
+    if end_date:
+        chunk = chunk[chunk['date'] <= end_date]
+    return chunk
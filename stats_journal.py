@@ -0,0 +1,278 @@
+import json
+import logging
+import os
+import zlib
+from typing import List, Optional
+import config
+from stats_compaction import STATS_HEADER, _parse_row
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(stats_file: str) -> str:
+    """Путь к описанию сегментов рядом с файлом статистики"""
+    return os.path.splitext(stats_file)[0] + "_segments.json"
+
+
+class Segment:
+    """Запечатанный участок файла статистики: байты [start, end) и их CRC32"""
+    __slots__ = ('start', 'end', 'records', 'minutes', 'crc')
+
+    def __init__(self, start: int, end: int, records: int, minutes: int, crc: int):
+        self.start = start
+        self.end = end
+        self.records = records
+        self.minutes = minutes
+        self.crc = crc
+
+    def to_list(self) -> list:
+        return [self.start, self.end, self.records, self.minutes, self.crc]
+
+
+class RecoveryReport:
+    """Итог проверки хвоста файла статистики"""
+
+    def __init__(self):
+        self.checked_bytes = 0    # Сколько байт прочитано при проверке
+        self.truncated_bytes = 0  # Отрезано от оборванной последней записи
+        self.dropped = ""         # Текст отрезанной записи
+        self.sealed = 0           # Новых запечатанных сегментов
+        self.rebuilt = False      # Описание сегментов построено заново по всему файлу
+
+    @property
+    def repaired(self) -> bool:
+        return self.truncated_bytes > 0
+
+    def summary(self) -> str:
+        lines = [f"Проверено байт: {self.checked_bytes}"
+                 + (" (описание сегментов построено заново)" if self.rebuilt else "")]
+        if self.truncated_bytes:
+            lines.append(f"Отрезана оборванная запись ({self.truncated_bytes} байт): {self.dropped!r}")
+        if self.sealed:
+            lines.append(f"Запечатано сегментов: {self.sealed}")
+        return "\n".join(lines)
+
+
+class StatsJournal:
+    """
+    Файл статистики как журнал только для дописывания, разбитый на сегменты.
+
+    Формат файла не меняется - это тот же CSV, который читают слияние,
+    экспорт, сжатие и сводка команды. Каждые STATS_SEGMENT_RECORDS строк
+    запечатываются в сегмент: его границы, число строк, минуты и CRC32
+    байтов записываются в небольшое описание рядом с файлом (атомарной
+    заменой). Дописывание - одна строка с fsync.
+
+    Проверка при запуске читает только последний запечатанный сегмент
+    (сверка CRC) и незапечатанный хвост после него, то есть не больше
+    двух сегментов независимо от длины истории. Последняя запись без
+    перевода строки считается оборванной сбоем и отрезается. Если файл
+    заменен (другой inode), укорочен или последний сегмент не сходится,
+    описание строится заново по всему файлу.
+
+    После проверки число строк, минуты и CRC незапечатанного хвоста
+    хранятся в памяти и дополняются при каждом дописывании, так что
+    дописывание файл не перечитывает. Проверка повторяется, только если
+    файл изменился не через журнал: сменились inode, размер или время
+    изменения (сжатие истории, запись другим процессом).
+    """
+
+    def __init__(self, stats_file: str = config.STATS_FILE,
+                 segment_records: int = config.STATS_SEGMENT_RECORDS,
+                 manifest_path: Optional[str] = None):
+        self.stats_file = stats_file
+        self.segment_records = segment_records
+        self.manifest_path = manifest_path or manifest_path_for(stats_file)
+        self.segments: List[Segment] = []
+        self.header_end = 0
+        self.inode: Optional[int] = None
+        # Незапечатанный хвост после sealed_end: строки, минуты, CRC и конец
+        self._tail_records = 0
+        self._tail_minutes = 0
+        self._tail_crc = 0
+        self._tail_end = 0
+        self._identity: Optional[tuple] = None  # (inode, размер, mtime) после последней записи
+
+    @property
+    def sealed_end(self) -> int:
+        return self.segments[-1].end if self.segments else self.header_end
+
+    def _load_manifest(self) -> bool:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MANIFEST_VERSION:
+                return False
+            self.inode = data['inode']
+            self.header_end = data['header_end']
+            self.segments = [Segment(*item) for item in data['segments']]
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Описание сегментов повреждено, строим заново: {e}")
+            return False
+
+    def _save_manifest(self):
+        data = {
+            'version': MANIFEST_VERSION,
+            'inode': self.inode,
+            'header_end': self.header_end,
+            'segments': [segment.to_list() for segment in self.segments],
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _last_segment_ok(self, f) -> bool:
+        if not self.segments:
+            return True
+        last = self.segments[-1]
+        f.seek(last.start)
+        return zlib.crc32(f.read(last.end - last.start)) == last.crc
+
+    def _start_over(self, f, report: RecoveryReport):
+        """Описание с нуля: сегменты будут запечатаны по всему файлу"""
+        report.rebuilt = True
+        self.segments = []
+        f.seek(0)
+        header = f.readline()
+        if not header.endswith(b"\n"):
+            # Оборван уже заголовок: записей в файле нет
+            report.truncated_bytes += len(header)
+            report.dropped = header[:80].decode('utf-8', 'replace')
+            f.seek(0)
+            f.truncate()
+            f.write(STATS_HEADER.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+            header = STATS_HEADER.encode('utf-8')
+        self.header_end = len(header)
+
+    def _reset_tail(self):
+        self._tail_records = 0
+        self._tail_minutes = 0
+        self._tail_crc = 0
+        self._tail_end = self.sealed_end
+
+    def _seal(self, data: bytes) -> int:
+        """
+        Учет полных строк data, дописанных в конец хвоста, и запечатывание
+        набравшихся сегментов; возвращает число новых сегментов
+        """
+        sealed = 0
+        position = 0
+        while True:
+            newline = data.find(b"\n", position)
+            if newline < 0:
+                return sealed
+            raw = data[position:newline + 1]
+            position = newline + 1
+            self._tail_records += 1
+            self._tail_end += len(raw)
+            self._tail_crc = zlib.crc32(raw, self._tail_crc)
+            try:
+                parsed = _parse_row(raw)
+            except UnicodeDecodeError:
+                parsed = None
+            if parsed:
+                self._tail_minutes += parsed[1]
+            if self._tail_records == self.segment_records:
+                self.segments.append(Segment(self.sealed_end, self._tail_end, self._tail_records,
+                                             self._tail_minutes, self._tail_crc))
+                sealed += 1
+                self._reset_tail()
+
+    @staticmethod
+    def _identity_of(st: os.stat_result) -> tuple:
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _changed_outside(self) -> bool:
+        """Файл менялся не через журнал после последней проверки или записи"""
+        try:
+            return self._identity_of(os.stat(self.stats_file)) != self._identity
+        except FileNotFoundError:
+            return True
+
+    def recover(self) -> RecoveryReport:
+        """
+        Проверка хвоста, отрезание оборванной записи и запечатывание полных
+        сегментов. Вызывается при запуске и перед дописыванием, если файл
+        менялся не через журнал.
+        """
+        report = RecoveryReport()
+        if not os.path.exists(self.stats_file):
+            return report
+        with open(self.stats_file, 'r+b') as f:
+            st = os.fstat(f.fileno())
+            if self.inode is None and not self._load_manifest():
+                self._start_over(f, report)
+            elif st.st_ino != self.inode or st.st_size < self.sealed_end:
+                self._start_over(f, report)
+            elif not self._last_segment_ok(f):
+                logger.warning("CRC последнего сегмента не сходится, проверяем весь файл")
+                self._start_over(f, report)
+            else:
+                report.checked_bytes += (self.segments[-1].end - self.segments[-1].start
+                                         if self.segments else 0)
+            self.inode = st.st_ino
+            base = self.sealed_end
+            f.seek(base)
+            data = f.read()
+            report.checked_bytes += len(data)
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                # Запись без перевода строки - дописывание прервано сбоем
+                torn = data[complete:]
+                report.truncated_bytes += len(torn)
+                report.dropped = torn[:80].decode('utf-8', 'replace')
+                f.truncate(base + complete)
+                f.flush()
+                os.fsync(f.fileno())
+                logger.warning(f"Отрезана оборванная запись статистики: {report.dropped!r}")
+            self._reset_tail()
+            report.sealed = self._seal(data[:complete])
+            self._identity = self._identity_of(os.fstat(f.fileno()))
+        if report.sealed or report.rebuilt:
+            self._save_manifest()
+        return report
+
+    def append(self, line: str) -> RecoveryReport:
+        """
+        Дописывание одной строки статистики с fsync.
+
+        Хвост проверяется только при первом дописывании и после изменений
+        файла в обход журнала: оборванная запись отрезается, а не склеивается
+        с новой строкой. Иначе строка учитывается в хвосте в памяти.
+        """
+        report = self.recover() if self._changed_outside() else RecoveryReport()
+        data = line.encode('utf-8')
+        with open(self.stats_file, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            self._identity = self._identity_of(os.fstat(f.fileno()))
+        sealed = self._seal(data)
+        if sealed:
+            self._save_manifest()
+            report.sealed += sealed
+        if not data.endswith(b"\n"):
+            # Строка без перевода строки: хвост в памяти больше не совпадает с файлом
+            self._identity = None
+        return report
+
+    def verify(self) -> List[Segment]:
+        """Полная сверка CRC всех запечатанных сегментов; возвращает поврежденные"""
+        self.recover()
+        damaged = []
+        with open(self.stats_file, 'rb') as f:
+            for segment in self.segments:
+                f.seek(segment.start)
+                if zlib.crc32(f.read(segment.end - segment.start)) != segment.crc:
+                    damaged.append(segment)
+        return damaged
@@ -0,0 +1,298 @@
+import heapq
+import json
+import logging
+import os
+import tempfile
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import STATS_CHUNK_SIZE
+from stats_compaction import STATS_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Запись истории: (дата YYYY-MM-DD, ключ для устранения дублей, минуты).
+# Ключ - id или timestamp записи, пустая строка если их нет.
+Record = Tuple[str, str, int]
+
+KEY_COLUMNS = ('id', 'timestamp')
+# Ключ сохраняется в выходе колонкой id, чтобы повторное слияние выхода
+# с другими файлами тоже устраняло дубли
+KEYED_HEADER = STATS_HEADER.rstrip("\n") + ",id\n"
+
+
+def _file_identity(path: str) -> dict:
+    st = os.stat(path)
+    return {'inode': st.st_ino, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class StatsSource:
+    """
+    Потоковый источник записей из файла статистики (CSV или JSON Lines).
+
+    Файл читается построчно с запоминанием смещения в байтах, поэтому
+    повторное слияние может продолжить чтение с места остановки.
+    Незавершенная последняя строка (файл еще дописывается) пропускается.
+    """
+
+    def __init__(self, path: str, offset: int = 0):
+        self.path = path
+        self.offset = offset
+        self.is_jsonl = path.lower().endswith(('.jsonl', '.json'))
+        self._columns: Optional[List[str]] = None
+
+    def _read_header(self, f):
+        if self.is_jsonl:
+            return
+        f.seek(0)
+        header = f.readline().decode('utf-8').strip()
+        self._columns = header.split(',')
+        if self.offset == 0:
+            self.offset = f.tell()
+
+    def _parse(self, line: str) -> Optional[Record]:
+        if self.is_jsonl:
+            data = json.loads(line)
+        else:
+            data = dict(zip(self._columns, line.split(',')))
+        minutes = data.get('work_minutes', data.get('minutes', 0))
+        key = data.get('id') or data.get('timestamp') or ''
+        return str(data['date']), str(key), int(float(minutes))
+
+    def has_key(self) -> bool:
+        """Есть ли у записей id или timestamp: по заголовку CSV или первой записи JSON Lines"""
+        with open(self.path, 'rb') as f:
+            if not self.is_jsonl:
+                return any(name in KEY_COLUMNS
+                           for name in f.readline().decode('utf-8').strip().split(','))
+            for raw in f:
+                if raw.strip():
+                    try:
+                        return any(name in KEY_COLUMNS for name in json.loads(raw))
+                    except ValueError:
+                        return False
+        return False
+
+    def records(self) -> Iterator[Record]:
+        with open(self.path, 'rb') as f:
+            self._read_header(f)
+            f.seek(self.offset)
+            while True:
+                raw = f.readline()
+                if not raw or not raw.endswith(b"\n"):
+                    break
+                line = raw.decode('utf-8').strip()
+                if line:
+                    try:
+                        record = self._parse(line)
+                    except Exception as e:
+                        logger.error(f"Пропущена поврежденная запись в {self.path}: {e}")
+                        record = None
+                    if record is not None:
+                        yield record
+                self.offset = f.tell()
+
+    def is_sorted(self, floor: str = '') -> bool:
+        """Упорядочены ли по дате записи после offset и не раньше ли они floor"""
+        previous_date = floor
+        for date, _, _ in StatsSource(self.path, self.offset).records():
+            if date < previous_date:
+                return False
+            previous_date = date
+        return True
+
+
+def _external_sort(source: StatsSource, directory: str,
+                   chunk_size: int = STATS_CHUNK_SIZE) -> Iterator[Record]:
+    """
+    Записи неупорядоченного источника по дате без загрузки файла в память:
+    блоки по chunk_size записей сортируются и пишутся во временные файлы,
+    которые затем сливаются. Внутри дня порядок записей файла сохраняется.
+    """
+    runs = []
+    records = source.records()
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        chunk.sort(key=itemgetter(0))
+        fd, run_path = tempfile.mkstemp(suffix='.jsonl', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + "\n" for record in chunk)
+        runs.append(run_path)
+    logger.info(f"Записи в {source.path} не упорядочены по дате, "
+                f"сортировка блоками: {len(runs)}")
+    files = [open(run_path, 'r', encoding='utf-8') for run_path in runs]
+    try:
+        streams = [(tuple(json.loads(line)) for line in f) for f in files]
+        yield from heapq.merge(*streams, key=itemgetter(0))
+    finally:
+        for f in files:
+            f.close()
+
+
+class MergeState:
+    """Состояние инкрементального слияния: смещения входов и хвост выхода"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.inputs: Dict[str, dict] = {}
+        self.last_date = ''
+        self.last_keys: List[str] = []
+        self.with_key = False
+        self.output_identity: Optional[dict] = None
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.inputs = data.get('inputs', {})
+                self.last_date = data.get('last_date', '')
+                self.last_keys = data.get('last_keys', [])
+                self.with_key = data.get('with_key', False)
+                self.output_identity = data.get('output')
+            except Exception as e:
+                logger.error(f"Не удалось прочитать состояние слияния: {e}")
+
+    def offset_for(self, path: str) -> Optional[int]:
+        """Смещение, с которого можно дочитать файл, или None если нужен полный проход"""
+        saved = self.inputs.get(os.path.abspath(path))
+        if not saved:
+            return None
+        try:
+            current = _file_identity(path)
+        except OSError:
+            return None
+        # Файл заменен или обрезан - его старое смещение недействительно
+        if current['inode'] != saved['inode'] or current['size'] < saved['offset']:
+            return None
+        return saved['offset']
+
+    def save(self, sources: List[StatsSource], output: str):
+        if not self.path:
+            return
+        data = {
+            'inputs': {
+                os.path.abspath(s.path): dict(_file_identity(s.path), offset=s.offset)
+                for s in sources
+            },
+            'last_date': self.last_date,
+            'last_keys': self.last_keys,
+            'with_key': self.with_key,
+            'output': _file_identity(output),
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+def _merge_records(streams: List[Iterator[Record]], state: MergeState) -> Iterator[Record]:
+    """
+    k-way слияние отсортированных по дате потоков записей с устранением дублей.
+
+    Записи с одинаковым ключом (id/timestamp) за один день считаются одной
+    записью, пришедшей с нескольких устройств. Записи без ключа не
+    объединяются: каждая строка статистики - отдельная минута работы.
+    Множество ключей хранится только для текущего дня, поэтому память
+    не зависит от размера истории.
+    """
+    # Индекс источника в ключе сортировки делает порядок детерминированным
+    streams = [
+        ((date, key, index, minutes) for date, key, minutes in stream)
+        for index, stream in enumerate(streams)
+    ]
+    current_date = state.last_date
+    seen_keys = set(state.last_keys)
+    for date, key, _, minutes in heapq.merge(*streams):
+        if date != current_date:
+            current_date = date
+            seen_keys = set()
+        if key:
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+        yield date, key, minutes
+    state.last_date = current_date
+    state.last_keys = sorted(seen_keys)
+
+
+def _write_records(f, records: Iterator[Record], with_key: bool) -> int:
+    count = 0
+    for date, key, minutes in records:
+        f.write(f"{date},{minutes},{key}\n" if with_key else f"{date},{minutes}\n")
+        count += 1
+    return count
+
+
+def merge_stats(inputs: List[str], output: str,
+                state_file: Optional[str] = None,
+                incremental: bool = False,
+                chunk_size: int = STATS_CHUNK_SIZE) -> int:
+    """
+    Слияние нескольких файлов статистики в одну историю.
+
+    Входы читаются потоково и сливаются по дате, поэтому размер файлов
+    может превышать объем памяти. Вход с записями не по порядку дат
+    сортируется блоками через временные файлы. Если у входов есть id или
+    timestamp, выход получает колонку id. При incremental=True и наличии
+    файла состояния обрабатываются только новые хвосты входов; если хвост
+    содержит записи раньше уже слитых, вход был заменен или выход изменен
+    после прошлого слияния, выполняется полное слияние.
+
+    Args:
+        inputs: пути к файлам статистики (CSV или JSON Lines)
+        output: путь к итоговому CSV
+        state_file: файл состояния для инкрементального слияния
+        incremental: дописывать только новые данные
+        chunk_size: записей в блоке при сортировке неупорядоченного входа
+
+    Returns:
+        количество записанных записей
+    """
+    state = MergeState(state_file)
+    offsets = [state.offset_for(path) for path in inputs]
+    can_append = (
+        incremental
+        and os.path.exists(output)
+        and state.output_identity is not None
+        and _file_identity(output) == state.output_identity
+        and all(offset is not None for offset in offsets)
+    )
+
+    if can_append:
+        count = _append_tails(inputs, offsets, output, state)
+        if count is not None:
+            return count
+        logger.info("Новые записи старше уже слитых, выполняем полное слияние")
+
+    state.last_date = ''
+    state.last_keys = []
+    sources = [StatsSource(path) for path in inputs]
+    state.with_key = any(source.has_key() for source in sources)
+    tmp_path = output + ".tmp"
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as directory:
+        streams = [source.records() if source.is_sorted()
+                   else _external_sort(source, directory, chunk_size)
+                   for source in sources]
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(KEYED_HEADER if state.with_key else STATS_HEADER)
+            count = _write_records(f, _merge_records(streams, state), state.with_key)
+    os.replace(tmp_path, output)
+    state.save(sources, output)
+    logger.info(f"Слияние завершено: {count} записей из {len(inputs)} файлов")
+    return count
+
+
+def _append_tails(inputs: List[str], offsets: List[int], output: str,
+                  state: MergeState) -> Optional[int]:
+    """Дописывание новых хвостов; None если порядок по дате нарушился бы"""
+    sources = [StatsSource(path, offset) for path, offset in zip(inputs, offsets)]
+    # Первый проход только проверяет даты всех новых записей, ничего не записывая
+    if not all(source.is_sorted(state.last_date) for source in sources):
+        return None
+    with open(output, 'a', encoding='utf-8', newline='') as f:
+        count = _write_records(f, _merge_records([source.records() for source in sources], state),
+                               state.with_key)
+    state.save(sources, output)
+    logger.info(f"Инкрементальное слияние: добавлено {count} записей")
+    return count
@@ -0,0 +1,167 @@
+import io
+import logging
+import os
+import threading
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from session_log import SessionLog
+
+logger = logging.getLogger(__name__)
+
+TAIL_CHECK_BYTES = 64  # Столько байт перед смещением сверяется, чтобы заметить перезапись файла
+
+
+class StatsTail:
+    """
+    Чтение файла статистики с хвоста.
+
+    Запоминает смещение в байтах, до которого файл уже разобран, его
+    идентичность (inode, размер, mtime) и последние байты перед смещением.
+    При следующем запросе разбираются только дописанные строки, и они
+    добавляются к истории и суммам по дням. Если файл заменен (другой
+    inode), обрезан (размер меньше смещения) или перезаписан на месте
+    (байты перед смещением другие), история читается заново. Незавершенная
+    последняя строка ждет следующего запроса.
+
+    Один читатель на файл общий для потока GUI и фоновой загрузки окна
+    статистики, поэтому чтение и выборки идут под lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.full_reads = 0  # Сколько раз файл читался с начала
+        self._reset()
+
+    def _reset(self):
+        self.log = SessionLog()
+        self.offset = 0
+        self.identity: Optional[tuple] = None
+        self.first_day: Optional[int] = None
+        self._daily: List[int] = []  # Минуты по дням начиная с first_day
+        self._columns = (0, 1)
+        self._checked = b""  # Последние байты перед offset
+
+    def refresh(self) -> int:
+        """
+        Учет строк, дописанных с прошлого запроса.
+
+        Returns:
+            количество новых записей
+        """
+        with self.lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                if self.offset:
+                    self._reset()
+                return 0
+            identity = (st.st_ino, st.st_size, st.st_mtime_ns)
+            if identity == self.identity:
+                return 0
+            with open(self.path, 'rb') as f:
+                if self.offset and not self._continues(f, st):
+                    logger.info(f"Файл статистики {self.path} заменен, читаем заново")
+                    self._reset()
+                if self.offset == 0:
+                    self.full_reads += 1
+                    f.seek(0)
+                    header = f.readline()
+                    if not header.endswith(b"\n"):
+                        return 0  # Заголовок еще дописывается
+                    self._columns = SessionLog.parse_header(header.decode('utf-8', 'replace'))
+                    self.offset = f.tell()
+                    self._checked = header[-TAIL_CHECK_BYTES:]
+                f.seek(self.offset)
+                data = f.read()
+            self.identity = identity
+            complete = data.rfind(b"\n") + 1
+            if not complete:
+                return 0
+            return self._fold(data[:complete])
+
+    def _continues(self, f, st: os.stat_result) -> bool:
+        """Файл тот же и только дописывался после прошлого чтения"""
+        if st.st_ino != self.identity[0] or st.st_size < self.offset:
+            return False
+        f.seek(self.offset - len(self._checked))
+        return f.read(len(self._checked)) == self._checked
+
+    def _fold(self, chunk: bytes) -> int:
+        """Разбор новых строк и добавление их к истории и суммам по дням"""
+        start = len(self.log)
+        self.log.read_csv(io.StringIO(chunk.decode('utf-8', 'replace')),
+                          with_header=False, columns=self._columns)
+        self.offset += len(chunk)
+        self._checked = (self._checked + chunk)[-TAIL_CHECK_BYTES:]
+        daily = self._daily
+        for ordinal, minutes in zip(self.log.days[start:], self.log.minutes[start:]):
+            if self.first_day is None:
+                self.first_day = ordinal
+            elif ordinal < self.first_day:
+                # Запись раньше начала истории (слияние с другим устройством)
+                daily[:0] = [0] * (self.first_day - ordinal)
+                self.first_day = ordinal
+            index = ordinal - self.first_day
+            if index >= len(daily):
+                daily.extend([0] * (index - len(daily) + 1))
+            daily[index] += minutes
+        return len(self.log) - start
+
+    def minutes_on(self, day: date) -> int:
+        with self.lock:
+            if self.first_day is None:
+                return 0
+            index = day.toordinal() - self.first_day
+            return self._daily[index] if 0 <= index < len(self._daily) else 0
+
+    @property
+    def total_minutes(self) -> int:
+        return self.log.total_minutes
+
+    @property
+    def sessions(self) -> int:
+        return len(self.log)
+
+    def daily_totals(self, start: date, end: date) -> Dict[date, int]:
+        """Суммы минут по дням в диапазоне (включительно), только дни с работой"""
+        with self.lock:
+            if self.first_day is None:
+                return {}
+            first = max(start.toordinal(), self.first_day)
+            last = min(end.toordinal(), self.first_day + len(self._daily) - 1)
+            return {date.fromordinal(ordinal): self._daily[ordinal - self.first_day]
+                    for ordinal in range(first, last + 1)
+                    if self._daily[ordinal - self.first_day]}
+
+    def history(self) -> Tuple[int, np.ndarray]:
+        """
+        Минуты по дням за всю историю без пропусков дат: порядковый номер
+        первого дня и массив минут. Копия растет с числом дней, а не записей.
+        """
+        with self.lock:
+            if self.first_day is None:
+                return date.today().toordinal(), np.zeros(0)
+            return self.first_day, np.array(self._daily, dtype=np.float64)
+
+
+_readers: Dict[str, StatsTail] = {}
+_readers_lock = threading.Lock()
+
+
+def follow(path: str) -> StatsTail:
+    """Общий читатель файла статистики (один на путь в процессе)"""
+    key = os.path.abspath(path)
+    with _readers_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            reader = _readers[key] = StatsTail(path)
+        return reader
+
+
+def forget(path: str):
+    """Освобождение общего читателя, когда файл больше не нужен (пакетная обработка)"""
+    with _readers_lock:
+        _readers.pop(os.path.abspath(path), None)
+
@@ -1,11 +1,115 @@
 import sys
-from datetime import datetime, timedelta
-from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
-                          QWidget, QScrollArea, QFrame, QGridLayout)
-from PyQt6.QtCore import Qt
+import os
+import time
+import logging
+from datetime import date, timedelta
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                          QWidget, QScrollArea, QFrame, QGridLayout, QPushButton,
+                          QButtonGroup)
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtGui import QColor
-import pandas as pd
 import config
+from stats_analytics import StatsAnalytics, snapshot_lock, snapshot_path_for
+from focus_chart import FocusChart, DAILY, WEEKLY
+from stats_tail import follow
+
+logger = logging.getLogger(__name__)
+
+# Кэш загруженных данных: файл статистики -> (версия данных, результат)
+_stats_cache = {}
+
+
+def color_for_minutes(minutes: int) -> str:
+    """Цвет квадрата активности по количеству минут (общий для окна и картинок)"""
+    if minutes == 0:
+        return "#ebedf0"  # Серый
+    elif minutes < 30:
+        return "#9be9a8"  # Светло-зеленый
+    elif minutes < 60:
+        return "#40c463"  # Зеленый
+    elif minutes < 90:
+        return "#30a14e"  # Темно-зеленый
+    else:
+        return "#216e39"  # Очень темный зеленый
+
+
+def _file_version(stats_file: str) -> tuple:
+    """Версия файла статистики: меняется при любой записи или замене файла"""
+    st = os.stat(stats_file)
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _data_version(stats_file: str) -> tuple:
+    """Версия данных окна: после полуночи меняются "сегодня" и неделя, даже без записей"""
+    return _file_version(stats_file) + (date.today(),)
+
+
+def load_stats_data(stats_file: str) -> dict:
+    """
+    Загрузка и агрегация статистики за последние 30 дней.
+
+    Не обращается к виджетам, поэтому выполняется в рабочем потоке.
+    Файл дочитывается общим читателем с хвоста: разбираются только строки,
+    дописанные с прошлого открытия окна или запроса статистики.
+    """
+    version = _data_version(stats_file)
+    tail = follow(stats_file)
+    tail.refresh()
+
+    # Получаем последние 30 дней
+    end_date = version[-1]
+    start_date = end_date - timedelta(days=29)
+
+    # Суммируем минуты по дням
+    date_range = [start_date + timedelta(days=i) for i in range(30)]
+    activity_data = {day: 0 for day in date_range}
+    activity_data.update(tail.daily_totals(start_date, end_date))
+
+    # Серии, неделя и месяц из инкрементального снимка аналитики
+    with snapshot_lock(stats_file):
+        analytics = StatsAnalytics.load(stats_file)
+        analytics.save(snapshot_path_for(stats_file))
+    # Суммы по дням за всю историю для графика считаются здесь же, в рабочем потоке
+    history_start, history = tail.history()
+
+    return {
+        'version': version,
+        'date_range': date_range,
+        'activity_data': activity_data,
+        'total_minutes': sum(activity_data.values()),
+        'active_days': sum(1 for minutes in activity_data.values() if minutes > 0),
+        'current_streak': analytics.get_current_streak(),
+        'longest_streak': analytics.longest_streak,
+        'week_total': analytics.get_week_total(),
+        'month_total': analytics.get_month_total(),
+        'rolling_average': analytics.get_rolling_average(7),
+        'history_start': history_start,
+        'history': history,
+    }
+
+
+class StatsLoaderSignals(QObject):
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class StatsLoader(QRunnable):
+    """Фоновая загрузка статистики в QThreadPool"""
+
+    def __init__(self, stats_file: str):
+        super().__init__()
+        self.stats_file = stats_file
+        self.signals = StatsLoaderSignals()
+
+    def run(self):
+        try:
+            data = load_stats_data(self.stats_file)
+            _stats_cache[self.stats_file] = (data['version'], data)
+            self.signals.loaded.emit(data)
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке статистики: {e}")
+            self.signals.failed.emit(str(e))
+
 
 class ContributionSquare(QFrame):
     def __init__(self, color: str, tooltip: str):
@@ -17,124 +121,166 @@ class ContributionSquare(QFrame):
 class StatsWindow(QDialog):
     def __init__(self, stats_file: str):
         super().__init__()
+        self._opened_at = time.perf_counter()
+        self._first_paint_logged = False
         self.stats_file = stats_file
+        self._loader = None
         self.init_ui()
-        
+
     def init_ui(self):
         self.setWindowTitle("Статистика Помодоро")
-        self.setFixedSize(600, 400)
-        
+        self.setFixedSize(600, 620)
+
         layout = QVBoxLayout(self)
-        
+
         # Заголовок
         title = QLabel("Ваша активность за последний месяц")
         title.setStyleSheet("font-size: 16px; font-weight: bold; margin-bottom: 10px;")
         layout.addWidget(title)
-        
-        # Создаем виджет с сеткой
-        container = QWidget()
-        grid_layout = QGridLayout(container)
-        grid_layout.setSpacing(5)  # Отступы между квадратиками
-        
-        # Загружаем данные
+
+        # Область данных: до окончания загрузки показываем заглушку
+        self.content_layout = QVBoxLayout()
+        self.placeholder_label = QLabel("Загрузка статистики...")
+        self.placeholder_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.placeholder_label.setStyleSheet("color: #666;")
+        self.content_layout.addWidget(self.placeholder_label, 1)
+        layout.addLayout(self.content_layout, 1)
+
+        # Легенда
+        legend_layout = QHBoxLayout()
+        legend_layout.addWidget(QLabel("Меньше"))
+        for minutes in [0, 30, 60, 90, 120]:
+            square = ContributionSquare(self._get_color_for_minutes(minutes),
+                                      f"{minutes} минут")
+            legend_layout.addWidget(square)
+        legend_layout.addWidget(QLabel("Больше"))
+        legend_layout.addStretch()
+        layout.addLayout(legend_layout)
+
+        self._start_loading()
+
+    def _start_loading(self):
+        """Данные из кэша, если файл не менялся, иначе загрузка в фоне"""
+        try:
+            cached = _stats_cache.get(self.stats_file)
+            if cached and cached[0] == _data_version(self.stats_file):
+                self._show_data(cached[1])
+                return
+        except OSError:
+            pass
+        self._loader = StatsLoader(self.stats_file)
+        self._loader.signals.loaded.connect(self._show_data)
+        self._loader.signals.failed.connect(self._show_error)
+        QThreadPool.globalInstance().start(self._loader)
+
+    def _show_error(self, message: str):
+        self.placeholder_label.setText(f"Ошибка при загрузке статистики: {message}")
+
+    def _show_data(self, data: dict):
+        """Построение сетки активности по готовым данным (в потоке GUI)"""
         try:
-            df = pd.read_csv(self.stats_file)
-            df['date'] = pd.to_datetime(df['date'])
-            
-            # Переименовываем колонку, если нужно
-            if 'work_minutes' in df.columns:
-                df = df.rename(columns={'work_minutes': 'minutes'})
-            
-            # Группируем данные по дате и суммируем минуты
-            df = df.groupby('date')['minutes'].sum().reset_index()
-            
-            # Получаем последние 30 дней
-            end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            start_date = end_date - timedelta(days=29)
-            
+            self.content_layout.removeWidget(self.placeholder_label)
+            self.placeholder_label.hide()
+            self.placeholder_label.deleteLater()
+
+            # Создаем виджет с сеткой
+            container = QWidget()
+            grid_layout = QGridLayout(container)
+            grid_layout.setSpacing(5)  # Отступы между квадратиками
+
             # Добавляем метки дней недели
             days = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
             for i, day in enumerate(days):
                 label = QLabel(day)
                 label.setStyleSheet("color: #666;")
                 grid_layout.addWidget(label, i, 0)
-            
-            # Создаем календарь активности
-            date_range = pd.date_range(start=start_date, end=end_date)
-            activity_data = {date: 0 for date in date_range}
-            total_minutes = 0
-            active_days = 0
-            
-            # Заполняем данными
-            for _, row in df.iterrows():
-                date = row['date'].replace(hour=0, minute=0, second=0, microsecond=0)
-                if date in activity_data:
-                    minutes = row['minutes']
-                    activity_data[date] = minutes
-                    total_minutes += minutes
-                    if minutes > 0:
-                        active_days += 1
-            
+
             # Заполняем сетку
+            activity_data = data['activity_data']
             current_col = 1
-            for date in date_range:
-                minutes = activity_data[date]
+            for day in data['date_range']:
+                minutes = activity_data[day]
                 color = self._get_color_for_minutes(minutes)
-                tooltip = f"{date.strftime('%d.%m.%Y')}\n{minutes} минут"
+                tooltip = f"{day.strftime('%d.%m.%Y')}\n{minutes} минут"
                 square = ContributionSquare(color, tooltip)
                 # Размещаем квадратик в нужной позиции (день недели, номер столбца)
-                grid_layout.addWidget(square, date.weekday(), current_col)
-                
-                if date.weekday() == 6:  # Воскресенье
+                grid_layout.addWidget(square, day.weekday(), current_col)
+
+                if day.weekday() == 6:  # Воскресенье
                     current_col += 1
-            
-            layout.addWidget(container)
-            
+
+            self.content_layout.addWidget(container)
+
             # Добавляем статистику
             stats_layout = QHBoxLayout()
-            
+            total_minutes = data['total_minutes']
+            active_days = data['active_days']
+
             # Всего минут
             total_label = QLabel(f"Всего минут: {total_minutes}")
             total_label.setStyleSheet("font-weight: bold; margin: 10px;")
             stats_layout.addWidget(total_label)
-            
+
             # Активных дней
             active_label = QLabel(f"Активных дней: {active_days}")
             active_label.setStyleSheet("font-weight: bold; margin: 10px;")
             stats_layout.addWidget(active_label)
-            
+
             # Среднее в день
             avg_minutes = round(total_minutes / max(active_days, 1))
             avg_label = QLabel(f"Среднее в день: {avg_minutes} мин")
             avg_label.setStyleSheet("font-weight: bold; margin: 10px;")
             stats_layout.addWidget(avg_label)
-            
-            layout.addLayout(stats_layout)
-            
+
+            self.content_layout.addLayout(stats_layout)
+
+            # Серии, неделя и месяц
+            trends_layout = QHBoxLayout()
+            for text in (f"Серия: {data['current_streak']} дн. "
+                         f"(лучшая {data['longest_streak']})",
+                         f"Неделя: {data['week_total']} мин",
+                         f"Месяц: {data['month_total']} мин",
+                         f"За 7 дней: {data['rolling_average']} мин/день"):
+                trend_label = QLabel(text)
+                trend_label.setStyleSheet("color: #666; margin: 0 10px;")
+                trends_layout.addWidget(trend_label)
+            self.content_layout.addLayout(trends_layout)
+
+            # График за всю историю
+            chart_header = QHBoxLayout()
+            chart_header.addWidget(QLabel("Вся история"))
+            chart_header.addStretch()
+            self.chart = FocusChart()
+            # Группа кнопок вместо замыканий на self: замыкание в слоте держит окно
+            # в цикле ссылок, и закрытые окна копятся до сборки мусора
+            self.chart_modes = QButtonGroup(self)
+            for index, text in enumerate(("По дням", "По неделям")):
+                button = QPushButton(text)
+                button.setCheckable(True)
+                button.setChecked(index == 0)
+                self.chart_modes.addButton(button, index)
+                chart_header.addWidget(button)
+            self.chart_modes.idClicked.connect(self._set_chart_mode)
+            self.content_layout.addLayout(chart_header)
+            self.chart.set_history(data['history_start'], data['history'])
+            self.chart.setToolTip("Колесо мыши - масштаб, перетаскивание - сдвиг, "
+                                  "двойной щелчок - вся история")
+            self.content_layout.addWidget(self.chart, 1)
+
         except Exception as e:
             error_label = QLabel(f"Ошибка при загрузке статистики: {str(e)}")
-            layout.addWidget(error_label)
-        
-        # Легенда
-        legend_layout = QHBoxLayout()
-        legend_layout.addWidget(QLabel("Меньше"))
-        for minutes in [0, 30, 60, 90, 120]:
-            square = ContributionSquare(self._get_color_for_minutes(minutes), 
-                                      f"{minutes} минут")
-            legend_layout.addWidget(square)
-        legend_layout.addWidget(QLabel("Больше"))
-        legend_layout.addStretch()
-        layout.addLayout(legend_layout)
-    
+            self.content_layout.addWidget(error_label)
+
+    def _set_chart_mode(self, index: int):
+        self.chart.set_mode((DAILY, WEEKLY)[index])
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_logged:
+            self._first_paint_logged = True
+            elapsed_ms = (time.perf_counter() - self._opened_at) * 1000
+            logger.info(f"Окно статистики: первая отрисовка через {elapsed_ms:.1f} мс")
+
     def _get_color_for_minutes(self, minutes: int) -> str:
         """Получение цвета в зависимости от количества минут"""
-        if minutes == 0:
-            return "#ebedf0"  # Серый
-        elif minutes < 30:
-            return "#9be9a8"  # Светло-зеленый
-        elif minutes < 60:
-            return "#40c463"  # Зеленый
-        elif minutes < 90:
-            return "#30a14e"  # Темно-зеленый
-        else:
-            return "#216e39"  # Очень темный зеленый
+        return color_for_minutes(minutes)
@@ -0,0 +1,211 @@
+import glob
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from functools import reduce
+from typing import Dict, List, Optional
+import numpy as np
+import config
+from session_log import SessionLog
+
+logger = logging.getLogger(__name__)
+
+
+def _week_key(day: date) -> str:
+    iso_year, iso_week, _ = day.isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"
+
+
+class UserSummary:
+    """Итоги одного участника по его файлу статистики"""
+    __slots__ = ('user', 'total_minutes', 'active_days', 'longest_streak',
+                 'last_streak', 'first_day', 'last_day', 'last_week', 'last_week_minutes')
+
+    def __init__(self, user: str):
+        self.user = user
+        self.total_minutes = 0
+        self.active_days = 0
+        self.longest_streak = 0
+        self.last_streak = 0  # Серия, которой заканчивается история
+        self.first_day: Optional[int] = None
+        self.last_day: Optional[int] = None
+        self.last_week: Optional[str] = None  # Неделя последней записи и минуты за нее
+        self.last_week_minutes = 0
+
+    def week_minutes(self, today: date) -> int:
+        return self.last_week_minutes if self.last_week == _week_key(today) else 0
+
+    def current_streak(self, today: date) -> int:
+        """Серия на сегодня: прерывается, если вчера и сегодня не было работы"""
+        if self.last_day is None or today.toordinal() - self.last_day > 1:
+            return 0
+        return self.last_streak
+
+
+class PartialReport:
+    """
+    Частичный итог по одному или нескольким файлам.
+
+    Итоги по файлам независимы, поэтому считаются в отдельных процессах
+    и затем сливаются через merge в любом порядке.
+    """
+
+    def __init__(self):
+        self.daily: Dict[int, int] = {}   # Порядковый номер дня -> минуты всей команды
+        self.weekly: Dict[str, int] = {}  # "2025-W03" -> минуты всей команды
+        self.users: Dict[str, UserSummary] = {}
+        self.records = 0
+
+    def merge(self, other: "PartialReport") -> "PartialReport":
+        for day, minutes in other.daily.items():
+            self.daily[day] = self.daily.get(day, 0) + minutes
+        for week, minutes in other.weekly.items():
+            self.weekly[week] = self.weekly.get(week, 0) + minutes
+        for user, summary in other.users.items():
+            if user in self.users:
+                # Имена делает уникальными unique_user_names до раздачи файлов исполнителям
+                raise ValueError(f"Участник {user} встречается в двух частичных итогах")
+            self.users[user] = summary
+        self.records += other.records
+        return self
+
+
+def user_name(path: str, root: str) -> str:
+    """Имя участника: имя файла, а для стандартного имени файла - имя папки"""
+    relative = os.path.relpath(path, root)
+    if os.path.basename(relative) == config.STATS_FILE and os.path.dirname(relative):
+        return os.path.dirname(relative).replace(os.sep, '/')
+    return os.path.splitext(relative)[0].replace(os.sep, '/')
+
+
+def unique_user_names(paths: List[str], root: str) -> List[str]:
+    """
+    Имена участников для путей. Одно имя у двух файлов ("alice/pomodoro_stats.csv"
+    и "alice.csv") различается номером по порядку отсортированных путей, поэтому
+    не зависит от числа процессов и порядка их завершения.
+    """
+    names: Dict[str, str] = {}
+    seen: Dict[str, int] = {}
+    for path in sorted(paths):
+        user = user_name(path, root)
+        seen[user] = seen.get(user, 0) + 1
+        names[path] = user if seen[user] == 1 else f"{user} ({seen[user]})"
+    return [names[path] for path in paths]
+
+
+def aggregate_file(path: str, user: str) -> PartialReport:
+    """
+    Итоги по одному файлу статистики; выполняется в процессе-исполнителе.
+
+    Файл читается через SessionLog, дальше все суммы и серии считаются
+    векторно по массивам дней без обхода записей в Python.
+    """
+    partial = PartialReport()
+    summary = UserSummary(user)
+    partial.users[user] = summary
+    try:
+        log = SessionLog.load(path)
+    except Exception as e:
+        logger.error(f"Ошибка при чтении {path}: {e}")
+        return partial
+    if not len(log):
+        return partial
+    days = np.frombuffer(log.days, dtype=np.int32)
+    minutes = np.frombuffer(log.minutes, dtype=np.int32)
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    day_totals = np.bincount(inverse, weights=minutes).astype(np.int64)
+
+    partial.records = len(log)
+    partial.daily = dict(zip(unique_days.tolist(), day_totals.tolist()))
+    # Недели ISO: понедельник недели одинаков для всех ее дней
+    mondays = unique_days - (unique_days + 6) % 7  # date.fromordinal(1) - понедельник
+    week_starts, week_inverse = np.unique(mondays, return_inverse=True)
+    week_totals = np.bincount(week_inverse, weights=day_totals).astype(np.int64)
+    partial.weekly = {_week_key(date.fromordinal(monday)): total
+                      for monday, total in zip(week_starts.tolist(), week_totals.tolist())}
+    summary.last_week = _week_key(date.fromordinal(int(week_starts[-1])))
+    summary.last_week_minutes = int(week_totals[-1])
+
+    # Активный день - любой день с записью, как в StatsAnalytics
+    summary.total_minutes = int(day_totals.sum())
+    summary.active_days = len(unique_days)
+    # Серии - отрезки подряд идущих дней между разрывами
+    breaks = np.flatnonzero(np.diff(unique_days) != 1)
+    bounds = np.concatenate(([0], breaks + 1, [len(unique_days)]))
+    runs = np.diff(bounds)
+    summary.longest_streak = int(runs.max())
+    summary.last_streak = int(runs[-1])
+    summary.first_day = int(unique_days[0])
+    summary.last_day = int(unique_days[-1])
+    return partial
+
+
+def _aggregate_chunk(jobs: List[tuple]) -> PartialReport:
+    """Итоги по группе файлов: меньше результатов на передачу между процессами"""
+    return reduce(PartialReport.merge, (aggregate_file(path, user) for path, user in jobs),
+                  PartialReport())
+
+
+class TeamReport:
+    """Сводка по команде после слияния частичных итогов"""
+
+    def __init__(self, partial: PartialReport, today: Optional[date] = None):
+        self.partial = partial
+        self.today = today or date.today()
+
+    @property
+    def total_minutes(self) -> int:
+        return sum(self.partial.daily.values())
+
+    def recent_weeks(self, weeks: int) -> List[tuple]:
+        """Минуты команды за последние недели, от ранних к поздним"""
+        monday = self.today - timedelta(days=self.today.weekday())
+        keys = [_week_key(monday - timedelta(weeks=offset)) for offset in range(weeks - 1, -1, -1)]
+        return [(key, self.partial.weekly.get(key, 0)) for key in keys]
+
+    def table(self, weeks: int = 4) -> str:
+        """Текстовая таблица: строка на участника и итоги команды по неделям"""
+        lines = [f"{'Участник':<20} {'Всего':>8} {'Дней':>6} {'В день':>7} "
+                 f"{'Серия':>6} {'Рекорд':>7} {'Неделя':>7}"]
+        users = sorted(self.partial.users.values(), key=lambda s: s.total_minutes, reverse=True)
+        for summary in users:
+            per_day = summary.total_minutes / summary.active_days if summary.active_days else 0
+            lines.append(f"{summary.user[:20]:<20} {summary.total_minutes:>8} "
+                         f"{summary.active_days:>6} {per_day:>7.1f} "
+                         f"{summary.current_streak(self.today):>6} {summary.longest_streak:>7} "
+                         f"{summary.week_minutes(self.today):>7}")
+        lines.append(f"Команда: {len(users)} участников, {self.total_minutes} мин, "
+                     f"{self.partial.records} записей")
+        for key, minutes in self.recent_weeks(weeks):
+            lines.append(f"  {key}: {minutes} мин")
+        return "\n".join(lines)
+
+
+def find_stats_files(directory: str) -> List[str]:
+    """Файлы статистики в папке и вложенных папках"""
+    return sorted(glob.glob(os.path.join(directory, '**', '*.csv'), recursive=True))
+
+
+def build_team_report(directory: str, workers: Optional[int] = None,
+                      today: Optional[date] = None) -> TeamReport:
+    """
+    Сводка по всем файлам статистики в папке.
+
+    Файлы делятся на группы, каждая группа считается в отдельном процессе
+    ProcessPoolExecutor, частичные итоги сливаются в основном процессе.
+    При workers=1 все считается в текущем процессе без накладных расходов
+    на запуск исполнителей.
+    """
+    paths = find_stats_files(directory)
+    jobs = list(zip(paths, unique_user_names(paths, directory)))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 2:
+        return TeamReport(_aggregate_chunk(jobs), today)
+    # По несколько групп на исполнителя, чтобы крупные файлы не держали остальных
+    chunk_count = min(len(jobs), workers * 4)
+    chunks = [jobs[index::chunk_count] for index in range(chunk_count)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(_aggregate_chunk, chunks)
+        return TeamReport(reduce(PartialReport.merge, partials, PartialReport()), today)
+
@@ -0,0 +1,342 @@
+import itertools
+import json
+import logging
+import queue
+import selectors
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+import config
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+MAX_CLIENT_BUFFER = 64 * 1024  # Отстающий участник отключается, чтобы не тормозить остальных
+
+
+def make_phase_message(timer, seq: int, state=None) -> dict:
+    """
+    Компактное сообщение о фазе: не тики, а остаток времени на момент отправки.
+
+    Участник сам считает локальный дедлайн от момента получения, поэтому
+    расхождение часов машин не влияет, ошибка - только задержка сети.
+    """
+    state = state or timer.state
+    left = float(state.time_left)
+    if state.is_running and not state.is_paused:
+        # Доля секунды, прошедшая с последнего тика
+        left = max(left - (time.monotonic() - state.last_tick_at), left - 1, 0.0)
+    return {
+        'v': PROTOCOL_VERSION,
+        'seq': seq,
+        'phase': state.phase_index,
+        'kind': timer.timeline.phases[state.phase_index].kind,
+        'left': round(left, 3),
+        'running': state.is_running,
+        'paused': state.is_paused,
+        'durations': [timer.work_time, timer.short_break, timer.long_break, timer.rounds],
+        'plan': timer.plan,
+    }
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    """Адрес вида "host:port", "host" или ":port"; недостающее берется из config"""
+    host, sep, port = value.strip().rpartition(':')
+    if not sep:
+        host, port = port, ''
+    return host or config.TEAM_HOST, int(port) if port else config.TEAM_PORT
+
+
+def _encode(message: dict) -> bytes:
+    return (json.dumps(message, separators=(',', ':')) + "\n").encode('utf-8')
+
+
+class _ClientConnection:
+    __slots__ = ('sock', 'address', 'outbox')
+
+    def __init__(self, sock: socket.socket, address):
+        self.sock = sock
+        self.address = address
+        self.outbox = bytearray()
+
+
+class TeamHost:
+    """
+    Ведущий командной сессии: рассылает сообщения о фазах всем участникам.
+
+    Все операции с сокетами выполняются в одном потоке на selectors.
+    Сообщение кодируется один раз и раскладывается по неблокирующим
+    буферам участников; новому или переподключившемуся участнику сразу
+    отправляется последнее сообщение с пересчитанным остатком времени.
+    Пока таймер идет, то же сообщение с остатком на текущий момент
+    рассылается каждые resync_seconds, чтобы часы участников не уходили
+    от ведущего за длинную фазу.
+
+    Протокол без авторизации: по умолчанию ведущий слушает только loopback,
+    в локальной сети нужно явно указать адрес своего интерфейса.
+    """
+
+    def __init__(self, host: str = config.TEAM_HOST, port: int = config.TEAM_PORT,
+                 resync_seconds: float = config.TEAM_RESYNC_SECONDS):
+        self.host = host
+        self.port = port
+        self.resync_seconds = resync_seconds
+        self._selector = selectors.DefaultSelector()
+        self._clients: Dict[int, _ClientConnection] = {}
+        self._outgoing = queue.SimpleQueue()
+        self._last_message: Optional[dict] = None
+        self._last_published = 0.0
+        self._last_sent = 0.0
+        self.wakeups = 0  # Пробуждения потока сети, для замера частоты пробуждений
+        self._seq = itertools.count(1)
+        self._running = False
+        self._thread = None
+        self._server = None
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def start(self):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.host, self.port))
+        self.port = self._server.getsockname()[1]
+        self._server.listen(256)
+        self._server.setblocking(False)
+        self._selector.register(self._server, selectors.EVENT_READ, 'accept')
+        self._selector.register(self._wake_r, selectors.EVENT_READ, 'wake')
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        logger.info(f"Командная сессия: ведущий на {self.host}:{self.port}")
+        if self.host in ('', '0.0.0.0', '::'):
+            logger.warning("Командная сессия открыта на всех интерфейсах без авторизации")
+
+    def stop(self):
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def publish(self, timer, state=None):
+        """
+        Рассылка фазы таймера; можно вызывать из любого потока.
+        state - TimerStatus из события шины, по умолчанию текущее состояние.
+        """
+        self._outgoing.put((make_phase_message(timer, next(self._seq), state), time.monotonic()))
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # Буфер пробуждения уже не пуст
+
+    def _loop(self):
+        while self._running:
+            ready = self._selector.select(timeout=self._select_timeout())
+            self.wakeups += 1
+            for key, events in ready:
+                try:
+                    if key.data == 'accept':
+                        self._accept()
+                    elif key.data == 'wake':
+                        self._drain_wake()
+                    else:
+                        self._handle_client(key.data, events)
+                except Exception as e:
+                    logger.error(f"Ошибка командной сессии: {e}")
+            if self._resync_due():
+                self._broadcast(self._resync_message(next(self._seq)))
+        for client in list(self._clients.values()):
+            self._drop(client)
+        self._selector.close()
+        self._server.close()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, address = self._server.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _ClientConnection(sock, address)
+            self._clients[sock.fileno()] = client
+            self._selector.register(sock, selectors.EVENT_READ, client)
+            if self._last_message:
+                self._queue_to(client, _encode(self._resync_message()))
+
+    def _drain_wake(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        while True:
+            try:
+                self._last_message, self._last_published = self._outgoing.get_nowait()
+            except queue.Empty:
+                break
+            self._broadcast(self._last_message)
+
+    def _broadcast(self, message: dict):
+        payload = _encode(message)
+        self._last_sent = time.monotonic()
+        for client in list(self._clients.values()):
+            self._queue_to(client, payload)
+
+    def _resync_pending(self) -> bool:
+        """Повторная рассылка нужна: таймер идет и есть кому рассылать"""
+        return (self.resync_seconds > 0 and self._last_message is not None
+                and self._last_message['running'] and bool(self._clients))
+
+    def _resync_due(self) -> bool:
+        """Пора разослать остаток времени заново: таймер идет, а рассылок давно не было"""
+        return (self._resync_pending()
+                and time.monotonic() - self._last_sent >= self.resync_seconds)
+
+    def _select_timeout(self) -> float:
+        # Без ожидающей рассылки срок от _last_sent не сдвигается: нулевой
+        # таймаут крутил бы цикл вхолостую
+        if not self._resync_pending():
+            return 1.0
+        return min(1.0, max(0.0, self._last_sent + self.resync_seconds - time.monotonic()))
+
+    def _resync_message(self, seq: Optional[int] = None) -> dict:
+        """Последнее сообщение с остатком времени на текущий момент"""
+        message = dict(self._last_message)
+        if seq is not None:
+            message['seq'] = seq
+        if message['running'] and not message['paused']:
+            elapsed = time.monotonic() - self._last_published
+            message['left'] = round(max(0.0, message['left'] - elapsed), 3)
+        return message
+
+    def _queue_to(self, client: _ClientConnection, payload: bytes):
+        if len(client.outbox) + len(payload) > MAX_CLIENT_BUFFER:
+            logger.warning(f"Участник {client.address} не успевает принимать, отключаем")
+            self._drop(client)
+            return
+        client.outbox += payload
+        self._flush(client)
+
+    def _flush(self, client: _ClientConnection):
+        try:
+            sent = client.sock.send(client.outbox)
+            del client.outbox[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(client)
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbox else 0)
+        self._selector.modify(client.sock, events, client)
+
+    def _handle_client(self, client: _ClientConnection, events: int):
+        if events & selectors.EVENT_READ:
+            try:
+                if not client.sock.recv(4096):
+                    self._drop(client)
+                    return
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._drop(client)
+                return
+        if events & selectors.EVENT_WRITE:
+            self._flush(client)
+
+    def _drop(self, client: _ClientConnection):
+        if self._clients.pop(client.sock.fileno(), None) is None:
+            return
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+
+class TeamClient:
+    """
+    Участник командной сессии: принимает сообщения о фазах и
+    переподключается с нарастающей задержкой при обрыве связи.
+    """
+
+    def __init__(self, host: str, port: int = config.TEAM_PORT,
+                 on_message: Optional[Callable[[dict], None]] = None):
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.last_message: Optional[dict] = None
+        self.received_at = 0.0
+        self._running = False
+        self._thread = None
+        self._sock = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._sock:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def time_left(self) -> float:
+        """Остаток текущей фазы по локальным часам"""
+        if not self.last_message:
+            return 0.0
+        left = self.last_message['left']
+        if self.last_message['running'] and not self.last_message['paused']:
+            left -= time.monotonic() - self.received_at
+        return max(0.0, left)
+
+    def _loop(self):
+        delay = 0.5
+        while self._running:
+            try:
+                self._sock = socket.create_connection((self.host, self.port), timeout=5)
+                self._sock.settimeout(None)
+                self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                logger.info(f"Подключено к командной сессии {self.host}:{self.port}")
+                delay = 0.5
+                with self._sock.makefile('rb') as stream:
+                    for line in stream:
+                        self._handle_line(line)
+            except OSError as e:
+                if self._running:
+                    logger.warning(f"Нет связи с ведущим командной сессии: {e}")
+            finally:
+                if self._sock:
+                    self._sock.close()
+            if self._running:
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    def _handle_line(self, line: bytes):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return
+        if message.get('v') != PROTOCOL_VERSION:
+            return
+        self.received_at = time.monotonic()
+        self.last_message = message
+        if self.on_message:
+            try:
+                self.on_message(message)
+            except Exception as e:
+                logger.error(f"Ошибка обработки сообщения командной сессии: {e}")
+
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Окна в тестах создаются без экрана, звук - без устройства
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """Одно приложение Qt на все тесты: второе в процессе создать нельзя"""
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+@pytest.fixture
+def stats_file(tmp_path):
+    """Путь к файлу статистики во временной папке (файл не создается)"""
+    return str(tmp_path / "pomodoro_stats.csv")
@@ -0,0 +1,21 @@
+import pytest
+from cli import COMMANDS, build_parser, is_cli_command
+
+
+def test_every_command_is_recognized_and_parsed():
+    parser = build_parser()
+    required = {"export": ["out.jsonl"], "merge": ["out.csv", "a.csv"], "replay": ["trace.jsonl"],
+                "team-report": ["team"], "heatmaps": ["team"], "stalls": ["stalls.jsonl"],
+                "send": ["pause"]}
+    for name, _, handler in COMMANDS:
+        assert is_cli_command([name, "--help"])
+        args = parser.parse_args([name] + required.get(name, []))
+        assert args.command == name and args.handler is handler
+
+
+def test_qt_options_are_not_commands():
+    assert not is_cli_command([])
+    assert not is_cli_command(["-style", "fusion"])
+    assert not is_cli_command(["exports"])
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["unknown"])
@@ -0,0 +1,36 @@
+import time
+from countdown_widget import CountdownDisplay, GlyphAtlas
+
+
+def test_digits_share_one_cell_width(qapp):
+    display = CountdownDisplay("00:00")
+    assert display.sizeHint() == CountdownDisplay("11:11").sizeHint()
+    cells = [rect for _, rect in display._cells("00:00")]
+    assert [rect.width() for rect in cells] == [rect.width() for _, rect in display._cells("18:47")]
+
+
+def test_atlas_is_shared_between_widgets(qapp):
+    first, second = CountdownDisplay("25:00"), CountdownDisplay("24:59")
+    assert first._atlas() is second._atlas()
+    assert set(first._atlas().sources) == set("0123456789:")
+    assert isinstance(first._atlas(), GlyphAtlas)
+
+
+def test_smooth_strip_wakes_only_when_enabled(qapp):
+    display = CountdownDisplay("25:00")
+    display.resize(300, 120)
+    display.set_progress(1500, 1500)
+    deadline = time.monotonic() + 0.3
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    assert display.smooth_frames == 0
+    display.set_smooth(True, fps=50)
+    display.set_progress(1499, 1500)
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    display.set_smooth(False)
+    assert display.smooth_frames >= 10
+    assert 0 < display.progress() < 0.01
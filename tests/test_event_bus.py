@@ -0,0 +1,49 @@
+import threading
+import time
+from event_bus import EVERY, LATEST, THROTTLE, EventBus
+
+
+def publish_ticks(bus, seconds: float):
+    deadline = time.monotonic() + seconds
+    published = 0
+    while time.monotonic() < deadline:
+        bus.publish('tick', published)
+        published += 1
+        time.sleep(0.002)
+    return published
+
+
+def test_every_delivers_in_order():
+    bus = EventBus()
+    received = []
+    done = threading.Event()
+    bus.subscribe('tick', lambda n: (received.append(n), n == 99 and done.set()), EVERY)
+    for n in range(100):
+        bus.publish('tick', n)
+    assert done.wait(2)
+    bus.close()
+    assert received == list(range(100))
+
+
+def test_slow_and_stuck_subscribers_do_not_block_publish():
+    bus = EventBus()
+    release = threading.Event()
+    fast = bus.subscribe('tick', lambda n: None, EVERY, name='fast')
+    slow = bus.subscribe('tick', lambda n: time.sleep(0.05), LATEST, name='slow')
+    throttled = bus.subscribe('tick', lambda n: None, THROTTLE, rate_hz=10, name='throttled')
+    stuck = bus.subscribe('tick', lambda n: release.wait(5), EVERY, timeout=0.2, name='stuck')
+    started = time.monotonic()
+    published = publish_ticks(bus, 1.0)
+    elapsed = time.monotonic() - started
+    time.sleep(0.2)
+    counters = bus.counters()
+    release.set()
+    bus.close()
+    assert elapsed < 1.5, "Публикация ждала подписчиков"
+    assert counters['fast']['delivered'] == published
+    assert counters['slow']['coalesced'] > 0
+    assert counters['slow']['delivered'] < published / 5
+    # Не чаще 10 раз в секунду, плюс первое событие
+    assert counters['throttled']['delivered'] <= 13
+    assert counters['stuck']['timeouts'] == 1 and counters['stuck']['dropped'] > 0
+    assert fast.published == slow.published == throttled.published == stuck.published == published
@@ -0,0 +1,61 @@
+from datetime import date
+import numpy as np
+from focus_chart import MIN_VISIBLE_POINTS, FocusChart, lttb
+
+
+def make_chart(daily, width=560):
+    chart = FocusChart()
+    chart.resize(width, 180)
+    chart.set_history(date.today().toordinal() - len(daily), daily)
+    return chart
+
+
+def test_lttb_keeps_ends_and_peaks():
+    y = np.zeros(10000)
+    y[1234] = 500.0
+    x = np.arange(len(y), dtype=np.float64)
+    xs, ys = lttb(x, y, 200)
+    assert len(xs) == 200
+    assert xs[0] == 0 and xs[-1] == len(y) - 1
+    assert 500.0 in ys
+
+
+def test_polygon_fits_plot_rect(qapp):
+    rng = np.random.default_rng(2)
+    chart = make_chart(rng.integers(0, 240, 2000).astype(np.float64))
+    rect = chart._plot_rect()
+    polygon, peak, first, last = chart._points(rect)
+    assert polygon.count() == int(rect.width())
+    assert (first, last) == (0, 1999)
+    xs = [point.x() for point in polygon]
+    ys = [point.y() for point in polygon]
+    assert xs == sorted(xs)
+    assert abs(xs[0] - rect.left()) < 1e-6 and abs(xs[-1] - rect.right()) < 1.0
+    assert min(ys) >= rect.top() - 1e-6 and max(ys) <= rect.bottom() + 1e-6
+
+
+def test_views_are_downsampled_to_pixel_width(qapp):
+    rng = np.random.default_rng(1)
+    daily = rng.integers(0, 240, 10 * 365).astype(np.float64)
+    chart = make_chart(daily)
+    rect = chart._plot_rect()
+    for _ in range(50):
+        # Случайные масштаб и сдвиг: каждый вид - новый видимый диапазон
+        span = float(rng.uniform(MIN_VISIBLE_POINTS, len(daily)))
+        start = float(rng.uniform(0, len(daily) - span))
+        chart._set_view(start, start + span)
+        polygon, peak, first, last = chart._points(rect)
+        visible = last - first + 1
+        assert polygon.count() == min(visible, int(rect.width()))
+        assert peak == daily[first:last + 1].max()
+
+
+def test_unchanged_view_reuses_points(qapp):
+    chart = make_chart(np.arange(3000, dtype=np.float64))
+    chart.grab()
+    cached = chart._cache
+    chart.grab()
+    assert chart._cache is cached, "Точки пересчитаны без смены вида"
+    chart._set_view(100.0, 600.0)
+    chart.grab()
+    assert chart._cache is not cached
@@ -0,0 +1,40 @@
+import os
+from datetime import datetime, timedelta
+from goals import GoalTracker
+from stats import PomodoroStats
+
+
+def write_history(path, days):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("date,work_minutes\n")
+        for day, minutes in days:
+            f.write(f"{day.isoformat()},{minutes}\n")
+
+
+NOW = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+
+
+def test_forecast_follows_appended_past_days(stats_file):
+    today = NOW.date()
+    write_history(stats_file, [(today - timedelta(days=n), 50) for n in range(14, 0, -1)])
+    tracker = GoalTracker(PomodoroStats(stats_file), daily_goal=200, weekly_goal=0)
+    before = tracker.forecast_day(600, NOW)
+    assert before.probability == 0.0
+    # Объединение статистики дописывает прошлые дни в конец файла
+    with open(stats_file, 'a', encoding='utf-8') as f:
+        for n in range(14, 0, -1):
+            f.write(f"{(today - timedelta(days=n)).isoformat()},500\n")
+    after = tracker.forecast_day(600, NOW)
+    assert after.expected > before.expected
+    assert after.probability > 0.5
+
+
+def test_forecast_follows_replaced_file(stats_file):
+    today = NOW.date()
+    write_history(stats_file, [(today - timedelta(days=n), 500) for n in range(14, 0, -1)])
+    tracker = GoalTracker(PomodoroStats(stats_file), daily_goal=200, weekly_goal=0)
+    assert tracker.forecast_day(600, NOW).probability > 0.5
+    replacement = stats_file + ".new"
+    write_history(replacement, [(today - timedelta(days=n), 10) for n in range(14, 0, -1)])
+    os.replace(replacement, stats_file)
+    assert tracker.forecast_day(600, NOW).probability == 0.0
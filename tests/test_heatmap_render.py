@@ -0,0 +1,44 @@
+import os
+from datetime import date, timedelta
+from PyQt6.QtGui import QImage
+from heatmap_render import render_heatmaps
+
+END = date(2025, 3, 31)
+
+
+def write_stats(path, minutes_by_offset):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("date,work_minutes\n")
+        for offset, minutes in minutes_by_offset:
+            f.write(f"{(END - timedelta(days=offset)).isoformat()},{minutes}\n")
+
+
+def test_one_image_per_participant(qapp, tmp_path):
+    source = str(tmp_path / "shared")
+    write_stats(os.path.join(source, "alice.csv"), [(0, 25), (1, 50)])
+    write_stats(os.path.join(source, "alice", "pomodoro_stats.csv"), [(3, 120)])
+    write_stats(os.path.join(source, "team", "bob.csv"), [(40, 10)])  # Вне 30 дней
+    out_dir = str(tmp_path / "out")
+    written = render_heatmaps(source, out_dir, workers=1, days=30, end=END)
+    names = sorted(os.path.basename(path) for path in written)
+    assert names == ["alice (2).png", "alice.png", "team_bob.png"]
+    sizes = set()
+    for path in written:
+        image = QImage(path)
+        assert not image.isNull()
+        sizes.add((image.width(), image.height()))
+    assert len(sizes) == 1, "Картинки участников разного размера"
+
+
+def test_parallel_render_matches_single_process(qapp, tmp_path):
+    source = str(tmp_path / "shared")
+    for index in range(4):
+        write_stats(os.path.join(source, f"user{index}.csv"),
+                    [(offset, (offset * 7 + index) % 130) for offset in range(30)])
+    single = render_heatmaps(source, str(tmp_path / "one"), workers=1, end=END)
+    parallel = render_heatmaps(source, str(tmp_path / "two"), workers=2, end=END)
+    assert sorted(map(os.path.basename, single)) == sorted(map(os.path.basename, parallel))
+    for path in single:
+        other = os.path.join(str(tmp_path / "two"), os.path.basename(path))
+        assert QImage(path) == QImage(other)
@@ -0,0 +1,39 @@
+import time
+from datetime import date, timedelta
+from memory_profile import MemoryProfiler
+from stats_window import StatsWindow
+
+
+def test_stats_window_cycles_do_not_grow_memory(qapp, stats_file):
+    """
+    100 открытий и закрытий окна статистики без экрана. Первые 10 циклов
+    прогревают кэши Qt и Python, рост памяти считается от точки после них.
+    """
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        f.write("date,work_minutes\n")
+        for offset in range(60, -1, -1):
+            f.write(f"{date.today() - timedelta(days=offset)},{offset % 7 * 20}\n")
+    profiler = MemoryProfiler()
+    try:
+        for cycle in range(1, 101):
+            window = StatsWindow(stats_file)
+            window.show()
+            deadline = time.monotonic() + 5
+            while window.placeholder_label.isVisible() and time.monotonic() < deadline:
+                qapp.processEvents()  # Ждем фоновую загрузку при первом открытии
+                time.sleep(0.001)
+            window.close()
+            profiler.expect_released(window, 'StatsWindow')
+            del window
+            qapp.processEvents()
+            if cycle in (10, 100):
+                profiler.checkpoint(f"cycle_{cycle}")
+        assert not profiler.leaks()
+        warm, last = profiler.checkpoints[0], profiler.checkpoints[-1]
+        growth_kb = (last.traced - warm.traced) / 1024
+        assert growth_kb < 512, f"Память Python выросла на {growth_kb:.0f} КБ:\n" + \
+            "\n".join(profiler.growth(0, -1, 5))
+        if last.rss is not None and warm.rss is not None:
+            assert (last.rss - warm.rss) / 1024 < 4096, "RSS вырос больше чем на 4 МБ"
+    finally:
+        profiler.stop()
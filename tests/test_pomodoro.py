@@ -0,0 +1,142 @@
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from pomodoro import PomodoroTimer
+
+
+def timer_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "pomodoro-timer"]
+
+
+def test_stop_during_phase_end_notification(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=2,
+                          state_file=state_file)
+    notifying = threading.Event()
+
+    def slow_notify():
+        notifying.set()
+        time.sleep(0.5)  # Звук и системное уведомление бывают медленными
+
+    timer._notify_phase_end = slow_notify
+    timer.start_work()
+    timer.seek(59)  # Последняя секунда рабочей фазы
+    assert notifying.wait(3), "Фаза не закончилась"
+    timer.stop()
+    assert not timer.state.is_running and timer.state.phase_index == 0
+    time.sleep(1.0)  # Уведомление закончилось, поток таймера мог бы запустить перерыв
+    state = timer.state
+    assert not state.is_running and state.phase_index == 0
+    assert not timer_threads()
+    assert not os.path.exists(state_file), "Снимок записан после остановки"
+
+
+def test_phase_change_handlers_run_without_state_lock():
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=2)
+    timer._notify_phase_end = lambda: None
+    blocked = []
+
+    def on_state_change(state):
+        # Обработчик (GUI, командная сессия) отдает команду таймеру из другого потока
+        if state == 'break' and threading.current_thread().name == "pomodoro-timer":
+            command = threading.Thread(target=timer.pause)
+            command.start()
+            command.join(1.0)
+            blocked.append(command.is_alive())
+
+    timer.on_state_change = on_state_change
+    try:
+        timer.start_work()
+        timer.seek(59)
+        deadline = time.monotonic() + 3
+        while not blocked and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert blocked == [False], "Команда ждала блокировку, занятую сменой фазы"
+        assert timer.state.phase_index == 1 and timer.state.is_paused
+    finally:
+        timer.stop()
+
+
+def test_paused_timer_thread_sleeps_until_resume():
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=2)
+    timer.start_work()
+    try:
+        time.sleep(0.2)
+        timer.pause()
+        time.sleep(1.2)  # Поток досыпает начатую секунду и доходит до ожидания на паузе
+        woken = timer.wakeups
+        time.sleep(1.5)
+        assert timer.wakeups == woken, "Поток таймера просыпается на паузе"
+        left = timer.state.time_left
+        timer.resume()
+        time.sleep(1.3)
+        assert timer.wakeups > woken
+        assert timer.state.time_left < left, "Отсчет не продолжился после паузы"
+        timer.pause()
+        time.sleep(1.2)
+        timer.stop()
+        time.sleep(0.3)
+        assert not timer_threads(), "Поток на паузе не вышел по остановке"
+    finally:
+        timer.stop()
+
+
+def test_state_is_consistent_under_concurrent_commands():
+    # Без потока таймера: тики делают сами писатели через advance()
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=3, threaded=False)
+    timer.work_time, timer.short_break, timer.long_break = 20, 10, 15
+    phases = timer.timeline.phases
+    deadline = time.monotonic() + 2.0
+    result = {'reads': 0, 'inconsistent': [], 'version_regressions': 0}
+    result_lock = threading.Lock()
+
+    def writer():
+        rng = random.Random()
+        actions = [timer.skip, timer.pause, timer.resume, lambda: timer.advance(rng.randint(1, 5)),
+                   lambda: timer.seek(rng.randint(0, timer.timeline.total)),
+                   lambda: timer.follow(rng.randrange(len(phases)), rng.uniform(1, 9))]
+        while time.monotonic() < deadline:
+            rng.choice(actions)()
+
+    def reader():
+        reads = regressions = 0
+        inconsistent = []
+        last_version = 0
+        while time.monotonic() < deadline:
+            state = timer.state
+            reads += 1
+            if state.version < last_version:
+                regressions += 1
+            last_version = state.version
+            phase = phases[state.phase_index]
+            if not (phase.is_work == state.is_work and phase.round == state.current_round
+                    and phase.duration == state.phase_length
+                    and 0 <= state.time_left <= state.phase_length):
+                inconsistent.append(state)
+        with result_lock:
+            result['reads'] += reads
+            result['inconsistent'] += inconsistent
+            result['version_regressions'] += regressions
+
+    # Частое переключение потоков, чтобы чтения попадали между записями полей
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    logging.disable(logging.INFO)
+    try:
+        timer.start_work()
+        threads = ([threading.Thread(target=writer) for _ in range(3)]
+                   + [threading.Thread(target=reader) for _ in range(4)])
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+        logging.disable(logging.NOTSET)
+        timer.stop()
+    assert result['reads'] > 0
+    assert not result['inconsistent'], f"Несогласованных чтений: {len(result['inconsistent'])}"
+    assert result['version_regressions'] == 0
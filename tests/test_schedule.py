@@ -0,0 +1,83 @@
+import random
+import pytest
+from pomodoro import PomodoroTimer
+from schedule import BREAK, LONG_BREAK, WORK, compile_classic, parse_plan
+
+
+def test_parse_plan_expands_repeats():
+    timeline = parse_plan("50/10x3, 90/30")
+    assert [(phase.kind, phase.duration, phase.round) for phase in timeline.phases] == [
+        (WORK, 3000, 1), (BREAK, 600, 1), (WORK, 3000, 2), (BREAK, 600, 2),
+        (WORK, 3000, 3), (BREAK, 600, 3), (WORK, 5400, 4), (LONG_BREAK, 1800, 4)]
+    assert timeline.total == 3 * 3600 + 7200 and timeline.work_total == 3 * 3000 + 5400
+    assert len(parse_plan(" 25 / 5 х 2 ,")) == 4  # Пробелы, русская "х", лишняя запятая
+    # Без перерывов: последняя фаза - работа, длинного перерыва нет
+    assert [phase.kind for phase in parse_plan("25/0x2").phases] == [WORK, WORK]
+
+
+@pytest.mark.parametrize("plan", ["", " , ", "abc", "50/", "50-10", "0/10", "50/10x0", "50/10x-1"])
+def test_parse_plan_rejects_invalid(plan):
+    with pytest.raises(ValueError):
+        parse_plan(plan)
+
+
+def test_locate_at_phase_boundaries():
+    timeline = compile_classic(10, 2, 5, 2)  # Работа 10, перерыв 2, работа 10, длинный 5
+    assert timeline.total == 27
+    assert timeline.locate(0) == (0, 10)
+    assert timeline.locate(9) == (0, 1)
+    assert timeline.locate(10) == (1, 2)  # Граница: уже следующая фаза целиком
+    assert timeline.locate(11) == (1, 1)
+    assert timeline.locate(12) == (2, 10)
+    assert timeline.locate(26) == (3, 1)
+    assert timeline.locate(27) == (0, 10)  # Цикл начинается заново
+    assert timeline.locate(27 * 5 + 12) == (2, 10)
+    for index in range(len(timeline)):
+        assert timeline.locate(timeline.start_of(index)) == (index, timeline.phases[index].duration)
+
+
+def test_work_seconds_between_matches_second_by_second_count():
+    timeline = compile_classic(10, 2, 5, 2)
+    assert timeline.work_seconds_between(0, 27) == 20
+    assert timeline.work_seconds_between(5, 15) == 8
+    assert timeline.work_seconds_between(10, 12) == 0
+    assert timeline.work_seconds_between(26, 30) == 3
+    assert timeline.work_seconds_between(0, 54) == 40
+    assert timeline.work_seconds_between(15, 15) == 0
+    assert timeline.work_seconds_between(20, 5) == 0
+    work_at = [timeline.phases[timeline.locate(second)[0]].is_work for second in range(200)]
+    rng = random.Random(3)
+    for _ in range(300):
+        start = rng.randrange(150)
+        end = start + rng.randrange(50)
+        assert timeline.work_seconds_between(start, end) == sum(work_at[start:end]), (start, end)
+
+
+def test_timer_seek_and_skip():
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=2, threaded=False)
+    timer.start_work()
+    timer.seek(59)
+    assert (timer.state.phase_index, timer.state.time_left) == (0, 1)
+    timer.seek(60)
+    assert (timer.state.phase_index, timer.state.time_left, timer.state.is_work) == (1, 60, False)
+    timer.seek(-5)
+    assert (timer.state.phase_index, timer.state.time_left) == (0, 60)
+    timer.seek(timer.timeline.total + 150)  # Через цикл: середина второй работы
+    assert (timer.state.phase_index, timer.state.time_left, timer.state.current_round) == (2, 30, 2)
+    assert timer.elapsed == 150
+    timer.skip()
+    assert timer.phase_kind == LONG_BREAK and timer.state.time_left == 120
+    timer.skip()  # С последней фазы - на первую
+    assert (timer.state.phase_index, timer.state.current_round, timer.state.is_work) == (0, 1, True)
+    assert timer.state.is_running
+    timer.stop()
+
+
+def test_timer_seek_with_plan():
+    timer = PomodoroTimer(threaded=False)
+    timer.plan = "50/10x3, 90/30"
+    timer.start_work()
+    timer.seek(3 * 3600 + 5400 + 60)  # Минута длинного перерыва
+    assert timer.phase_kind == LONG_BREAK and timer.state.time_left == 1800 - 60
+    assert timer.state.current_round == 4
+    timer.stop()
@@ -0,0 +1,19 @@
+import io
+from datetime import date
+from session_log import SessionLog
+
+
+def test_read_csv_skips_bad_rows():
+    log = SessionLog()
+    log.read_csv(io.StringIO("date,work_minutes\n2024-01-01,25\n,5\nbad,3\n"
+                             "2024-01-02,\n2024-01-02 09:00,7.9\n"))
+    assert [(record.date, record.work_minutes) for record in log] == [
+        ("2024-01-01", 25), ("2024-01-02", 7)]
+    assert log.total_minutes == 32
+
+
+def test_columns_from_header():
+    log = SessionLog()
+    log.read_csv(io.StringIO("id,minutes,date\nx,10,2024-03-01\ny,15,2024-03-01\n"))
+    assert log.daily_totals() == {date(2024, 3, 1): 25}
+    assert log.minutes_on(date(2024, 3, 1)) == 25
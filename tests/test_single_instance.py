@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import time
+import config
+import single_instance
+from tests.conftest import ROOT
+
+PORT = config.SINGLE_INSTANCE_PORT + 1  # Не мешаем работающему приложению
+
+# Основной экземпляр подключает обработчик только через startup секунд, как окно после загрузки Qt
+LAUNCH = ("import sys, time, single_instance as s;"
+          "startup = float(sys.argv[1]);"
+          f"r = s.forward_to_running(['start'], {PORT});"
+          "print('primary' if r is None else 'forwarded', time.time(), flush=True);"
+          "r is None and time.sleep(startup);"
+          "r is None and print('pending', *s.running_server().set_handler("
+          "lambda c: {'ok': True, 'text': ''}), flush=True);"
+          "r is None and time.sleep(1.0)")
+
+
+def test_concurrent_launches_forward_while_primary_starts():
+    launches = 6
+    started = time.time()
+    processes = [subprocess.Popen([sys.executable, "-c", LAUNCH, "2.0"], stdout=subprocess.PIPE,
+                                  text=True, cwd=ROOT) for _ in range(launches)]
+    outputs = [process.communicate(timeout=30)[0].splitlines() for process in processes]
+    # Повторный запуск сначала печатает ответ основного экземпляра
+    results = [next(line.split() for line in out if line.startswith(('primary', 'forwarded')))
+               for out in outputs]
+    outcomes = [result[0] for result in results]
+    assert outcomes.count('primary') == 1, outputs
+    assert outcomes.count('forwarded') == launches - 1, outputs
+    forward_times = [float(finished) - started for outcome, finished in results
+                     if outcome == 'forwarded']
+    # Ответ приходит до того, как основной экземпляр закончил загрузку
+    assert max(forward_times) < 2.0, forward_times
+    primary = outputs[outcomes.index('primary')]
+    pending = primary[1].split()
+    assert pending == ['pending'] + ['start'] * (launches - 1)
+
+
+def test_pending_commands_go_to_handler(tmp_path):
+    sock = single_instance._claim(PORT)
+    assert sock is not None
+    server = single_instance.InstanceServer(sock)
+    try:
+        assert single_instance.send_command('pause', PORT)['ok']
+        assert single_instance.send_command('show', PORT) == {'ok': True, 'text': ""}
+        handled = []
+        pending = server.set_handler(lambda command: handled.append(command) or
+                                     {'ok': False, 'text': "занято"})
+        assert pending == ['pause', 'show']
+        assert single_instance.send_command('stop', PORT) == {'ok': False, 'text': "занято"}
+        assert handled == ['stop']
+    finally:
+        server.close()
+
+
+def test_cli_command_does_not_load_gui():
+    result = subprocess.run([sys.executable, "-X", "importtime", "main.py", "send", "show"],
+                            capture_output=True, text=True, cwd=ROOT, timeout=30)
+    imported = {line.split('|')[-1].strip() for line in result.stderr.splitlines()}
+    assert 'cli' in imported
+    assert not {'pygame', 'PyQt6'} & imported
@@ -0,0 +1,58 @@
+import time
+import pytest
+from stall_watchdog import StallWatchdog, summarize
+
+
+def _busy(seconds: float):
+    """Расчеты в потоке GUI, как построение графика"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(1000))
+    return total
+
+
+def _blocking_io(seconds: float):
+    """Ожидание в потоке GUI, как чтение файла или инициализация звука"""
+    time.sleep(seconds)
+
+
+@pytest.fixture
+def watchdog(qapp, tmp_path):
+    watchdog = StallWatchdog(str(tmp_path / "stalls.jsonl"))
+    watchdog.start()
+    yield watchdog
+    watchdog.stop()
+
+
+def run_loop(milliseconds: int):
+    from PyQt6.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    QTimer.singleShot(milliseconds, loop.quit)
+    loop.exec()
+
+
+def test_quiet_event_loop_has_no_stalls(watchdog):
+    run_loop(1000)
+    assert not watchdog.stalls
+    assert watchdog.beats > 0
+
+
+def test_blocking_calls_are_found_with_their_stack(watchdog):
+    from PyQt6.QtCore import QTimer
+    stall_ms = (400, 700)
+    targets = (_busy, _blocking_io)
+    for target, milliseconds in zip(targets, stall_ms):
+        QTimer.singleShot(50, lambda target=target, milliseconds=milliseconds:
+                          target(milliseconds / 1000))
+        run_loop(50 + milliseconds + 300)
+    found = list(watchdog.stalls)
+    assert len(found) == len(stall_ms), f"Найдено зависаний {len(found)} из {len(stall_ms)}"
+    for stall, target, milliseconds in zip(found, targets, stall_ms):
+        assert stall.hot_stack and stall.hot_stack[0][2] == target.__name__, \
+            f"Стек {stall.hot_stack[:2]}, ожидался {target.__name__}"
+        assert abs(stall.duration_ms - milliseconds) < 150, \
+            f"{target.__name__}: {stall.duration_ms:.0f} мс вместо {milliseconds}"
+    report = summarize(watchdog.report_path)
+    assert report.startswith("Зависаний: 2, мест в коде: 2")
+    assert "_busy" in report and "_blocking_io" in report
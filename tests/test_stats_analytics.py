@@ -0,0 +1,60 @@
+import json
+import os
+import threading
+from datetime import date
+from stats_analytics import StatsAnalytics, snapshot_lock, snapshot_path_for
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_snapshot_continues_after_append(stats_file):
+    write(stats_file, "date,work_minutes\n2024-01-01,25\n")
+    StatsAnalytics.load(stats_file).save(snapshot_path_for(stats_file))
+    with open(stats_file, 'a', encoding='utf-8') as f:
+        f.write("2024-01-02,30\n")
+    analytics = StatsAnalytics.load(stats_file)
+    assert analytics.get_month_total(date(2024, 1, 1)) == 55
+    assert analytics.longest_streak == 2
+
+
+def test_same_size_rewrite_in_place_is_rescanned(stats_file):
+    write(stats_file, "date,work_minutes\n2024-01-01,25\n")
+    StatsAnalytics.load(stats_file).save(snapshot_path_for(stats_file))
+    st = os.stat(stats_file)
+    with open(stats_file, 'r+', encoding='utf-8') as f:
+        f.write("date,work_minutes\n2024-01-01,40\n")  # Тот же размер, тот же inode
+    os.utime(stats_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert os.stat(stats_file).st_size == st.st_size
+    assert StatsAnalytics.load(stats_file).get_month_total(date(2024, 1, 1)) == 40
+
+
+def test_concurrent_saves_leave_a_valid_snapshot(stats_file):
+    write(stats_file, "date,work_minutes\n" + "2024-01-01,1\n" * 100)
+    path = snapshot_path_for(stats_file)
+    errors = []
+
+    def writer(hour):
+        try:
+            for _ in range(100):
+                with snapshot_lock(stats_file):
+                    analytics = StatsAnalytics.load(stats_file)
+                    analytics.add_hour(hour, 1)
+                    analytics.save(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(hour,)) for hour in (9, 10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    # Под общей блокировкой ни одно обновление не потеряно
+    assert data['hour_histogram'][9] == data['hour_histogram'][10] == 100
+    assert data['month_totals'] == {'2024-01': 100}
+    assert not [name for name in os.listdir(os.path.dirname(path)) if name.endswith('.tmp')]
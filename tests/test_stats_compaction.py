@@ -0,0 +1,71 @@
+import json
+import os
+from datetime import date, timedelta
+from stats import PomodoroStats
+from stats_compaction import compact_stats, iter_archive
+
+TODAY = date(2025, 6, 1)
+
+
+def write_history(path, rows, tail=""):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("date,work_minutes\n")
+        for day, minutes in rows:
+            f.write(f"{day.isoformat()},{minutes}\n")
+        f.write(tail)
+
+
+def history(days=200, per_day=5, today=TODAY):
+    return [(today - timedelta(days=n), 1 + index) for n in range(days, 0, -1)
+            for index in range(per_day)]
+
+
+def read_rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().splitlines()[1:]
+
+
+def test_totals_kept_and_old_days_rolled_up(stats_file, tmp_path):
+    rows = history()
+    write_history(stats_file, rows)
+    archive_dir = str(tmp_path / "archive")
+    report = compact_stats(stats_file, retain_days=90, archive_dir=archive_dir, today=TODAY)
+    assert report.total_before == report.total_after == sum(m for _, m in rows)
+    assert report.days_rolled_up == 200 - 90
+    assert report.rows_after == 110 + 90 * 5
+    assert report.rows_archived == 110 * 5
+    lines = read_rows(stats_file)
+    assert lines[0] == f"{(TODAY - timedelta(days=200)).isoformat()},15"
+    archived = list(iter_archive(archive_dir))
+    assert len(archived) == 110 * 5 and sum(m for _, m in archived) == 110 * 15
+    # Повторная свертка ничего не меняет
+    assert compact_stats(stats_file, 90, archive_dir, today=TODAY).days_rolled_up == 0
+
+
+def test_torn_last_line_is_carried_over_not_patched(stats_file):
+    rows = history(days=120, per_day=2)
+    write_history(stats_file, rows, tail="2025-05-31,7")  # Запись оборвана сбоем
+    report = compact_stats(stats_file, retain_days=90, archive_dir=None, today=TODAY)
+    assert report.total_after == report.total_before == sum(m for _, m in rows)
+    with open(stats_file, 'rb') as f:
+        data = f.read()
+    # Обрывок остается в конце без перевода строки: его отрежет восстановление журнала
+    assert data.endswith(b"\n2025-05-31,7")
+    assert b"2025-05-31,7\n" not in data
+
+
+def test_archive_export_streams_original_rows(stats_file, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    today = date.today()  # PomodoroStats.compact сворачивает относительно сегодняшнего дня
+    write_history(stats_file, history(days=120, per_day=3, today=today))
+    stats = PomodoroStats(stats_file)
+    assert stats.compact(retain_days=90).days_rolled_up == 30
+    assert os.path.isdir("pomodoro_archive")
+    start = (today - timedelta(days=100)).isoformat()
+    output = str(tmp_path / "old.jsonl")
+    count = stats.export(output, 'jsonl', start_date=start, archive=True, chunk_size=7)
+    with open(output, 'r', encoding='utf-8') as f:
+        exported = [json.loads(line) for line in f]
+    assert count == len(exported) == 10 * 3
+    assert all(row['date'] >= start for row in exported)
+    assert sorted({row['work_minutes'] for row in exported}) == [1, 2, 3]
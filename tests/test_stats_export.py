@@ -0,0 +1,98 @@
+import json
+import subprocess
+import sys
+import textwrap
+from datetime import date, timedelta
+from stats import PomodoroStats
+from tests.conftest import ROOT
+
+
+def write_history(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("date,work_minutes\n")
+        f.writelines(f"{day},{minutes}\n" for day, minutes in rows)
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_export_jsonl_filters_date_range(stats_file, tmp_path):
+    write_history(stats_file, [("2024-01-01", 25), ("2024-01-02", 30), ("2024-01-03", 5)])
+    output = str(tmp_path / "out.jsonl")
+    count = PomodoroStats(stats_file).export(output, 'jsonl', "2024-01-02", "2024-01-03")
+    assert count == 2
+    assert read_jsonl(output) == [{'date': "2024-01-02", 'work_minutes': 30},
+                                  {'date': "2024-01-03", 'work_minutes': 5}]
+
+
+def test_export_skips_corrupt_rows(stats_file, tmp_path):
+    write_history(stats_file, [("2024-01-01", 25), ("2024-01-01", ""), ("2024-01-02", "abc"),
+                               ("not-a-date", 10), ("2024-01-02 10:00", "12.7"), ("2024-01-03", 1)])
+    output = str(tmp_path / "out.jsonl")
+    count = PomodoroStats(stats_file).export(output, 'jsonl', chunk_size=2)
+    assert count == 3
+    assert read_jsonl(output) == [{'date': "2024-01-01", 'work_minutes': 25},
+                                  {'date': "2024-01-02", 'work_minutes': 12},
+                                  {'date': "2024-01-03", 'work_minutes': 1}]
+
+
+def test_export_ics_one_event_per_day(stats_file, tmp_path):
+    write_history(stats_file, [("2024-01-01", 25), ("2024-01-01", 25), ("2024-01-02", 10)])
+    output = str(tmp_path / "out.ics")
+    PomodoroStats(stats_file).export(output, 'ics')
+    with open(output, encoding='utf-8', newline='') as f:
+        text = f.read()
+    assert text.count("BEGIN:VEVENT") == 2
+    assert "X-POMODORO-MINUTES:50\r\n" in text
+    assert "DTSTART;VALUE=DATE:20240102\r\n" in text
+
+
+def test_jsonl_export_without_pyarrow(stats_file, tmp_path):
+    """pyarrow нужен только для Parquet: без него модуль импортируется и пишет JSON Lines"""
+    write_history(stats_file, [("2024-01-01", 25), ("2024-01-02", 30)])
+    script = textwrap.dedent(f"""
+        import sys
+        sys.modules['pyarrow'] = None  # Пакет не установлен
+        from stats import PomodoroStats
+        stats = PomodoroStats({stats_file!r})
+        print(stats.export({str(tmp_path / "out.jsonl")!r}, 'jsonl'))
+        try:
+            stats.export({str(tmp_path / "out.parquet")!r}, 'parquet')
+        except RuntimeError as e:
+            print(e)
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True,
+                            text=True, timeout=120, check=True)
+    lines = result.stdout.splitlines()
+    assert lines[0] == "2"
+    assert "pyarrow" in lines[1]
+
+
+def test_export_5m_rows_under_rss_ceiling(stats_file, tmp_path):
+    """Экспорт 5 млн строк в отдельном процессе: пик RSS не зависит от длины истории"""
+    rows = 5_000_000
+    start = date(2010, 1, 1)
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        f.write("date,work_minutes\n")
+        for offset in range(0, rows, 100_000):
+            day = (start + timedelta(days=offset // 1000)).isoformat()
+            f.write(f"{day},1\n" * 100_000)
+    script = textwrap.dedent(f"""
+        import resource
+        import pandas
+        from memory_profile import current_rss
+        from stats import PomodoroStats
+        stats = PomodoroStats({stats_file!r})
+        baseline = current_rss()
+        count = stats.export({str(tmp_path / "out.jsonl")!r}, 'jsonl')
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        print(count, baseline, peak)
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True,
+                            text=True, timeout=600, check=True)
+    count, baseline, peak = map(int, result.stdout.split()[-3:])
+    assert count == rows
+    # Файл около 90 МБ; DataFrame всей истории занял бы сотни мегабайт
+    assert peak - baseline < 150 * 1024 * 1024, f"Рост RSS {(peak - baseline) >> 20} МБ"
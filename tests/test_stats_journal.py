@@ -0,0 +1,116 @@
+import logging
+import os
+import random
+import zlib
+from stats_compaction import STATS_HEADER
+from stats_journal import StatsJournal
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_recovers_after_crash_at_random_point(tmp_path):
+    # "Сбой" оставляет файл в одном из состояний, возможных при падении или
+    # отключении питания: запись оборвана на случайном байте, в конце нули
+    # вместо данных, описание сегментов отстало, потеряно или не дописано
+    segment_records = 16
+    rng = random.Random(1)
+    path = str(tmp_path / "stats.csv")
+    logging.disable(logging.WARNING)  # Предупреждения об отрезанных записях здесь ожидаемы
+    try:
+        for trial in range(60):
+            lines = [f"2024-{1 + i % 12:02d}-{1 + i % 28:02d},{rng.randint(1, 60)}\n"
+                     for i in range(300 + rng.randrange(segment_records))]
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(STATS_HEADER + "".join(lines))
+            journal = StatsJournal(path, segment_records)
+            journal.recover()
+            with open(journal.manifest_path, 'rb') as f:
+                old_manifest = f.read()
+
+            batch = [f"2025-01-{1 + i % 28:02d},{rng.randint(1, 60)}\n"
+                     for i in range(rng.randint(0, 2 * segment_records))]
+            torn = f"2025-02-01,{rng.randint(10, 99)}\n"
+            kind = ['torn', 'zeros', 'stale_manifest', 'lost_manifest',
+                    'manifest_tmp', 'clean'][trial % 6]
+            for line in batch:
+                journal.append(line)
+            expected = STATS_HEADER + "".join(lines + batch)
+            with open(path, 'ab') as f:
+                if kind == 'torn':
+                    f.write(torn.encode()[:rng.randrange(1, len(torn))])
+                elif kind == 'zeros':
+                    f.write(b"\0" * rng.randint(1, 4096))
+            if kind == 'stale_manifest':
+                with open(journal.manifest_path, 'wb') as f:
+                    f.write(old_manifest)
+            elif kind == 'lost_manifest':
+                os.remove(journal.manifest_path)
+            elif kind == 'manifest_tmp':
+                with open(journal.manifest_path + ".tmp", 'wb') as f:
+                    f.write(old_manifest[:rng.randrange(len(old_manifest))])
+
+            # Перезапуск приложения
+            journal = StatsJournal(path, segment_records)
+            report = journal.recover()
+            assert read(path) == expected, f"Испытание {trial} ({kind}): история не совпадает"
+            assert not journal.verify(), f"Испытание {trial} ({kind}): CRC не сходится"
+            if not report.rebuilt and kind != 'stale_manifest':
+                # Не больше последнего сегмента и хвоста после него
+                assert report.checked_bytes <= (2 * segment_records + 1) * 20 + 4096, \
+                    f"Испытание {trial} ({kind}): прочитано {report.checked_bytes} байт"
+            journal.append("2025-03-01,25\n")
+            assert read(path) == expected + "2025-03-01,25\n"
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_append_does_not_reread_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "stats.csv")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(STATS_HEADER + "2024-01-01,25\n" * 10)
+    journal = StatsJournal(path, segment_records=8)
+    checks = []
+    recover = journal.recover
+    monkeypatch.setattr(journal, 'recover', lambda: checks.append(1) or recover())
+    for _ in range(30):
+        journal.append("2024-01-02,30\n")
+    assert len(checks) == 1, "Хвост проверяется при каждом дописывании"
+    assert len(journal.segments) == 40 // 8
+    assert all(segment.minutes == sum(25 if i < 10 else 30 for i in range(index * 8, index * 8 + 8))
+               for index, segment in enumerate(journal.segments))
+    assert not journal.verify()
+    # Описание на диске совпадает с построенным по файлу заново
+    fresh = StatsJournal(path, segment_records=8, manifest_path=str(tmp_path / "fresh.json"))
+    fresh.recover()
+    assert [s.to_list() for s in fresh.segments] == [s.to_list() for s in journal.segments]
+
+
+def test_append_rechecks_after_outside_write(tmp_path):
+    path = str(tmp_path / "stats.csv")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(STATS_HEADER)
+    journal = StatsJournal(path, segment_records=4)
+    for _ in range(6):
+        journal.append("2024-01-01,25\n")
+    with open(path, 'ab') as f:
+        f.write(b"2024-01-0")  # Другой процесс оборвался посреди записи
+    report = journal.append("2024-01-02,30\n")
+    assert report.repaired
+    assert read(path) == STATS_HEADER + "2024-01-01,25\n" * 6 + "2024-01-02,30\n"
+
+    # Сжатие истории заменяет файл: описание строится заново
+    replacement = path + ".new"
+    with open(replacement, 'w', encoding='utf-8') as f:
+        f.write(STATS_HEADER + "2024-01-03,50\n" * 5)
+    os.replace(replacement, path)
+    report = journal.append("2024-01-04,10\n")
+    assert report.rebuilt
+    assert len(journal.segments) == 1 and journal.segments[0].minutes == 200
+    with open(path, 'rb') as f:
+        data = f.read()
+    segment = journal.segments[0]
+    assert zlib.crc32(data[segment.start:segment.end]) == segment.crc
+    assert not journal.verify()
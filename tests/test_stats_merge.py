@@ -0,0 +1,102 @@
+import json
+import os
+from session_log import SessionLog
+from stats_merge import merge_stats
+
+
+def write(path, text, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(text)
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_csv_and_jsonl_merge_by_date_without_duplicates(tmp_path):
+    phone = str(tmp_path / "phone.csv")
+    laptop = str(tmp_path / "laptop.jsonl")
+    output = str(tmp_path / "all.csv")
+    write(phone, "date,work_minutes,id\n2024-01-01,25,a\n2024-01-03,25,c\n2024-01-04,10,\n")
+    write(laptop, "".join(json.dumps(record) + "\n" for record in [
+        {'date': "2024-01-01", 'work_minutes': 25, 'id': "a"},  # Та же сессия с телефона
+        {'date': "2024-01-02", 'minutes': 50, 'id': "b"},
+        {'date': "2024-01-04", 'work_minutes': 10},  # Без ключа не объединяется
+    ]))
+    assert merge_stats([phone, laptop], output) == 5
+    assert read_rows(output) == ["date,work_minutes,id", "2024-01-01,25,a", "2024-01-02,50,b",
+                                 "2024-01-03,25,c", "2024-01-04,10,", "2024-01-04,10,"]
+    # Ключи сохранились в выходе: повторное слияние с тем же устройством не дублирует
+    again = str(tmp_path / "again.csv")
+    assert merge_stats([output, laptop], again) == 6
+    assert read_rows(again)[1:4] == ["2024-01-01,25,a", "2024-01-02,50,b", "2024-01-03,25,c"]
+    log = SessionLog.load(output)
+    assert len(log) == 5 and log.total_minutes == 120
+
+
+def test_inputs_without_keys_keep_two_columns(tmp_path):
+    a, b, output = (str(tmp_path / name) for name in ("a.csv", "b.csv", "all.csv"))
+    write(a, "date,work_minutes\n2024-01-01,25\n")
+    write(b, "date,work_minutes\n2024-01-01,25\n")
+    assert merge_stats([a, b], output) == 2
+    assert read_rows(output) == ["date,work_minutes", "2024-01-01,25", "2024-01-01,25"]
+
+
+def test_incremental_merge_appends_only_new_tails(tmp_path):
+    a, b, output = (str(tmp_path / name) for name in ("a.csv", "b.csv", "all.csv"))
+    state = str(tmp_path / "merge.json")
+    write(a, "date,work_minutes,id\n2024-01-01,25,a1\n2024-01-03,25,a3\n")
+    write(b, "date,work_minutes,id\n2024-01-02,30,b2\n2024-01-03,25,a3\n")
+    assert merge_stats([a, b], output, state, incremental=True) == 3
+    inode = os.stat(output).st_ino
+    write(a, "2024-01-03,5,a4\n2024-01-05,25,a5\n", 'a')
+    write(b, "2024-01-04,30,b4\n2024-01-05,25,a5\n", 'a')
+    assert merge_stats([a, b], output, state, incremental=True) == 3
+    assert os.stat(output).st_ino == inode, "Выход переписан вместо дописывания"
+    assert read_rows(output) == ["date,work_minutes,id", "2024-01-01,25,a1", "2024-01-02,30,b2",
+                                 "2024-01-03,25,a3", "2024-01-03,5,a4", "2024-01-04,30,b4",
+                                 "2024-01-05,25,a5"]
+    # Нечего дописывать
+    assert merge_stats([a, b], output, state, incremental=True) == 0
+
+
+def test_out_of_order_tail_falls_back_to_sorted_full_merge(tmp_path):
+    a, b, output = (str(tmp_path / name) for name in ("a.csv", "b.csv", "all.csv"))
+    state = str(tmp_path / "merge.json")
+    write(a, "date,work_minutes\n2024-01-01,25\n2024-01-03,25\n")
+    write(b, "date,work_minutes\n2024-01-02,30\n2024-01-04,30\n")
+    merge_stats([a, b], output, state, incremental=True)
+    # Первая новая запись в порядке, вторая - раньше уже слитых
+    write(a, "2024-01-04,5\n2024-01-02,7\n", 'a')
+    assert merge_stats([a, b], output, state, incremental=True) == 6
+    dates = [row.split(',')[0] for row in read_rows(output)[1:]]
+    assert dates == sorted(dates)
+    # Внутри дня записи без ключа идут в порядке входов
+    assert read_rows(output)[1:] == ["2024-01-01,25", "2024-01-02,7", "2024-01-02,30",
+                                     "2024-01-03,25", "2024-01-04,5", "2024-01-04,30"]
+
+
+def test_unsorted_input_is_sorted_in_chunks(tmp_path):
+    a, b, output = (str(tmp_path / name) for name in ("a.csv", "b.csv", "all.csv"))
+    days = [f"2024-01-{1 + (i * 7) % 28:02d}" for i in range(100)]
+    write(a, "date,work_minutes,id\n" + "".join(f"{day},{i},k{i}\n" for i, day in enumerate(days)))
+    write(b, "date,work_minutes,id\n2024-01-22,99,k3\n2024-01-15,1,x\n")
+    assert merge_stats([a, b], output, chunk_size=8) == 101  # k3 с тем же днем - дубль
+    rows = [row.split(',') for row in read_rows(output)[1:]]
+    assert [row[0] for row in rows] == sorted(days + ["2024-01-15"])
+    assert sorted(int(row[1]) for row in rows) == sorted(list(range(100)) + [1])
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(('.jsonl', '.tmp'))]
+
+
+def test_changed_output_forces_full_merge(tmp_path):
+    a, output = str(tmp_path / "a.csv"), str(tmp_path / "all.csv")
+    state = str(tmp_path / "merge.json")
+    write(a, "date,work_minutes\n2024-01-01,25\n")
+    merge_stats([a], output, state, incremental=True)
+    # Выход изменен вручную без изменения размера
+    write(output, "date,work_minutes\n2024-01-01,99\n")
+    os.utime(output, ns=(1, 1))
+    write(a, "2024-01-02,5\n", 'a')
+    assert merge_stats([a], output, state, incremental=True) == 2
+    assert read_rows(output) == ["date,work_minutes", "2024-01-01,25", "2024-01-02,5"]
@@ -0,0 +1,49 @@
+import os
+from datetime import date
+from stats_tail import StatsTail
+
+
+def write(path, text, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_appended_rows_are_read_without_full_reread(stats_file):
+    write(stats_file, "date,work_minutes\n" + "2025-01-01,25\n" * 1000)
+    reader = StatsTail(stats_file)
+    assert reader.refresh() == 1000
+    for _ in range(20):
+        write(stats_file, "2025-01-02,30\n", 'a')
+        assert reader.refresh() == 1
+    assert reader.refresh() == 0
+    assert reader.full_reads == 1
+    assert reader.total_minutes == 25 * 1000 + 30 * 20
+    assert reader.minutes_on(date(2025, 1, 2)) == 600
+
+
+def test_unfinished_line_waits_for_newline(stats_file):
+    write(stats_file, "date,work_minutes\n2025-01-01,25\n2025-01-02,3")
+    reader = StatsTail(stats_file)
+    assert reader.refresh() == 1
+    write(stats_file, "0\n", 'a')
+    assert reader.refresh() == 1
+    assert reader.minutes_on(date(2025, 1, 2)) == 30
+
+
+def test_replaced_or_truncated_file_is_reread(stats_file):
+    write(stats_file, "date,work_minutes\n2025-01-01,25\n2025-01-02,25\n")
+    reader = StatsTail(stats_file)
+    reader.refresh()
+    replacement = stats_file + ".new"
+    write(replacement, "date,work_minutes\n2025-01-05,40\n")
+    os.replace(replacement, stats_file)
+    reader.refresh()
+    assert reader.full_reads == 2
+    assert reader.total_minutes == 40
+    # Перезапись на месте тем же размером: сверяются байты перед смещением
+    st = os.stat(stats_file)
+    write(stats_file, "date,work_minutes\n2025-01-05,50\n", 'r+')
+    os.utime(stats_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    reader.refresh()
+    assert reader.full_reads == 3
+    assert reader.total_minutes == 50
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+from PyQt6.QtCore import QThreadPool
+import stats_window
+from stats_window import StatsWindow, load_stats_data
+
+
+def write_history(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("date,work_minutes\n")
+        f.writelines(f"{day},{minutes}\n" for day, minutes in rows)
+
+
+def open_window(qapp, stats_file) -> StatsWindow:
+    window = StatsWindow(stats_file)
+    QThreadPool.globalInstance().waitForDone()
+    qapp.processEvents()  # Доставка результата фоновой загрузки
+    return window
+
+
+def test_loader_sums_last_30_days(qapp, stats_file):
+    today = date.today()
+    write_history(stats_file, [(today - timedelta(days=40), 100), (today - timedelta(days=29), 30),
+                               (today, 25), (today, 20)])
+    data = load_stats_data(stats_file)
+    assert data['date_range'][0] == today - timedelta(days=29) and data['date_range'][-1] == today
+    assert data['activity_data'][today] == 45
+    assert data['total_minutes'] == 75 and data['active_days'] == 2
+    assert data['version'][-1] == today
+
+
+def test_cache_is_dropped_after_write_or_midnight(qapp, stats_file, monkeypatch):
+    today = date.today()
+    write_history(stats_file, [(today, 25)])
+    stats_window._stats_cache.pop(stats_file, None)
+    window = open_window(qapp, stats_file)
+    assert window._loader is not None
+    window.close()
+
+    window = open_window(qapp, stats_file)
+    assert window._loader is None, "Файл не менялся, а данные загружаются заново"
+    window.close()
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return today + timedelta(days=1)
+
+    # Окно открыто после полуночи: вчерашнее "сегодня" из кэша не годится
+    monkeypatch.setattr(stats_window, 'date', Tomorrow)
+    window = open_window(qapp, stats_file)
+    assert window._loader is not None
+    data = stats_window._stats_cache[stats_file][1]
+    assert data['date_range'][-1] == today + timedelta(days=1)
+    assert data['activity_data'][today] == 25
+    window.close()
+
+    with open(stats_file, 'a', encoding='utf-8') as f:
+        f.write(f"{today},5\n")
+    window = open_window(qapp, stats_file)
+    assert window._loader is not None
+    assert stats_window._stats_cache[stats_file][1]['activity_data'][today] == 30
+    window.close()
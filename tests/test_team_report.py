@@ -0,0 +1,51 @@
+import os
+from datetime import date
+from team_report import build_team_report
+
+TODAY = date(2025, 3, 12)
+
+
+def write_stats(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("date,work_minutes\n")
+        f.writelines(f"{day},{minutes}\n" for day, minutes in rows)
+
+
+def make_team(root):
+    write_stats(os.path.join(root, "alice", "pomodoro_stats.csv"),
+                [("2025-03-10", 25), ("2025-03-11", 25), ("2025-03-12", 50)])
+    write_stats(os.path.join(root, "alice.csv"), [("2025-03-01", 10)])
+    write_stats(os.path.join(root, "team", "alice.csv"), [("2025-02-01", 5)])
+    for index in range(9):
+        write_stats(os.path.join(root, f"user{index}.csv"), [("2025-03-12", index + 1)])
+
+
+def users(report):
+    return {summary.user: summary.total_minutes for summary in report.partial.users.values()}
+
+
+def test_duplicate_names_follow_sorted_paths(tmp_path):
+    root = str(tmp_path)
+    make_team(root)
+    expected = None
+    for workers in (1, 2, 4):
+        report = build_team_report(root, workers, TODAY)
+        if expected is None:
+            expected = users(report)
+        assert users(report) == expected
+    # "alice.csv" идет раньше "alice/pomodoro_stats.csv" в отсортированных путях
+    assert expected['alice'] == 10
+    assert expected['alice (2)'] == 100
+    assert expected['team/alice'] == 5
+
+
+def test_totals_and_streaks(tmp_path):
+    root = str(tmp_path)
+    make_team(root)
+    report = build_team_report(root, 2, TODAY)
+    assert report.total_minutes == 100 + 10 + 5 + sum(range(1, 10))
+    alice = report.partial.users['alice (2)']
+    assert alice.current_streak(TODAY) == alice.longest_streak == 3
+    assert alice.week_minutes(TODAY) == 100
+    assert report.partial.records == 3 + 1 + 1 + 9
@@ -0,0 +1,113 @@
+import socket
+import time
+import pytest
+from pomodoro import PomodoroTimer
+from team_sync import TeamClient, TeamHost, parse_address
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def session():
+    started = []
+
+    def start(participants: int = 1, resync_seconds: float = 10):
+        host = TeamHost(port=0, resync_seconds=resync_seconds)
+        host.start()
+        messages = [[] for _ in range(participants)]
+        clients = [TeamClient('127.0.0.1', host.port, on_message=received.append)
+                   for received in messages]
+        started.append(host)
+        started.extend(clients)
+        for client in clients:
+            client.start()
+        assert wait_for(lambda: host.client_count == participants)
+        return host, clients, messages
+
+    yield start
+    for item in reversed(started):
+        item.stop()
+
+
+def test_default_address_is_loopback():
+    assert parse_address(":47260") == ("127.0.0.1", 47260)
+    assert parse_address("") == ("127.0.0.1", 47250)
+    assert TeamHost().host == "127.0.0.1"
+
+
+def test_publish_reaches_every_participant(session):
+    timer = PomodoroTimer(threaded=False)
+    timer.start_work()
+    host, clients, messages = session(participants=5)
+    host.publish(timer)
+    assert wait_for(lambda: all(messages))
+    for client in clients:
+        assert client.last_message['phase'] == 0 and client.last_message['running']
+        assert abs(client.time_left() - timer.state.time_left) < 1.5
+
+
+def test_running_phase_is_resent_periodically(session):
+    timer = PomodoroTimer(threaded=False)
+    timer.start_work()
+    host, clients, messages = session(resync_seconds=0.3)
+    host.publish(timer)
+    assert wait_for(lambda: len(messages[0]) >= 4, timeout=3), "Повторной рассылки нет"
+    seqs = [message['seq'] for message in messages[0]]
+    assert seqs == sorted(set(seqs))
+    lefts = [message['left'] for message in messages[0]]
+    assert lefts[-1] < lefts[0], "Повтор не пересчитывает остаток времени"
+
+
+def test_stopped_timer_is_not_resent(session):
+    timer = PomodoroTimer(threaded=False)
+    host, clients, messages = session(resync_seconds=0.2)
+    host.publish(timer)
+    assert wait_for(lambda: messages[0])
+    time.sleep(1.0)
+    assert len(messages[0]) == 1
+
+
+def test_idle_host_does_not_spin(session):
+    host, clients, messages = session(resync_seconds=0.2)
+    # Ничего не опубликовано
+    woken = host.wakeups
+    time.sleep(1.0)
+    assert host.wakeups - woken <= 3, f"Пробуждений без дела: {host.wakeups - woken}"
+    # Таймер остановлен
+    host.publish(PomodoroTimer(threaded=False))
+    assert wait_for(lambda: messages[0])
+    woken = host.wakeups
+    time.sleep(1.0)
+    assert host.wakeups - woken <= 3, f"Пробуждений без дела: {host.wakeups - woken}"
+    # Таймер идет, но участники отключились
+    timer = PomodoroTimer(threaded=False)
+    timer.start_work()
+    host.publish(timer)
+    assert wait_for(lambda: len(messages[0]) >= 2)
+    clients[0].stop()
+    assert wait_for(lambda: host.client_count == 0)
+    woken = host.wakeups
+    time.sleep(1.0)
+    assert host.wakeups - woken <= 3, f"Пробуждений без дела: {host.wakeups - woken}"
+
+
+def test_reconnected_participant_gets_current_phase(session):
+    timer = PomodoroTimer(threaded=False)
+    timer.start_work()
+    host, clients, messages = session()
+    host.publish(timer)
+    assert wait_for(lambda: messages[0])
+    time.sleep(0.6)
+    clients[0]._sock.shutdown(socket.SHUT_RDWR)  # Обрыв связи, участник подключится заново
+    assert wait_for(lambda: len(messages[0]) >= 2), "После переподключения фаза не пришла"
+    first, resent = messages[0][0], messages[0][1]
+    assert resent['phase'] == first['phase'] and resent['running']
+    assert first['left'] - 1.5 < resent['left'] < first['left'] - 0.5, \
+        "Остаток не пересчитан на момент подключения"
@@ -0,0 +1,47 @@
+from PyQt6.QtWidgets import QProgressBar
+import theme
+
+
+def test_every_theme_covers_every_phase():
+    for name in theme.THEMES:
+        sheet = theme.build_stylesheet(name)
+        for phase in (theme.PHASE_WORK, theme.PHASE_BREAK, theme.PHASE_PAUSE):
+            assert f'#{theme.PHASE_BAR}[phase="{phase}"]' in sheet
+    assert theme.colors("missing") == theme.colors(theme.config.DEFAULT_THEME)
+
+
+def test_phase_for_state():
+    assert theme.phase_for_state('work') == theme.PHASE_WORK
+    assert theme.phase_for_state('long_break') == theme.PHASE_BREAK
+    assert theme.phase_for_state('stop') == theme.PHASE_PAUSE
+
+
+def test_set_phase_changes_bar_color(qapp):
+    qapp.setStyleSheet(theme.build_stylesheet(theme.config.DEFAULT_THEME))
+    try:
+        bar = QProgressBar()
+        bar.setObjectName(theme.PHASE_BAR)
+        bar.setRange(0, 100)
+        bar.setValue(100)
+        bar.resize(200, 30)
+        assert theme.set_phase(bar, theme.PHASE_WORK)
+        work = bar.grab().toImage().pixelColor(100, 15)
+        assert not theme.set_phase(bar, theme.PHASE_WORK), "Повторная смена фазы переполировала виджет"
+        assert theme.set_phase(bar, theme.PHASE_BREAK)
+        assert bar.grab().toImage().pixelColor(100, 15) != work
+    finally:
+        qapp.setStyleSheet("")
+
+
+def test_settings_fields_follow_theme(qapp, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from settings_window import SettingsWindow
+    qapp.setStyleSheet(theme.build_stylesheet('dark'))
+    try:
+        dialog = SettingsWindow()
+        dialog.plan_edit.setPlaceholderText("")
+        dialog.plan_edit.resize(120, 30)
+        field = dialog.plan_edit.grab().toImage().pixelColor(60, 15)
+        assert field.lightness() < 100, "Поле ввода осталось светлым в темной теме"
+    finally:
+        qapp.setStyleSheet("")
@@ -0,0 +1,75 @@
+import json
+import time
+from pomodoro import PomodoroTimer
+from timer_replay import replay_trace
+from timer_trace import TraceRecorder
+
+
+def record(path, threaded: bool, script):
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=2,
+                          recorder=TraceRecorder(path), threaded=threaded)
+    timer._notify_phase_end = lambda: None
+    try:
+        script(timer)
+    finally:
+        timer.stop()
+        timer.finish_trace()
+
+
+def commands(timer):
+    timer.start_work()
+    timer.advance(5)
+    timer.pause()
+    timer.resume()
+    timer.advance(3)
+    timer.seek(100)  # Середина первого перерыва
+    timer.advance(7)
+    timer.skip()
+    timer.pause()
+    timer.resume()
+    timer.advance(2)
+
+
+def test_recorded_commands_replay_exactly(tmp_path):
+    trace = str(tmp_path / "trace.jsonl")
+    record(trace, False, commands)
+    report = replay_trace(trace)
+    assert report.ok, report.summary()
+    assert report.commands_applied == 8  # Семь команд и stop, advance - ход часов
+    names = [event['name'] for event in report.replayed_states]
+    # Перед каждой сменой фазы в трассе промежуточная остановка старого потока
+    assert names == ['work', 'pause', 'work', 'stop', 'break', 'stop', 'work', 'pause', 'work',
+                     'stop']
+    assert report.replayed_final == {'work': True, 'round': 2, 'left': 58, 'running': False,
+                                     'paused': False, 'phase': 2}
+
+
+def test_phase_change_on_timer_thread_replays(tmp_path):
+    trace = str(tmp_path / "trace.jsonl")
+
+    def script(timer):
+        timer.start_work()
+        timer.seek(58)
+        time.sleep(2.5)  # Фаза заканчивается в потоке таймера, перерыв идет полсекунды
+        timer.pause()
+
+    record(trace, True, script)
+    report = replay_trace(trace)
+    assert report.ok, report.summary()
+    names = [event['name'] for event in report.expected_states]
+    assert names == ['work', 'stop', 'work', 'stop', 'break', 'pause', 'stop']
+
+
+def test_tampered_trace_is_reported(tmp_path):
+    trace = str(tmp_path / "trace.jsonl")
+    record(trace, False, commands)
+    with open(trace, encoding='utf-8') as f:
+        events = [json.loads(line) for line in f]
+    for event in events:
+        if event['kind'] == 'cmd' and event['name'] == 'seek':
+            event['elapsed'] = 30  # Перемотка не в перерыв, а внутри работы
+    with open(trace, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(event) + "\n" for event in events)
+    report = replay_trace(trace)
+    assert not report.ok
+    assert report.mismatches and "ожидалось" in report.mismatches[0]
@@ -0,0 +1,109 @@
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pomodoro import PomodoroTimer
+from timer_state import load_snapshot
+from tests.conftest import ROOT
+
+CHILD = textwrap.dedent("""
+    import sys, time
+    from pomodoro import PomodoroTimer
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=2,
+                          state_file=sys.argv[1])
+    timer.start_work()
+    if sys.argv[2] == 'break':
+        timer.seek(timer.timeline.phases[0].duration + 20)  # Середина первого перерыва
+    if sys.argv[2] == 'paused':
+        time.sleep(1.5)
+        timer.pause()
+    print(time.time(), flush=True)
+    time.sleep(60)
+""")
+
+
+def kill_mid_phase(state_file: str, mode: str, run_for: float = 2.5) -> float:
+    """Запуск таймера в отдельном процессе и SIGKILL посреди фазы; момент готовности"""
+    child = subprocess.Popen([sys.executable, "-c", CHILD, state_file, mode], cwd=ROOT,
+                             stdout=subprocess.PIPE, text=True)
+    try:
+        ready = float(child.stdout.readline())
+        time.sleep(run_for)
+    finally:
+        child.send_signal(signal.SIGKILL)
+        child.wait()
+    assert child.returncode == -signal.SIGKILL
+    return ready
+
+
+def resume(state_file: str) -> PomodoroTimer:
+    snapshot = load_snapshot(state_file)
+    assert snapshot is not None, "Снимок не пережил аварийное завершение"
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=2, threaded=False)
+    timer.restore(snapshot)
+    return timer
+
+
+def test_resume_work_phase_after_kill(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    started = kill_mid_phase(state_file, 'work')
+    timer = resume(state_file)
+    expected = 60 - (time.time() - started)
+    assert timer.state.phase_index == 0 and timer.is_work and timer.is_running
+    assert abs(timer.time_left - expected) <= 1, (timer.time_left, expected)
+
+
+def test_resume_break_phase_after_kill(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    started = kill_mid_phase(state_file, 'break')
+    timer = resume(state_file)
+    expected = 40 - (time.time() - started)
+    assert timer.state.phase_index == 1 and not timer.is_work
+    assert timer.current_round == 1
+    assert abs(timer.time_left - expected) <= 1, (timer.time_left, expected)
+
+
+def test_resume_paused_keeps_remaining_time(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    kill_mid_phase(state_file, 'paused')
+    timer = resume(state_file)
+    # На паузе время не идет: остаток тот, что был в момент паузы
+    assert timer.is_paused and timer.is_work
+    assert timer.time_left in (58, 59)
+
+
+def test_concurrent_snapshot_writes_keep_latest_state(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    timer = PomodoroTimer(work_time=1, short_break=1, long_break=2, rounds=2,
+                          state_file=state_file, threaded=False)
+    timer.start_work()
+    deadline = time.monotonic() + 1.0
+
+    def toggle(action):
+        while time.monotonic() < deadline:
+            action()
+
+    # Пауза из потока GUI и перемотка из другого потока пишут снимки одновременно
+    threads = [threading.Thread(target=toggle, args=(action,))
+               for action in (timer.pause, timer.resume, lambda: timer.seek(30))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    timer.pause()
+    snapshot = load_snapshot(state_file)
+    assert snapshot is not None and snapshot.paused
+    assert snapshot.phase_index == timer.state.phase_index
+    assert snapshot.remaining == timer.state.time_left
+    assert os.listdir(tmp_path) == ["state.json"], "Остались временные файлы снимка"
+
+    # Запоздавшая запись более старого состояния не затирает новое
+    stale = load_snapshot(state_file)
+    stale.paused = False
+    timer._store_snapshot(timer.state.version - 1, stale)
+    assert load_snapshot(state_file).paused
+    timer.stop()
+    assert not os.path.exists(state_file)
@@ -0,0 +1,246 @@
+import logging
+from typing import Dict
+from PyQt6.QtWidgets import QApplication, QWidget
+import config
+
+logger = logging.getLogger(__name__)
+
+# Имена объектов и значения свойств, по которым стили находят виджеты главного окна
+MAIN_WINDOW = "pomodoroMain"
+PHASE_BAR = "phaseBar"
+SETTINGS_DIALOG = "settingsDialog"
+ROLE_ACTION = "action"  # Крупные кнопки "Начать", "Статистика", "Стоп"
+ROLE_ICON = "icon"      # Кнопки-иконки звука и настроек
+ROLE_INFO = "info"      # Подписи статуса и статистики
+ROLE_SAVE = "save"      # Кнопка "Сохранить" диалога настроек
+ROLE_CANCEL = "cancel"  # Кнопка "Отмена" диалога настроек
+PHASE_WORK = "work"
+PHASE_BREAK = "break"
+PHASE_PAUSE = "pause"
+
+# Градиенты полосы прогресса по фазам: верх, середина, низ и рамка
+_CHUNKS = {
+    PHASE_WORK: ("#FF9B9B", "#FF6B6B", "#FF4B4B", "#CC5555"),
+    PHASE_BREAK: ("#7EDCD4", "#4ECDC4", "#2EBDB4", "#3AA99F"),
+    PHASE_PAUSE: ("#B5B5B6", "#95A5A6", "#758586", "#6A7677"),
+}
+
+# Кнопки диалога настроек: фон, при наведении, при нажатии
+_DIALOG_BUTTONS = {
+    ROLE_SAVE: ("#2ECC71", "#27AE60", "#219A52"),
+    ROLE_CANCEL: ("#E74C3C", "#C0392B", "#A93226"),
+}
+
+THEMES: Dict[str, Dict[str, str]] = {
+    'light': {
+        'window': "#FDFAF6",
+        'text': "#2C3E50",
+        'button': "#34495E",
+        'button_hover': "#2C3E50",
+        'button_text': "#ECF0F1",
+        'button_disabled': "#95A5A6",
+        'icon_hover': "rgba(52, 73, 94, 0.1)",
+        'bar': "#FFFFFF",
+        'bar_border': "#919B9C",
+        'bar_text': "#000000",
+        'input': "#FFFFFF",
+        'input_border': "#BDC3C7",
+        'input_hover': "#3498DB",
+    },
+    'dark': {
+        'window': "#1F2329",
+        'text': "#E6E9EC",
+        'button': "#3D5166",
+        'button_hover': "#4A627A",
+        'button_text': "#ECF0F1",
+        'button_disabled': "#4B5259",
+        'icon_hover': "rgba(236, 240, 241, 0.15)",
+        'bar': "#2B3038",
+        'bar_border': "#4B5259",
+        'bar_text': "#F5F5F5",
+        'input': "#2B3038",
+        'input_border': "#4B5259",
+        'input_hover': "#5DADE2",
+    },
+}
+THEME_TITLES = {'light': "Светлая", 'dark': "Темная"}
+
+
+def phase_for_state(state: str) -> str:
+    """Оформление полосы прогресса для состояния таймера"""
+    if state == 'work':
+        return PHASE_WORK
+    if state in ('break', 'long_break'):
+        return PHASE_BREAK
+    return PHASE_PAUSE  # Пауза или остановка
+
+
+def colors(name: str) -> Dict[str, str]:
+    if name not in THEMES:
+        logger.warning(f"Неизвестная тема {name}, используется {config.DEFAULT_THEME}")
+        name = config.DEFAULT_THEME
+    return THEMES[name]
+
+
+def _progress_bar_rules(palette: Dict[str, str], selector: str) -> str:
+    return f"""
+{selector} {{
+    border: 1px solid {palette['bar_border']};
+    border-radius: 2px;
+    background-color: {palette['bar']};
+    text-align: center;
+    height: 20px;
+    min-width: 300px;
+    font-size: 12px;
+    font-weight: bold;
+    color: {palette['bar_text']};
+    margin: 0px;
+    padding: 0px;
+}}
+"""
+
+
+def _chunk_rules(phase: str, selector: str) -> str:
+    top, middle, bottom, border = _CHUNKS[phase]
+    return f"""
+{selector}::chunk {{
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                              stop:0 {top},
+                              stop:0.5 {middle},
+                              stop:1 {bottom});
+    border: 1px solid {border};
+    border-radius: 0px;
+    margin: 0px;
+    width: 10px;
+}}
+"""
+
+
+def _settings_rules(palette: Dict[str, str]) -> str:
+    dialog = f"QDialog#{SETTINGS_DIALOG}"
+    fields = ", ".join(f"{dialog} {kind}" for kind in ("QSpinBox", "QLineEdit", "QComboBox"))
+    hovered = ", ".join(f"{dialog} {kind}:hover" for kind in ("QSpinBox", "QLineEdit", "QComboBox"))
+    sheet = f"""
+{dialog} {{
+    background-color: {palette['window']};
+}}
+{dialog} QLabel {{
+    color: {palette['text']};
+}}
+{fields} {{
+    padding: 5px;
+    border: 2px solid {palette['input_border']};
+    border-radius: 5px;
+    background: {palette['input']};
+    color: {palette['text']};
+    min-width: 80px;
+}}
+{hovered} {{
+    border-color: {palette['input_hover']};
+}}
+"""
+    for role, (normal, hover, pressed) in _DIALOG_BUTTONS.items():
+        button = f'{dialog} QPushButton[role="{role}"]'
+        sheet += f"""
+{button} {{
+    background-color: {normal};
+    color: white;
+    border: none;
+    padding: 8px 16px;
+    border-radius: 5px;
+    font-weight: bold;
+    min-width: 100px;
+}}
+{button}:hover {{
+    background-color: {hover};
+}}
+{button}:pressed {{
+    background-color: {pressed};
+}}
+"""
+    return sheet
+
+
+def build_stylesheet(name: str) -> str:
+    """
+    Единая таблица стилей приложения для темы.
+
+    Правила привязаны к именам главного окна, диалога настроек, полосы
+    прогресса и свойству role, поэтому не задевают остальные диалоги. Цвет
+    полосы для каждой фазы описан заранее селектором по свойству phase:
+    при смене фазы таблица не разбирается заново.
+    """
+    palette = colors(name)
+    bar = f"QProgressBar#{PHASE_BAR}"
+    sheet = f"""
+QMainWindow#{MAIN_WINDOW} {{
+    background-color: {palette['window']};
+}}
+QPushButton[role="{ROLE_ICON}"] {{
+    background-color: transparent;
+    border: none;
+    width: 32px;
+    height: 32px;
+    padding: 0px;
+    margin: 5px;
+}}
+QPushButton[role="{ROLE_ICON}"]:hover {{
+    background-color: {palette['icon_hover']};
+    border-radius: 6px;
+}}
+QPushButton[role="{ROLE_ACTION}"] {{
+    background-color: {palette['button']};
+    color: {palette['button_text']};
+    border: none;
+    border-radius: 10px;
+    padding: 8px 15px;
+    font-size: 14px;
+    font-weight: bold;
+    min-width: 100px;
+    min-height: 40px;
+    margin: 5px;
+    text-transform: uppercase;
+}}
+QPushButton[role="{ROLE_ACTION}"]:hover, QPushButton[role="{ROLE_ACTION}"]:pressed {{
+    background-color: {palette['button_hover']};
+}}
+QPushButton[role="{ROLE_ACTION}"]:disabled {{
+    background-color: {palette['button_disabled']};
+}}
+QLabel[role="{ROLE_INFO}"] {{
+    color: {palette['text']};
+    font-weight: bold;
+}}
+""" + _settings_rules(palette) + _progress_bar_rules(palette, bar)
+    for phase in _CHUNKS:
+        sheet += _chunk_rules(phase, f'{bar}[phase="{phase}"]')
+    return sheet
+
+
+def apply_theme(app: QApplication, name: str):
+    """Установка таблицы стилей темы на все приложение"""
+    app.setStyleSheet(build_stylesheet(name))
+
+
+def set_role(widget: QWidget, role: str):
+    """Постоянная роль виджета для правил таблицы; задается до показа окна"""
+    widget.setProperty('role', role)
+
+
+def set_phase(widget: QWidget, phase: str) -> bool:
+    """
+    Переключение оформления фазы свойством phase.
+
+    Свойства не отслеживаются движком стилей, поэтому после смены
+    виджет переполировывается: подбираются уже разобранные правила
+    только этого виджета. Возвращает False, если фаза не изменилась.
+    """
+    if widget.property('phase') == phase:
+        return False
+    widget.setProperty('phase', phase)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+    return True
+
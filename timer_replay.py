@@ -0,0 +1,158 @@
+import logging
+from typing import List, Optional
+from pomodoro import PomodoroTimer
+from timer_state import TimerSnapshot
+from timer_trace import MemoryRecorder, read_trace
+
+logger = logging.getLogger(__name__)
+
+MAX_MISMATCHES = 20
+
+
+class ReplayReport:
+    """Результат воспроизведения трассы"""
+
+    def __init__(self):
+        self.commands_applied = 0
+        self.expected_states: List[dict] = []
+        self.replayed_states: List[dict] = []
+        self.mismatches: List[str] = []
+        self.timing_deltas: List[float] = []  # Реальное время минус виртуальное, с
+        self.expected_final: Optional[dict] = None
+        self.replayed_final: Optional[dict] = None
+
+    @property
+    def final_match(self) -> bool:
+        return self.expected_final is None or self.expected_final == self.replayed_final
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches and self.final_match
+
+    def summary(self) -> str:
+        lines = [
+            f"Команд воспроизведено: {self.commands_applied}",
+            f"Переходов: ожидалось {len(self.expected_states)}, получено {len(self.replayed_states)}",
+            f"Итоговое состояние: {'совпадает' if self.final_match else 'РАСХОДИТСЯ'}",
+        ]
+        if self.timing_deltas:
+            worst = max(self.timing_deltas, key=abs)
+            mean = sum(self.timing_deltas) / len(self.timing_deltas)
+            lines.append(f"Отставание реального таймера от виртуальных часов: "
+                         f"среднее {mean:.3f} с, максимум {worst:.3f} с")
+        lines.extend(self.mismatches)
+        return "\n".join(lines)
+
+
+def _state_key(event: dict) -> tuple:
+    return event['name'], tuple(sorted(event['s'].items()))
+
+
+def replay_trace(path: str) -> ReplayReport:
+    """
+    Воспроизведение трассы на таймере без потока под виртуальными часами.
+
+    Внешние команды подаются в тот момент виртуального времени, когда таймер
+    доходит до записанного перед командой состояния. Пока таймер на паузе
+    или остановлен, виртуальные часы сразу переводятся на время события.
+    Сверяются последовательность переходов и итоговое состояние, а разница
+    между записанным и виртуальным временем команд показывает дрейф
+    реального потока таймера.
+    """
+    report = ReplayReport()
+    recorder = MemoryRecorder()
+    timer = PomodoroTimer(recorder=recorder, threaded=False)
+    virtual_t = None
+
+    for event in read_trace(path):
+        kind = event.get('kind')
+        if kind == 'state':
+            report.expected_states.append(event)
+            continue
+        if kind == 'end':
+            report.expected_final = event['s']
+            continue
+        if kind == 'init':
+            _set_durations(timer, event['durations'])
+            timer.plan = event.get('plan')
+            timer.time_left = timer.phase_length = timer.work_phase_length()
+            continue
+        if kind != 'cmd' or not event.get('ext'):
+            continue
+
+        if virtual_t is None:
+            virtual_t = event['t']
+        target = event['s']
+        # Пока таймер идет, каждая секунда виртуального времени - один тик
+        max_steps = max(timer.work_time, timer.short_break, timer.long_break) * (timer.rounds + 1) * 2
+        steps = 0
+        while (timer.get_trace_state() != target and timer.is_running
+               and not timer.is_paused and steps < max_steps):
+            timer.advance(1)
+            virtual_t += 1
+            steps += 1
+        if not timer.is_running or timer.is_paused:
+            virtual_t = max(virtual_t, event['t'])
+        if timer.get_trace_state() != target and len(report.mismatches) < MAX_MISMATCHES:
+            report.mismatches.append(
+                f"t={event['t']}: перед командой {event['name']} ожидалось {target}, "
+                f"получено {timer.get_trace_state()}")
+        report.timing_deltas.append(round(event['t'] - virtual_t, 4))
+
+        _apply_command(timer, event)
+        report.commands_applied += 1
+
+    timer.finish_trace()
+    report.replayed_states = [e for e in recorder.events if e['kind'] == 'state']
+    report.replayed_final = timer.get_trace_state()
+
+    expected = [_state_key(e) for e in report.expected_states]
+    replayed = [_state_key(e) for e in report.replayed_states]
+    for index, (want, got) in enumerate(zip(expected, replayed)):
+        if want != got and len(report.mismatches) < MAX_MISMATCHES:
+            report.mismatches.append(f"Переход #{index}: ожидалось {want}, получено {got}")
+    if len(expected) != len(replayed) and len(report.mismatches) < MAX_MISMATCHES:
+        report.mismatches.append(
+            f"Разное число переходов: {len(expected)} в трассе, {len(replayed)} при воспроизведении")
+    return report
+
+
+def _apply_command(timer: PomodoroTimer, event: dict):
+    name = event['name']
+    if name == 'start_work':
+        if event.get('durations'):
+            _set_durations(timer, event['durations'])
+        timer.plan = event.get('plan')
+        timer.start_work()
+    elif name == 'pause':
+        timer.pause()
+    elif name == 'resume':
+        timer.resume()
+    elif name == 'stop':
+        timer.stop()
+    elif name == 'next_cycle':
+        timer.next_cycle()
+    elif name == 'seek':
+        timer.seek(event['elapsed'])
+    elif name == 'skip':
+        timer.skip()
+    elif name == 'follow':
+        timer.follow(event['phase'], event['left'], paused=event['paused'],
+                     running=event['running'])
+    elif name == 'restore':
+        data = event['snapshot']
+        # Остаток берем из трассы: пересчет по часам системы сделал бы повтор недетерминированным
+        timer.restore(TimerSnapshot(
+            is_work=data['is_work'],
+            current_round=data['current_round'],
+            phase_length=data['phase_length'],
+            phase_index=data.get('phase_index'),
+            paused=data['paused'],
+            remaining=event['time_left']
+        ))
+    else:
+        logger.warning(f"Неизвестная команда в трассе: {name}")
+
+
+def _set_durations(timer: PomodoroTimer, durations: list):
+    timer.work_time, timer.short_break, timer.long_break, timer.rounds = durations
@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class TimerStatus(NamedTuple):
+    """
+    Неизменяемое состояние таймера для чтения из других потоков.
+
+    Таймер публикует новый объект целиком при каждом изменении, поэтому
+    читатель всегда видит согласованную комбинацию полей. По version
+    можно пропустить обновление, если с прошлого чтения ничего не менялось.
+    """
+    version: int
+    phase_index: int
+    is_work: bool
+    current_round: int
+    phase_length: int
+    time_left: int
+    is_running: bool
+    is_paused: bool
+    last_tick_at: float
+
+
+class TimerEvent(NamedTuple):
+    """Событие перехода таймера для шины событий: имя состояния и состояние после него"""
+    name: str
+    status: TimerStatus
+
+
+class TimerSnapshot:
+    """
+    Минимальное состояние таймера для восстановления после сбоя.
+
+    Для идущего таймера хранится момент окончания фазы по часам системы
+    (deadline), поэтому оставшееся время верно даже после перезагрузки.
+    Для паузы хранится остаток времени на момент паузы.
+    """
+    __slots__ = ('is_work', 'current_round', 'phase_length', 'phase_index', 'deadline',
+                 'paused', 'remaining', 'paused_at', 'saved_at')
+
+    def __init__(self, is_work: bool, current_round: int, phase_length: int,
+                 phase_index: Optional[int] = None,
+                 deadline: Optional[float] = None, paused: bool = False,
+                 remaining: int = 0, paused_at: Optional[float] = None,
+                 saved_at: Optional[float] = None):
+        self.is_work = is_work
+        self.current_round = current_round
+        self.phase_length = phase_length
+        self.phase_index = phase_index
+        self.deadline = deadline
+        self.paused = paused
+        self.remaining = remaining
+        self.paused_at = paused_at
+        self.saved_at = saved_at if saved_at is not None else time.time()
+
+    def time_left(self, now: Optional[float] = None) -> int:
+        """Оставшееся время фазы в секундах на текущий момент"""
+        if self.paused or self.deadline is None:
+            return max(0, self.remaining)
+        now = time.time() if now is None else now
+        return max(0, int(round(self.deadline - now)))
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['version'] = SNAPSHOT_VERSION
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TimerSnapshot":
+        if data.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия снимка: {data.get('version')}")
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+
+def save_snapshot(path: str, snapshot: TimerSnapshot):
+    """Атомарная запись снимка: временный файл с уникальным именем и переименование"""
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                        prefix=os.path.basename(path) + ".", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(snapshot.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"Ошибка при сохранении состояния таймера: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_snapshot(path: str) -> Optional[TimerSnapshot]:
+    """Загрузка снимка; None если его нет или он поврежден"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return TimerSnapshot.from_dict(json.load(f))
+    except Exception as e:
+        logger.error(f"Снимок состояния таймера поврежден: {e}")
+        clear_snapshot(path)
+        return None
+
+
+def clear_snapshot(path: str):
+    """Удаление снимка после штатной остановки таймера"""
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except Exception as e:
+        logger.error(f"Ошибка при удалении состояния таймера: {e}")
@@ -0,0 +1,82 @@
+import json
+import logging
+import threading
+import time
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TraceRecorder:
+    """
+    Запись команд и переходов состояния таймера в JSON Lines.
+
+    Каждая строка: {"t": секунды от начала записи по monotonic, "kind": "cmd"
+    или "state", "name": имя, "s": состояние таймера}. Записи приходят и из
+    потока GUI, и из потока таймера, поэтому запись защищена блокировкой.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._file = open(path, 'w', encoding='utf-8', buffering=64 * 1024)
+        logger.info(f"Запись трассы таймера в {path}")
+
+    def record(self, kind: str, name: str, state: dict, **fields):
+        event = {'t': round(time.monotonic() - self._started_at, 4),
+                 'kind': kind, 'name': name, 's': state}
+        event.update(fields)
+        line = json.dumps(event, separators=(',', ':'))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line)
+            self._file.write("\n")
+            if kind == 'cmd':
+                # Команды редки, сбрасываем их сразу, чтобы трасса пережила сбой
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class MemoryRecorder:
+    """Запись событий в список, для сверки при воспроизведении"""
+
+    def __init__(self):
+        self.events = []
+
+    def record(self, kind: str, name: str, state: dict, **fields):
+        event = {'kind': kind, 'name': name, 's': dict(state)}
+        event.update(fields)
+        self.events.append(event)
+
+    def close(self):
+        pass
+
+
+def read_trace(path: str) -> Iterator[dict]:
+    """Чтение событий трассы; оборванная последняя строка пропускается"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Пропущена поврежденная строка трассы {path}")
+
+
+def open_recorder(path: Optional[str]) -> Optional[TraceRecorder]:
+    """Создание записи трассы, если она включена"""
+    if not path:
+        return None
+    try:
+        return TraceRecorder(path)
+    except Exception as e:
+        logger.error(f"Не удалось открыть файл трассы: {e}")
+        return None
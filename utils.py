@@ -1,7 +1,6 @@
 from plyer import notification
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def play_sound():